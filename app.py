@@ -1,256 +1,67 @@
 import streamlit as st
-import pandas as pd
-import numpy as np
-import plotly.express as px
-import plotly.graph_objects as go
 import datetime
-from PIL import Image
+import os
+from collections import deque
 import base64
 from io import BytesIO
-import random
+
+# pandas, numpy, Plotly, PIL and the analytics modules are imported where they are
+# first used, so a cold process paints the page title before loading them
+from utils.profiling import RunProfiler, append_timing_log
+from utils.assets import static_path, static_url, stylesheet_tag
+
+# Number of past runs kept in the debug panel
+DEBUG_HISTORY_RUNS = 20
+
+# Shared dataset store published by `python cli.py publish`; unset to generate data in-process
+SHARED_STORE_DIR = os.environ.get("CHURN_DASHBOARD_SHARED_STORE")
+
+# SQLite store published by `python cli.py publish --format sqlite`; queries are pushed
+# down to it instead of loading the data into memory
+DATABASE_DIR = os.environ.get("CHURN_DASHBOARD_DATABASE")
+
+# Append-only payment event log (JSON lines) folded into the monthly volumes as it grows,
+# with an optional checkpoint so a restart resumes instead of replaying the log
+EVENT_LOG_PATH = os.environ.get("CHURN_DASHBOARD_EVENT_LOG")
+EVENT_CHECKPOINT_PATH = os.environ.get("CHURN_DASHBOARD_EVENT_CHECKPOINT")
+
+# Engine for filters and aggregations over in-memory data: 'pandas' (default) or 'polars'
+ENGINE = os.environ.get("CHURN_DASHBOARD_ENGINE", "pandas")
+
+# Seconds between background checks for a new dataset version (0 disables refreshing);
+# defaults to a minute with a published store and to loading the mock data once otherwise
+REFRESH_SECONDS = float(os.environ.get(
+    "CHURN_DASHBOARD_REFRESH_SECONDS", "60" if SHARED_STORE_DIR or DATABASE_DIR or EVENT_LOG_PATH else "0"
+)) or None
+
+# Merchants per leaderboard page (and per deep-dive merchant list)
+LEADERBOARD_PAGE_SIZE = 100
+
+# Most merchants EXPORT builds in the app: Streamlit holds the whole download in memory,
+# so larger exports are left to `python cli.py export`, which streams to a file
+EXPORT_MAX_ROWS = int(os.environ.get("CHURN_DASHBOARD_EXPORT_MAX_ROWS", "200000"))
 
 # Set page configuration
 st.set_page_config(
     page_title="Payplug Churn Risk Radar",
-    page_icon="🕹️",
+    page_icon=static_path('favicon.png'),
     layout="wide",
     initial_sidebar_state="expanded"
 )
 
-# Custom CSS for retro gaming aesthetic
+# Custom CSS for retro gaming aesthetic, served from static/ (see utils/assets.py)
 def local_css():
-    st.markdown("""
-    <style>
-    /* Main theme colors */
-    :root {
-        --primary: #FF355E;        /* Hot pink */
-        --secondary: #01EDED;      /* Cyan */
-        --tertiary: #50FC00;       /* Bright green */
-        --dark: #120458;           /* Dark blue */
-        --light: #F5F5F5;          /* White-ish */
-        --warning: #FF9933;        /* Orange */
-        --danger: #FF0000;         /* Red */
-        --background: #FFDD00;     /* Bright yellow */
-    }
-    
-    /* Fonts */
-    @import url('https://fonts.googleapis.com/css2?family=VT323&display=swap');
-    @import url('https://fonts.googleapis.com/css2?family=Press+Start+2P&display=swap');
-    @import url('https://fonts.googleapis.com/css2?family=Space+Mono&display=swap');
-    
-    /* Base styles */
-    .main {
-        background-color: var(--background);
-        color: var(--dark);
-    }
-    
-    /* Override Streamlit's default background */
-    .stApp {
-        background-color: var(--background);
-    }
-    
-    h1, h2, h3 {
-        font-family: 'Press Start 2P', cursive;
-        text-transform: uppercase;
-        color: var(--secondary);
-        text-shadow: 3px 3px 0 var(--dark);
-        margin: 1.5rem 0;
-    }
-    
-    h1 {
-        color: var(--primary);
-        font-size: 2.5rem;
-        letter-spacing: 2px;
-        text-align: center;
-        padding: 20px 0;
-        border-bottom: 4px solid var(--primary);
-        margin-bottom: 30px;
-    }
-    
-    .stDataFrame {
-        border: 4px solid var(--secondary);
-        box-shadow: 8px 8px 0 var(--dark);
-    }
-    
-    /* Metric cards */
-    .metric-card {
-        background-color: var(--dark);
-        border: 3px solid var(--secondary);
-        border-radius: 0;
-        padding: 10px;
-        text-align: center;
-        margin: 5px;
-        box-shadow: 5px 5px 0 rgba(0,0,0,0.5);
-        transition: all 0.2s;
-    }
-    
-    .metric-card:hover {
-        transform: translateY(-2px);
-        box-shadow: 7px 7px 0 #000;
-    }
-    
-    .metric-value {
-        font-family: 'Press Start 2P', cursive;
-        font-size: 2rem;
-        margin: 10px 0;
-    }
-    
-    .metric-label {
-        font-family: 'VT323', monospace;
-        font-size: 1.3rem;
-        color: var(--light);
-    }
-    
-    /* Risk levels */
-    .high-risk {
-        color: var(--danger);
-        font-weight: bold;
-    }
-    
-    .medium-risk {
-        color: var(--warning);
-        font-weight: bold;
-    }
-    
-    .low-risk {
-        color: var(--tertiary);
-        font-weight: bold;
-    }
-    
-    /* Button styles */
-    .stButton button {
-        font-family: 'Press Start 2P', cursive;
-        background-color: var(--secondary);
-        color: var(--dark);
-        border: 3px solid var(--dark);
-        border-radius: 0;
-        box-shadow: 5px 5px 0 rgba(0,0,0,0.5);
-        transition: all 0.2s;
-        text-transform: uppercase;
-        padding: 10px 20px;
-        margin: 10px 0;
-    }
-    
-    .stButton button:hover {
-        background-color: var(--primary);
-        color: white;
-        transform: translateY(-2px);
-        box-shadow: 7px 7px 0 rgba(0,0,0,0.5);
-    }
-    
-    /* Select box styling */
-    .stSelectbox div[data-baseweb="select"] > div {
-        font-family: 'VT323', monospace;
-        background-color: var(--dark);
-        border: 3px solid var(--secondary);
-        border-radius: 0;
-        color: white;
-    }
-    
-    /* Sidebar styling */
-    .sidebar .sidebar-content {
-        background-color: var(--dark);
-        border-right: 4px solid var(--secondary);
-    }
-    
-    [data-testid="stSidebar"] {
-        background-color: var(--dark);
-    }
-    
-    .sidebar h2 {
-        font-size: 1.5rem;
-        color: var(--primary);
-    }
-    
-    /* Tab styling */
-    .stTabs [data-baseweb="tab-list"] {
-        gap: 2px;
-    }
-    
-    .stTabs [data-baseweb="tab"] {
-        font-family: 'Press Start 2P', cursive;
-        font-size: 0.8rem;
-        background-color: var(--dark);
-        border: 2px solid var(--secondary);
-        border-radius: 0;
-        color: var(--light);
-        padding: 10px;
-        box-shadow: 3px 3px 0 #000;
-    }
-    
-    .stTabs [aria-selected="true"] {
-        background-color: var(--secondary);
-        color: var(--dark);
-    }
-    
-    /* Dataframe styling */
-    .dataframe {
-        font-family: 'Space Mono', monospace;
-    }
-    
-    /* Footer */
-    .footer {
-        font-family: 'VT323', monospace;
-        text-align: center;
-        color: var(--light);
-        padding: 20px 0;
-        border-top: 2px solid var(--primary);
-        margin-top: 50px;
-    }
-    
-    /* Progress bar styling */
-    .stProgress > div > div {
-        background-color: var(--primary);
-    }
-    
-    /* Arcade marquee effect */
-    .marquee {
-        background-color: var(--dark);
-        overflow: hidden;
-        position: relative;
-        border: 3px solid var(--primary);
-        box-shadow: 0 0 10px var(--primary);
-        margin: 20px 0;
-        padding: 10px;
-    }
-    
-    .marquee-content {
-        font-family: 'Press Start 2P', cursive;
-        font-size: 1.2rem;
-        color: var(--primary);
-        white-space: nowrap;
-        animation: marquee 15s linear infinite;
-    }
-    
-    @keyframes marquee {
-        0% { transform: translateX(100%); }
-        100% { transform: translateX(-100%); }
-    }
-    
-    /* High-score table style */
-    .high-score {
-        font-family: 'VT323', monospace;
-        font-size: 1.2rem;
-        margin-bottom: 10px;
-    }
-    
-    .high-score-name {
-        color: var(--secondary);
-        display: inline-block;
-        width: 70%;
-    }
-    
-    .high-score-value {
-        color: var(--tertiary);
-        display: inline-block;
-        width: 30%;
-        text-align: right;
-    }
-    </style>
-    """, unsafe_allow_html=True)
+    # Without .streamlit/config.toml static serving is off, so embed the stylesheet instead
+    inline = not st.get_option("server.enableStaticServing")
+    st.markdown(stylesheet_tag(inline=inline), unsafe_allow_html=True)
 
 # Generate mock data
 def generate_mock_data(num_merchants=100):
+    import numpy as np
+    import pandas as pd
+    from data.volumes import VolumeMatrix
+    from utils.transactions import TRANSACTION_WINDOW_MONTHS, with_transaction_counters
+    
     # Random seed for reproducibility
     np.random.seed(42)
     
@@ -333,12 +144,7 @@ def generate_mock_data(num_merchants=100):
                 variation = np.random.normal(0, 0.1)
                 volume = int(base_volume * (1 + variation))
                 
-            month_date = current_date - datetime.timedelta(days=(11-month)*30)
-            monthly_volumes.append({
-                'merchant_id': merchant_id,
-                'month': month_date.strftime('%Y-%m'),
-                'volume': volume
-            })
+            monthly_volumes.append(volume)
         
         # Select risk factors for this merchant
         num_risk_factors = 0
@@ -388,82 +194,156 @@ def generate_mock_data(num_merchants=100):
             'fraud_tools_usage': fraud_tools_usage,
             'mobile_sdk_usage': mobile_sdk_usage,
             'support_tickets': support_tickets,
-            'monthly_volume_avg': int(sum(mv['volume'] for mv in monthly_volumes) / len(monthly_volumes)),
-            'latest_volume': monthly_volumes[-1]['volume'],
-            'volume_trend': monthly_volumes[-1]['volume'] / monthly_volumes[-6]['volume'] - 1  # 6-month trend
+            'monthly_volume_avg': int(sum(monthly_volumes) / len(monthly_volumes)),
+            'latest_volume': monthly_volumes[-1],
+            'volume_trend': monthly_volumes[-1] / monthly_volumes[-6] - 1  # 6-month trend
         })
     
     # Convert to DataFrames
     merchants_df = pd.DataFrame(merchants)
     
-    # Flatten monthly volumes for all merchants
-    all_volumes = []
-    for merchant in merchants:
-        for month in range(12):
-            month_date = current_date - datetime.timedelta(days=(11-month)*30)
-            if month < 6:
-                vol_base = merchant['monthly_volume_avg'] * (0.85 + 0.3 * random.random())
-            else:
-                # Use the volume trend to inform later months
-                trend_factor = 1 + (month - 5) * (merchant['volume_trend'] / 6)
-                vol_base = merchant['monthly_volume_avg'] * max(0.5, trend_factor)
-            
-            all_volumes.append({
-                'merchant_id': merchant['merchant_id'],
-                'month': month_date.strftime('%Y-%m'),
-                'volume': int(vol_base)
-            })
-    
-    volumes_df = pd.DataFrame(all_volumes)
-    
-    return merchants_df, volumes_df
+    # Monthly volume history as a merchants x months matrix, one row per merchant
+    months = current_date.year * 12 + current_date.month - 1 - np.arange(11, -1, -1)
+    avg_volume = merchants_df['monthly_volume_avg'].to_numpy(dtype=np.float64)[:, None]
+    trend = merchants_df['volume_trend'].to_numpy(dtype=np.float64)[:, None]
+    # First half: noise around the average; second half: follow the volume trend
+    early = avg_volume * (0.85 + 0.3 * np.random.random((num_merchants, 6)))
+    trend_factor = 1 + np.arange(1, 7) * (trend / 6)
+    late = avg_volume * np.maximum(0.5, trend_factor)
+    volumes = VolumeMatrix(
+        merchants_df['merchant_id'],
+        months,
+        np.floor(np.hstack([early, late]))
+    )
 
-# Create a pixel art version of the merchant icon
-def create_pixel_merchant_icon(color='cyan'):
-    colors = {
-        'cyan': (1, 237, 237),
-        'pink': (255, 53, 94),
-        'green': (80, 252, 0),
-        'yellow': (255, 218, 0),
-        'orange': (255, 153, 51),
-        'red': (255, 0, 0),
-    }
-    
-    rgb_color = colors.get(color, colors['cyan'])
-    
-    # Create a 16x16 image with transparent background
-    img = Image.new('RGBA', (16, 16), (0, 0, 0, 0))
-    pixels = img.load()
-    
-    # Draw a simple store/shop icon
-    # Roof
-    for x in range(3, 13):
-        pixels[x, 3] = rgb_color
-    for x in range(2, 14):
-        pixels[x, 4] = rgb_color
-    
-    # Building
-    for y in range(5, 13):
-        for x in range(4, 12):
-            pixels[x, y] = rgb_color
-    
-    # Door
-    for y in range(9, 13):
-        for x in range(6, 10):
-            pixels[x, y] = (0, 0, 0, 255)
-    
-    # Door handle
-    pixels[8, 11] = (255, 255, 255, 255)
-    
-    # Convert to base64 for HTML display
-    buffered = BytesIO()
-    img.save(buffered, format="PNG")
-    img_str = base64.b64encode(buffered.getvalue()).decode()
+    # Payment counters over the last few months; riskier merchants get declined, fail and are flagged more
+    window_volume = volumes.window_sum(TRANSACTION_WINDOW_MONTHS)
+    risk = merchants_df['risk_score'].to_numpy(dtype=np.float64)
+    ticket_size = np.random.uniform(50, 500, num_merchants)
+    authorization_share = np.clip(0.97 - 0.12 * risk + np.random.normal(0, 0.01, num_merchants), 0.5, 1.0)
+    completion_share = np.clip(0.99 - 0.05 * risk, 0.5, 1.0)
+    successes = np.floor(window_volume / ticket_size)
+    authorizations = np.ceil(successes / completion_share)
+    attempts = np.ceil(authorizations / authorization_share)
+    fraud_flags = np.random.binomial(attempts.astype(np.int64), 0.002 + 0.04 * risk)
+    merchants_df = with_transaction_counters(merchants_df, pd.DataFrame({
+        'attempts': attempts,
+        'successes': successes,
+        'authorizations': authorizations,
+        'fraud_flags': fraud_flags
+    }), window_volume)
+
+    return merchants_df, volumes
+
+# Mock data loader for the dataset refresher; every call produces a new, compacted version
+def load_mock_dataset(loaded_version, num_merchants=100):
+    from data.compaction import compact_dataset, memory_report
+    
+    raw_merchants_df, raw_volumes = generate_mock_data(num_merchants)
+    merchants_df, volumes = compact_dataset(raw_merchants_df, raw_volumes)
+    # Version tag used to key downstream caches to this copy of the data
+    dataset_version = f"mock-{num_merchants}-{datetime.datetime.now():%Y%m%d%H%M%S}"
+    report = memory_report(
+        {'merchants': raw_merchants_df, 'volumes': raw_volumes},
+        {'merchants': merchants_df, 'volumes': volumes}
+    )
+    return merchants_df, volumes, dataset_version, {'memory_report': report}
+
+# Indexes and pre-aggregates built for each new version before it is swapped in
+def build_derived_data(merchants_df, volumes, metadata, previous=None):
+    from data.backends import frame_backend
+    from utils.anomalies import VolumeAnomalyDetector
+    
+    # Every query the page makes goes through the backend; SQLite stores bring their own
+    backend = metadata.get('backend') or frame_backend(merchants_df, volumes, engine=ENGINE)
+    
+    # The detector carries over from the previous version with its alert queue; only its last
+    # month and later ones (plus their baseline window) are read and scored, one chunk of
+    # merchants at a time, so even the first full scan never holds the whole history
+    anomaly_detector = previous.derived.get('anomaly_detector') if previous is not None else None
+    if anomaly_detector is None:
+        anomaly_detector = VolumeAnomalyDetector()
+    anomaly_detector.scan_chunks(
+        (chunk.merchant_ids.to_numpy(), chunk.values, chunk.months)
+        for chunk in backend.iter_volume_chunks(since_month=anomaly_detector.first_month_needed())
+    )
     
-    return f"data:image/png;base64,{img_str}"
+    return {
+        'backend': backend,
+        'anomaly_detector': anomaly_detector,
+        'manager_workload': backend.manager_workload()
+    }
+
+# One refresher per server process; the first snapshot loads synchronously, later ones in the background
+@st.cache_resource(show_spinner=False)
+def get_dataset_refresher():
+    from data.refresh import DatasetRefresher, shared_store_loader
+    
+    if DATABASE_DIR:
+        from data.sqlite_backend import sqlite_loader
+        loader = sqlite_loader(DATABASE_DIR)
+    elif SHARED_STORE_DIR:
+        loader = shared_store_loader(SHARED_STORE_DIR)
+    else:
+        loader = load_mock_dataset
+    
+    # Events are folded into in-memory data; a SQLite store is queried as published
+    if EVENT_LOG_PATH and not DATABASE_DIR:
+        from data.events import EventIngestor, event_stream_loader
+        if not SHARED_STORE_DIR:
+            # Generate the mock merchants once; new versions then only come from new events
+            loader = lambda loaded_version: None if loaded_version else load_mock_dataset(loaded_version)
+        loader = event_stream_loader(loader, EventIngestor(EVENT_LOG_PATH, EVENT_CHECKPOINT_PATH))
+    
+    refresher = DatasetRefresher(loader, build_derived=build_derived_data, interval_seconds=REFRESH_SECONDS)
+    refresher.refresh_now()
+    refresher.start()
+    return refresher
+
+# Run the what-if churn simulation, cached per dataset version, filters and multipliers
+@st.cache_data(show_spinner="Simulating churn scenarios...", max_entries=32)
+def run_churn_simulation(dataset_version, filters, category_multipliers, segment_multipliers,
+                         factor_multipliers, n_scenarios, _backend):
+    from utils.simulation import churn_probabilities, simulate_lost_volume
+    # Only the columns the simulation reads, fetched on a cache miss
+    _merchants_df = _backend.frame(filters, columns=[
+        'risk_score', 'risk_category', 'segment', 'account_manager', 'risk_factors', 'monthly_volume_avg'
+    ])
+    probabilities = churn_probabilities(
+        _merchants_df,
+        category_multipliers=dict(category_multipliers),
+        segment_multipliers=dict(segment_multipliers),
+        factor_multipliers=dict(factor_multipliers)
+    )
+    return simulate_lost_volume(_merchants_df, probabilities, n_scenarios=n_scenarios)
+
+# Kaplan-Meier retention curves, cached per dataset version, filters and grouping
+@st.cache_data(show_spinner=False, max_entries=64)
+def compute_survival_curves(dataset_version, filters, group_by, _backend):
+    from utils.retention import kaplan_meier
+    group_column = 'onboarding_date' if group_by == 'onboarding_cohort' else group_by
+    _merchants_df = _backend.frame(filters, columns=['tenure', 'risk_score', group_column])
+    if group_by == 'onboarding_cohort':
+        groups = _merchants_df['onboarding_date'].dt.strftime('%Y-%m')
+    else:
+        groups = _merchants_df[group_by]
+    # Until churn dates are wired in, each merchant contributes its risk score
+    # as a fractional churn event at its current tenure (expected retention)
+    return kaplan_meier(
+        _merchants_df['tenure'].to_numpy(),
+        _merchants_df['risk_score'].to_numpy(),
+        groups=groups.to_numpy()
+    )
+
+# Onboarding-cohort retention matrix, cached per dataset version
+@st.cache_data(show_spinner=False, max_entries=8)
+def compute_cohort_matrix(dataset_version, metric, _backend):
+    return _backend.cohort_matrix(metric)
 
 # Create a pixelated data visualization
 def create_pixel_chart(data, color='cyan', height=100, width=200):
+    from PIL import Image
+    
     # Create an empty image
     img = Image.new('RGBA', (width, height), (0, 0, 0, 0))
     pixels = img.load()
@@ -532,196 +412,36 @@ def create_pixel_chart(data, color='cyan', height=100, width=200):
     
     return f"data:image/png;base64,{img_str}"
 
-# Main application
-def main():
-    local_css()
-    
-    # Generate mock data
-    merchants_df, volumes_df = generate_mock_data(100)
-    
-    # Application title
-    st.markdown("<h1>PAYPLUG CHURN RISK RADAR 🕹️</h1>", unsafe_allow_html=True)
-    
-    # Arcade marquee
-    st.markdown("""
-    <div class="marquee">
-        <div class="marquee-content">
-            ALERT! 15 MERCHANTS AT HIGH RISK • ACCOUNT MANAGERS ACTIVATE RETENTION PROTOCOLS • NEW HIGH SCORE: SAMANTHA LEE - 98% RETENTION RATE
-        </div>
-    </div>
-    """, unsafe_allow_html=True)
-    
-    # Sidebar with filters
-    st.sidebar.markdown("<h2>CONTROL PANEL</h2>", unsafe_allow_html=True)
-    
-    # Time filter
-    st.sidebar.markdown("### 📅 TIME PERIOD")
-    time_period = st.sidebar.selectbox(
-        "Select Period:",
-        ["Current Month", "Last 3 Months", "Last 6 Months", "Year To Date", "All Time"]
-    )
-    
-    # Segment filters
-    st.sidebar.markdown("### 🏢 MERCHANT SEGMENTS")
-    
-    selected_industries = st.sidebar.multiselect(
-        "Industry:",
-        options=merchants_df['industry'].unique(),
-        default=merchants_df['industry'].unique()
-    )
-    
-    selected_segments = st.sidebar.multiselect(
-        "Size Segment:",
-        options=merchants_df['segment'].unique(),
-        default=merchants_df['segment'].unique()
-    )
-    
-    # Account Manager filter
-    st.sidebar.markdown("### 👥 ACCOUNT MANAGERS")
-    selected_managers = st.sidebar.multiselect(
-        "Account Manager:",
-        options=merchants_df['account_manager'].unique(),
-        default=merchants_df['account_manager'].unique()
-    )
-    
-    # Risk level filter
-    st.sidebar.markdown("### ⚠️ RISK LEVEL")
-    selected_risk = st.sidebar.multiselect(
-        "Risk Category:",
-        options=["High", "Medium", "Low"],
-        default=["High", "Medium", "Low"]
-    )
-    
-    # Apply filters to data
-    filtered_df = merchants_df[
-        merchants_df['industry'].isin(selected_industries) &
-        merchants_df['segment'].isin(selected_segments) &
-        merchants_df['account_manager'].isin(selected_managers) &
-        merchants_df['risk_category'].isin(selected_risk)
-    ]
-    
-    # Dashboard metrics
-    st.markdown("## CURRENT STATUS")
-    
-    col1, col2, col3, col4 = st.columns(4)
-    
-    with col1:
-        high_risk_count = len(filtered_df[filtered_df['risk_category'] == 'High'])
-        st.markdown(f"""
-        <div class="metric-card">
-            <div class="metric-label">HIGH RISK MERCHANTS</div>
-            <div class="metric-value high-risk">{high_risk_count}</div>
-        </div>
-        """, unsafe_allow_html=True)
-        
-    with col2:
-        medium_risk_count = len(filtered_df[filtered_df['risk_category'] == 'Medium'])
-        st.markdown(f"""
-        <div class="metric-card">
-            <div class="metric-label">MEDIUM RISK MERCHANTS</div>
-            <div class="metric-value medium-risk">{medium_risk_count}</div>
-        </div>
-        """, unsafe_allow_html=True)
-        
-    with col3:
-        at_risk_volume = filtered_df[filtered_df['risk_category'].isin(['High', 'Medium'])]['monthly_volume_avg'].sum()
-        st.markdown(f"""
-        <div class="metric-card">
-            <div class="metric-label">AT-RISK VOLUME</div>
-            <div class="metric-value">${at_risk_volume:,}</div>
-        </div>
-        """, unsafe_allow_html=True)
-        
-    with col4:
-        avg_risk_score = filtered_df['risk_score'].mean()
-        st.markdown(f"""
-        <div class="metric-card">
-            <div class="metric-label">AVG RISK SCORE</div>
-            <div class="metric-value">{avg_risk_score:.2f}</div>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    # Risk factors bar chart
-    st.markdown("## TOP RISK FACTORS")
-    
-    # Extract all risk factors and count occurrences
-    all_factors = []
-    for factors in filtered_df['risk_factors']:
-        all_factors.extend(factors)
-    
-    if all_factors:
-        factor_counts = pd.Series(all_factors).value_counts().reset_index()
-        factor_counts.columns = ['Risk Factor', 'Count']
-        
-        fig = px.bar(
-            factor_counts.head(5), 
-            x='Count', 
-            y='Risk Factor',
-            orientation='h',
-            color_discrete_sequence=['#01EDED'],
-            labels={'Count': 'Number of Merchants'}
-        )
-        
-        fig.update_layout(
-            paper_bgcolor='rgba(0,0,0,0)',
-            plot_bgcolor='rgba(0,0,0,0)',
-            font=dict(family="VT323", size=16, color="#F5F5F5"),
-            yaxis_title=None,
-            xaxis_title=None,
-            margin=dict(l=0, r=10, t=10, b=0),
-            height=300
-        )
-        
-        fig.update_traces(marker_line_width=2, marker_line_color="#120458")
-        fig.update_xaxes(gridcolor='#333333', gridwidth=0.5)
-        fig.update_yaxes(gridcolor='#333333', gridwidth=0.5)
-        
-        st.plotly_chart(fig, use_container_width=True)
-    else:
-        st.info("No risk factors found with current filters.")
-    
-    # Merchant list with risk scoring
-    st.markdown("## MERCHANT RISK LEADERBOARD")
-    
-    # Sort by risk score (descending)
-    sorted_merchants = filtered_df.sort_values('risk_score', ascending=False).reset_index(drop=True)
-    
-    # Add styling to the table based on risk category
-    def color_risk(val):
-        if val == 'High':
-            return 'color: #FF0000; font-weight: bold'
-        elif val == 'Medium':
-            return 'color: #FF9933; font-weight: bold'
-        else:
-            return 'color: #50FC00; font-weight: bold'
-    
-    # Select columns to display
-    display_cols = ['merchant_name', 'risk_category', 'risk_score', 'account_manager', 
-                    'industry', 'segment', 'tenure', 'monthly_volume_avg']
-    
-    # Format and display the table
-    display_df = sorted_merchants[display_cols].copy()
-    display_df.columns = ['Merchant Name', 'Risk Level', 'Risk Score', 'Account Manager', 
-                         'Industry', 'Segment', 'Tenure (Months)', 'Avg Monthly Volume ($)']
-    
-    # Format the risk score and volume columns
-    display_df['Risk Score'] = display_df['Risk Score'].map(lambda x: f"{x:.2f}")
-    display_df['Avg Monthly Volume ($)'] = display_df['Avg Monthly Volume ($)'].map(lambda x: f"${x:,}")
-    
-    # Apply styling and display
-    styled_df = display_df.style.applymap(color_risk, subset=['Risk Level'])
-    st.dataframe(styled_df, use_container_width=True, height=400)
-    
-    # Merchant detail view
-    st.markdown("## MERCHANT DEEP DIVE")
-    
-    selected_merchant = st.selectbox(
-        "Select Merchant to Analyze:",
-        options=sorted_merchants['merchant_name'].tolist()
-    )
+# Whole filtered leaderboard as bytes, written chunk by chunk to a temporary file that is
+# closed once read (at most EXPORT_MAX_ROWS merchants, see the EXPORT button)
+def export_leaderboard_bytes(backend, filters, export_format):
+    import tempfile
+    from utils.export import export_leaderboard
+    with tempfile.TemporaryFile() as export_file:
+        export_leaderboard(backend, filters, export_file, export_format)
+        export_file.seek(0)
+        return export_file.read()
+
+# Serialized Plotly figures shared by every session of this process, keyed by dataset version
+@st.cache_resource(show_spinner=False)
+def get_figure_cache():
+    from utils.figures import FigureCache
+    return FigureCache()
+
+# Deep dive HTML fragments, rendered once per merchant and dataset version
+@st.cache_data(show_spinner=False, max_entries=512)
+def get_merchant_fragments(dataset_version, merchant_id, _merchant_data):
+    from utils.fragments import merchant_fragments
+    risk_color = "red" if _merchant_data['risk_category'] == 'High' else "orange" if _merchant_data['risk_category'] == 'Medium' else "green"
+    return merchant_fragments(_merchant_data, static_url(f'icons/merchant-{risk_color}.png'))
+
+# Profile, risk analysis and transaction history tabs for one merchant
+def render_merchant_deep_dive(merchant_data, backend, dataset_version):
+    import numpy as np
+    from utils.figures import monthly_volume_bar, risk_gauge
+    from utils.transactions import TRANSACTION_WINDOW_MONTHS
     
-    # Get the selected merchant data
-    merchant_data = sorted_merchants[sorted_merchants['merchant_name'] == selected_merchant].iloc[0]
+    fragments = get_merchant_fragments(dataset_version, merchant_data['merchant_id'], merchant_data)
     
     # Display merchant profile in tabs
     tab1, tab2, tab3 = st.tabs(["PROFILE", "RISK ANALYSIS", "TRANSACTION HISTORY"])
@@ -731,113 +451,17 @@ def main():
         
         with col1:
             # Merchant info card
-            risk_color = "red" if merchant_data['risk_category'] == 'High' else "orange" if merchant_data['risk_category'] == 'Medium' else "green"
-            
-            st.markdown(f"""
-            <div style="border: 3px solid var(--secondary); padding: 15px; margin-bottom: 20px; background-color: var(--dark);">
-                <div style="text-align: center; margin-bottom: 15px;">
-                    <img src="{create_pixel_merchant_icon(risk_color)}" style="width: 64px; height: 64px;">
-                </div>
-                <div style="font-family: 'VT323', monospace; font-size: 1.5rem; text-align: center; color: var(--secondary); margin-bottom: 10px;">
-                    {merchant_data['merchant_name']}
-                </div>
-                <div style="font-family: 'VT323', monospace; font-size: 1.2rem; margin-bottom: 5px;">
-                    <span style="color: var(--light);">Industry:</span> {merchant_data['industry']}
-                </div>
-                <div style="font-family: 'VT323', monospace; font-size: 1.2rem; margin-bottom: 5px;">
-                    <span style="color: var(--light);">Segment:</span> {merchant_data['segment']}
-                </div>
-                <div style="font-family: 'VT323', monospace; font-size: 1.2rem; margin-bottom: 5px;">
-                    <span style="color: var(--light);">Account Manager:</span> {merchant_data['account_manager']}
-                </div>
-                <div style="font-family: 'VT323', monospace; font-size: 1.2rem; margin-bottom: 5px;">
-                    <span style="color: var(--light);">Onboarded:</span> {merchant_data['onboarding_date']}
-                </div>
-                <div style="font-family: 'VT323', monospace; font-size: 1.2rem; margin-bottom: 5px;">
-                    <span style="color: var(--light);">Tenure:</span> {merchant_data['tenure']} months
-                </div>
-                <div style="font-family: 'VT323', monospace; font-size: 1.2rem; margin-bottom: 5px;">
-                    <span style="color: var(--light);">Support Tickets:</span> {merchant_data['support_tickets']}
-                </div>
-            </div>
-            """, unsafe_allow_html=True)
+            st.markdown(fragments['profile_card'], unsafe_allow_html=True)
             
         with col2:
             # Feature usage section
             st.markdown("### FEATURE USAGE LEVELS")
             
-            # One-click payment usage
-            st.markdown(f"""
-            <div style="margin-bottom: 15px;">
-                <div style="font-family: 'VT323', monospace; font-size: 1.2rem; margin-bottom: 5px; display: flex; justify-content: space-between;">
-                    <span>One-Click Payment</span>
-                    <span>{merchant_data['one_click_usage']}%</span>
-                </div>
-                <div style="height: 20px; width: 100%; background-color: #333; border: 2px solid var(--secondary);">
-                    <div style="height: 100%; width: {merchant_data['one_click_usage']}%; background-color: var(--tertiary);"></div>
-                </div>
-            </div>
-            """, unsafe_allow_html=True)
-            
-            # Subscription API usage
-            st.markdown(f"""
-            <div style="margin-bottom: 15px;">
-                <div style="font-family: 'VT323', monospace; font-size: 1.2rem; margin-bottom: 5px; display: flex; justify-content: space-between;">
-                    <span>Subscription API</span>
-                    <span>{merchant_data['subscription_api_usage']}%</span>
-                </div>
-                <div style="height: 20px; width: 100%; background-color: #333; border: 2px solid var(--secondary);">
-                    <div style="height: 100%; width: {merchant_data['subscription_api_usage']}%; background-color: var(--tertiary);"></div>
-                </div>
-            </div>
-            """, unsafe_allow_html=True)
-            
-            # Fraud Tools usage
-            st.markdown(f"""
-            <div style="margin-bottom: 15px;">
-                <div style="font-family: 'VT323', monospace; font-size: 1.2rem; margin-bottom: 5px; display: flex; justify-content: space-between;">
-                    <span>Fraud Tools</span>
-                    <span>{merchant_data['fraud_tools_usage']}%</span>
-                </div>
-                <div style="height: 20px; width: 100%; background-color: #333; border: 2px solid var(--secondary);">
-                    <div style="height: 100%; width: {merchant_data['fraud_tools_usage']}%; background-color: var(--tertiary);"></div>
-                </div>
-            </div>
-            """, unsafe_allow_html=True)
-            
-            # Mobile SDK usage
-            st.markdown(f"""
-            <div style="margin-bottom: 15px;">
-                <div style="font-family: 'VT323', monospace; font-size: 1.2rem; margin-bottom: 5px; display: flex; justify-content: space-between;">
-                    <span>Mobile SDK</span>
-                    <span>{merchant_data['mobile_sdk_usage']}%</span>
-                </div>
-                <div style="height: 20px; width: 100%; background-color: #333; border: 2px solid var(--secondary);">
-                    <div style="height: 100%; width: {merchant_data['mobile_sdk_usage']}%; background-color: var(--tertiary);"></div>
-                </div>
-            </div>
-            """, unsafe_allow_html=True)
+            st.markdown(fragments['feature_usage'], unsafe_allow_html=True)
             
             # Volume info
             st.markdown("### TRANSACTION VOLUME")
-            st.markdown(f"""
-            <div style="display: flex; justify-content: space-between; margin-bottom: 10px;">
-                <div style="font-family: 'VT323', monospace; font-size: 1.2rem;">
-                    <span style="color: var(--light);">Average Monthly:</span> 
-                    <span style="color: var(--tertiary); font-weight: bold;">${merchant_data['monthly_volume_avg']:,}</span>
-                </div>
-                <div style="font-family: 'VT323', monospace; font-size: 1.2rem;">
-                    <span style="color: var(--light);">Latest Month:</span> 
-                    <span style="color: var(--tertiary); font-weight: bold;">${merchant_data['latest_volume']:,}</span>
-                </div>
-                <div style="font-family: 'VT323', monospace; font-size: 1.2rem;">
-                    <span style="color: var(--light);">6-Month Trend:</span> 
-                    <span style="color: {'var(--tertiary)' if merchant_data['volume_trend'] >= 0 else 'var(--danger)'}; font-weight: bold;">
-                        {'+' if merchant_data['volume_trend'] >= 0 else ''}{merchant_data['volume_trend']*100:.1f}%
-                    </span>
-                </div>
-            </div>
-            """, unsafe_allow_html=True)
+            st.markdown(fragments['volume_summary'], unsafe_allow_html=True)
             
     with tab2:
         col1, col2 = st.columns([1, 1])
@@ -845,66 +469,18 @@ def main():
         with col1:
             # Risk score gauge chart
             risk_score = merchant_data['risk_score']
-            risk_gauge = go.Figure(go.Indicator(
-                mode = "gauge+number",
-                value = risk_score,
-                domain = {'x': [0, 1], 'y': [0, 1]},
-                title = {'text': "RISK SCORE", 'font': {'family': "Press Start 2P", 'size': 16}},
-                gauge = {
-                    'axis': {'range': [0, 1], 'tickwidth': 2, 'tickcolor': "#F5F5F5"},
-                    'bar': {'color': "#01EDED"},
-                    'bgcolor': "black",
-                    'borderwidth': 2,
-                    'bordercolor': "#01EDED",
-                    'steps': [
-                        {'range': [0, 0.4], 'color': '#50FC00'},
-                        {'range': [0.4, 0.7], 'color': '#FF9933'},
-                        {'range': [0.7, 1], 'color': '#FF0000'}
-                    ],
-                    'threshold': {
-                        'line': {'color': "white", 'width': 4},
-                        'thickness': 0.75,
-                        'value': risk_score
-                    }
-                },
-                number = {'font': {'family': "Press Start 2P", 'size': 24}}
-            ))
-            
-            risk_gauge.update_layout(
-                paper_bgcolor='rgba(0,0,0,0)',
-                plot_bgcolor='rgba(0,0,0,0)',
-                font=dict(family="VT323", size=16, color="#F5F5F5"),
-                margin=dict(l=20, r=20, t=50, b=20),
-                height=300
+            fig = get_figure_cache().figure(
+                ('risk_gauge', merchant_data['merchant_id'], dataset_version), lambda: risk_gauge(risk_score)
             )
             
-            st.plotly_chart(risk_gauge, use_container_width=True)
+            st.plotly_chart(fig, use_container_width=True)
             
         with col2:
             # Risk factors list
             st.markdown("### ACTIVE RISK FACTORS")
             
-            if merchant_data['risk_factors']:
-                for i, factor in enumerate(merchant_data['risk_factors']):
-                    severity = random.randint(70, 100) if merchant_data['risk_category'] == 'High' else random.randint(40, 70)
-                    
-                    st.markdown(f"""
-                    <div style="margin-bottom: 15px;">
-                        <div style="font-family: 'VT323', monospace; font-size: 1.2rem; margin-bottom: 5px; display: flex; justify-content: space-between;">
-                            <span>{factor}</span>
-                            <span>Severity: {severity}%</span>
-                        </div>
-                        <div style="height: 20px; width: 100%; background-color: #333; border: 2px solid var(--secondary);">
-                            <div style="height: 100%; width: {severity}%; background-color: {'var(--danger)' if severity >= 70 else 'var(--warning)'};"></div>
-                        </div>
-                    </div>
-                    """, unsafe_allow_html=True)
-            else:
-                st.markdown("""
-                <div style="font-family: 'VT323', monospace; font-size: 1.5rem; text-align: center; color: var(--tertiary); padding: 50px 0;">
-                    NO ACTIVE RISK FACTORS DETECTED
-                </div>
-                """, unsafe_allow_html=True)
+            # Severity follows the merchant's risk score, so it is the same on every rerun
+            st.markdown(fragments['risk_factors'], unsafe_allow_html=True)
         
         # Recommendations section
         st.markdown("### RECOMMENDED ACTIONS")
@@ -956,61 +532,17 @@ def main():
             """, unsafe_allow_html=True)
     
     with tab3:
-        # Generate some mock monthly volume data
-        months = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
-        
-        # Create data with trend based on risk category
-        base_volume = merchant_data['monthly_volume_avg']
-        monthly_data = []
-        
-        for i in range(12):
-            if merchant_data['risk_category'] == 'High' and i >= 8:
-                # High risk merchants show declining volume in recent months
-                decline_factor = 1 - 0.1 * (i - 7)
-                volume = int(base_volume * max(0.6, decline_factor))
-            elif merchant_data['risk_category'] == 'Medium' and i >= 9:
-                # Medium risk merchants show slight decline in very recent months
-                volume = int(base_volume * 0.9)
-            else:
-                # Normal variation
-                variation = np.random.normal(0, 0.1)
-                volume = int(base_volume * (1 + variation))
-            
-            monthly_data.append(volume)
+        # This merchant's row of the volume matrix; trends are slices of it
+        history = backend.merchant_volumes([merchant_data['merchant_id']])
+        months = history.month_labels()
+        monthly_data = history.values[0]
         
         # Create a Plotly figure for the transaction volume
-        fig = go.Figure()
-        
-        # Add volume bars
-        fig.add_trace(go.Bar(
-            x=months,
-            y=monthly_data,
-            marker_color='#01EDED',
-            marker_line_color='#120458',
-            marker_line_width=2,
-            opacity=0.8,
-            name="Monthly Volume"
-        ))
-        
-        # Customize layout
-        fig.update_layout(
-            title={
-                'text': "MONTHLY TRANSACTION VOLUME",
-                'font': {'family': "Press Start 2P", 'size': 18, 'color': "#01EDED"},
-                'y': 0.95
-            },
-            paper_bgcolor='rgba(0,0,0,0)',
-            plot_bgcolor='rgba(0,0,0,0)',
-            font=dict(family="VT323", size=16, color="#F5F5F5"),
-            xaxis_title=None,
-            yaxis_title="Volume ($)",
-            margin=dict(l=40, r=40, t=80, b=40),
-            height=400
+        fig = get_figure_cache().figure(
+            ('monthly_volume', merchant_data['merchant_id'], dataset_version),
+            lambda: monthly_volume_bar(months, monthly_data)
         )
         
-        fig.update_xaxes(gridcolor='#333333', gridwidth=0.5)
-        fig.update_yaxes(gridcolor='#333333', gridwidth=0.5)
-        
         st.plotly_chart(fig, use_container_width=True)
         
         # Transaction trends insights
@@ -1018,10 +550,15 @@ def main():
         
         with col1:
             # Calculate volume metrics
-            recent_trend = (monthly_data[-1] / monthly_data[-3] - 1) * 100
-            overall_trend = (monthly_data[-1] / monthly_data[0] - 1) * 100
-            peak_volume = max(monthly_data)
-            peak_month = months[monthly_data.index(peak_volume)]
+            recent_trend = history.trend(3)[0] * 100
+            overall_trend = history.trend(len(months))[0] * 100
+            # Months without data count as zero volume
+            filled = np.nan_to_num(monthly_data)
+            peak_index = int(filled.argmax())
+            peak_volume = int(filled[peak_index])
+            peak_month = months[peak_index]
+            avg_transaction_size = merchant_data['avg_transaction_size']
+            avg_transaction_label = "n/a" if np.isnan(avg_transaction_size) else f"${avg_transaction_size:,.0f}"
             
             st.markdown("### VOLUME TRENDS")
             st.markdown(f"""
@@ -1048,7 +585,7 @@ def main():
                 </div>
                 <div class="high-score">
                     <span class="high-score-name">Average Transaction Size:</span>
-                    <span class="high-score-value">${random.randint(50, 500)}</span>
+                    <span class="high-score-value">{avg_transaction_label}</span>
                 </div>
             </div>
             """, unsafe_allow_html=True)
@@ -1057,45 +594,553 @@ def main():
             # Transaction success rates
             st.markdown("### TRANSACTION SUCCESS")
             
-            # Generate mock success rate data
-            success_rate = 0.94 if merchant_data['risk_category'] == 'Low' else 0.9 if merchant_data['risk_category'] == 'Medium' else 0.85
-            authorization_rate = 0.96 if merchant_data['risk_category'] == 'Low' else 0.93 if merchant_data['risk_category'] == 'Medium' else 0.88
-            fraud_rate = 0.01 if merchant_data['risk_category'] == 'Low' else 0.03 if merchant_data['risk_category'] == 'Medium' else 0.05
+            # Rates over the trailing window of payment attempts (see utils/transactions.py)
+            st.caption(
+                f"{int(merchant_data['attempts']):,} payment attempts over the last "
+                f"{TRANSACTION_WINDOW_MONTHS} months"
+            )
             
-            st.markdown(f"""
-            <div style="border: 3px solid var(--secondary); padding: 15px; margin-bottom: 20px; background-color: var(--dark);">
-                <div style="margin-bottom: 15px;">
-                    <div style="font-family: 'VT323', monospace; font-size: 1.2rem; margin-bottom: 5px; display: flex; justify-content: space-between;">
-                        <span>Transaction Success Rate</span>
-                        <span>{success_rate*100:.1f}%</span>
-                    </div>
-                    <div style="height: 20px; width: 100%; background-color: #333; border: 2px solid var(--secondary);">
-                        <div style="height: 100%; width: {success_rate*100}%; background-color: var(--tertiary);"></div>
-                    </div>
-                </div>
+            st.markdown(fragments['transaction_rates'], unsafe_allow_html=True)
+
+# Main application
+def main():
+    # Per-section timings; payload sizes are only measured when someone will look at them
+    debug_enabled = st.query_params.get("debug") == "1" or os.environ.get("CHURN_DASHBOARD_DEBUG") == "1"
+    timing_log_path = os.environ.get("CHURN_DASHBOARD_TIMING_LOG")
+    profiler = RunProfiler(track_payload=debug_enabled or bool(timing_log_path))
+    
+    profiler.begin("styling")
+    local_css()
+    
+    # Application title
+    st.markdown("<h1>PAYPLUG CHURN RISK RADAR 🕹️</h1>", unsafe_allow_html=True)
+    
+    # Reserve the marquee's slot; it is filled once the KPIs are on screen
+    marquee_slot = st.empty()
+    
+    profiler.begin("data_load")
+    import plotly.graph_objects as go
+    from data.backends import ALL_MERCHANTS, MerchantFilters
+    from utils.metrics import format_leaderboard, style_leaderboard
+    from utils.export import EXPORT_FORMATS, EXPORT_MIME_TYPES, export_command
+    from utils.figures import risk_factor_bar, risk_history_area
+    from utils.fragments import metric_card
+    # Load mock data
+    # Each session stays on the snapshot it started with until it asks for the latest one,
+    # and every rerun reads a single snapshot, so one page never mixes two versions
+    refresher = get_dataset_refresher()
+    snapshot = refresher.get(st.session_state.get('dataset_version')) or refresher.current()
+    st.session_state['dataset_version'] = snapshot.version
+    dataset_version = snapshot.version
+    # In-memory frames or a SQLite database, behind the same queries
+    backend = snapshot.derived['backend']
+    
+    profiler.begin("filters")
+    # Sidebar with filters
+    st.sidebar.markdown("<h2>CONTROL PANEL</h2>", unsafe_allow_html=True)
+    
+    # Time filter
+    st.sidebar.markdown("### 📅 TIME PERIOD")
+    time_period = st.sidebar.selectbox(
+        "Select Period:",
+        ["Current Month", "Last 3 Months", "Last 6 Months", "Year To Date", "All Time"]
+    )
+    
+    # Segment filters
+    st.sidebar.markdown("### 🏢 MERCHANT SEGMENTS")
+    
+    industry_options = backend.distinct('industry')
+    selected_industries = st.sidebar.multiselect(
+        "Industry:",
+        options=industry_options,
+        default=industry_options
+    )
+    
+    segment_options = backend.distinct('segment')
+    selected_segments = st.sidebar.multiselect(
+        "Size Segment:",
+        options=segment_options,
+        default=segment_options
+    )
+    
+    # Account Manager filter, or a single manager's book in portfolio mode
+    st.sidebar.markdown("### 👥 ACCOUNT MANAGERS")
+    manager_options = backend.distinct('account_manager')
+    workload_df = snapshot.derived['manager_workload']
+    
+    view_mode = st.sidebar.radio(
+        "View Mode:",
+        options=["All Merchants", "My Portfolio"]
+    )
+    
+    if view_mode == "My Portfolio":
+        portfolio_manager = st.sidebar.selectbox(
+            "Account Manager:",
+            options=manager_options
+        )
+        # A single manager reads only that manager's rows (partition slice or index range)
+        selected_managers = [portfolio_manager]
+    else:
+        portfolio_manager = None
+        selected_managers = st.sidebar.multiselect(
+            "Account Manager:",
+            options=manager_options,
+            default=manager_options
+        )
+    
+    # Risk level filter
+    st.sidebar.markdown("### ⚠️ RISK LEVEL")
+    selected_risk = st.sidebar.multiselect(
+        "Risk Category:",
+        options=["High", "Medium", "Low"],
+        default=["High", "Medium", "Low"]
+    )
+    
+    render_data_freshness(refresher, snapshot)
+    
+    # Hashable sidebar state: passed to every backend query and used to key cached computations
+    filters = MerchantFilters(
+        tuple(sorted(selected_industries)),
+        tuple(sorted(selected_segments)),
+        tuple(sorted(selected_managers)),
+        tuple(sorted(selected_risk))
+    )
+    merchant_count = backend.count(filters)
+    
+    profiler.begin("kpis")
+    # Dashboard metrics
+    st.markdown("## CURRENT STATUS")
+    
+    col1, col2, col3, col4 = st.columns(4)
+    kpis = backend.kpis(filters)
+    
+    with col1:
+        st.markdown(metric_card("HIGH RISK MERCHANTS", f"{kpis['high_risk_count']}", 'high-risk'), unsafe_allow_html=True)
+        
+    with col2:
+        st.markdown(metric_card("MEDIUM RISK MERCHANTS", f"{kpis['medium_risk_count']}", 'medium-risk'), unsafe_allow_html=True)
+        
+    with col3:
+        st.markdown(metric_card("AT-RISK VOLUME", f"${kpis['at_risk_volume']:,}"), unsafe_allow_html=True)
+        
+    with col4:
+        st.markdown(metric_card("AVG RISK SCORE", f"{kpis['avg_risk_score']:.2f}"), unsafe_allow_html=True)
+    
+    profiler.begin("marquee")
+    # Anomalies were scanned when this dataset version was loaded
+    anomaly_detector = snapshot.derived['anomaly_detector']
+    queued_alerts = anomaly_detector.latest()
+    # Names are only looked up for merchants with a queued alert
+    merchant_names = backend.merchant_names({alert.merchant_id for alert in queued_alerts})
+    
+    # Arcade marquee, fed by the alert queue
+    total_high_risk = backend.count(ALL_MERCHANTS._replace(risk_categories=('High',)))
+    marquee_items = [f"ALERT! {total_high_risk} MERCHANTS AT HIGH RISK"]
+    marquee_items += [
+        f"{merchant_names.get(alert.merchant_id, alert.merchant_id).upper()} VOLUME {alert.pct_change*100:+.0f}% IN {alert.month}"
+        for alert in queued_alerts[:5]
+    ]
+    marquee_items.append("ACCOUNT MANAGERS ACTIVATE RETENTION PROTOCOLS")
+    
+    marquee_slot.markdown(f"""
+    <div class="marquee">
+        <div class="marquee-content">
+            {' • '.join(marquee_items)}
+        </div>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    profiler.begin("alerts")
+    # Live volume anomaly alerts for the filtered merchants
+    st.markdown("## LIVE ALERTS")
+    
+    alerts = anomaly_detector.latest(
+        limit=10, merchant_ids=backend.matching_ids(filters, {alert.merchant_id for alert in queued_alerts})
+    )
+    
+    if alerts:
+        # Rows are joined without blank lines so the markdown parser keeps one HTML block
+        alert_rows = "".join(
+            f'<div class="high-score">'
+            f'<span class="high-score-name">{alert.month} • {merchant_names.get(alert.merchant_id, alert.merchant_id)}</span>'
+            f'<span class="high-score-value" style="color: {"var(--danger)" if alert.pct_change <= -0.3 else "var(--warning)"};">'
+            f'{alert.pct_change*100:+.1f}%</span>'
+            f'</div>'
+            for alert in alerts
+        )
+        st.markdown(f"""
+        <div style="border: 3px solid var(--primary); padding: 15px; margin-bottom: 20px; background-color: var(--dark);">
+            {alert_rows}
+        </div>
+        """, unsafe_allow_html=True)
+    else:
+        st.info("No volume anomalies detected for current filters.")
+    
+    profiler.begin("workload")
+    # Manager comparison, read from the workload pre-aggregates
+    st.markdown("## ACCOUNT MANAGER WORKLOAD")
+    
+    col1, col2 = st.columns([2, 1])
+    
+    with col1:
+        fig = go.Figure()
+        for category, column, color in [("High", 'high_risk', '#FF0000'),
+                                        ("Medium", 'medium_risk', '#FF9933'),
+                                        ("Low", 'low_risk', '#50FC00')]:
+            fig.add_trace(go.Bar(
+                x=workload_df.index,
+                y=workload_df[column],
+                marker_color=color,
+                marker_line_color='#120458',
+                marker_line_width=[4 if manager == portfolio_manager else 2 for manager in workload_df.index],
+                name=f"{category} Risk"
+            ))
+        
+        fig.update_layout(
+            barmode='stack',
+            paper_bgcolor='rgba(0,0,0,0)',
+            plot_bgcolor='rgba(0,0,0,0)',
+            font=dict(family="VT323", size=16, color="#F5F5F5"),
+            xaxis_title=None,
+            yaxis_title="Merchants",
+            margin=dict(l=40, r=10, t=10, b=0),
+            legend=dict(
+                font=dict(family="VT323", size=16, color="#F5F5F5"),
+                bgcolor="rgba(0,0,0,0.5)",
+                bordercolor="#01EDED",
+                borderwidth=2
+            ),
+            height=300
+        )
+        
+        fig.update_xaxes(gridcolor='#333333', gridwidth=0.5)
+        fig.update_yaxes(gridcolor='#333333', gridwidth=0.5)
+        
+        st.plotly_chart(fig, use_container_width=True)
+    
+    with col2:
+        workload_rows = "".join(
+            f'<div class="high-score">'
+            f'<span class="high-score-name" style="{"color: var(--primary);" if manager == portfolio_manager else ""}">{manager}</span>'
+            f'<span class="high-score-value">${row.at_risk_volume:,} • {row.open_actions}</span>'
+            f'</div>'
+            for manager, row in workload_df.iterrows()
+        )
+        st.markdown(f"""
+        <div style="border: 3px solid var(--secondary); padding: 15px; margin-bottom: 20px; background-color: var(--dark);">
+            <div class="metric-label" style="margin-bottom: 10px;">AT-RISK VOLUME • OPEN ACTIONS</div>
+            {workload_rows}
+        </div>
+        """, unsafe_allow_html=True)
+    
+    profiler.begin("risk_factors")
+    # Risk factors bar chart
+    st.markdown("## TOP RISK FACTORS")
+    
+    # Count risk factor occurrences
+    factor_counts = backend.risk_factor_counts(filters)
+    
+    if not factor_counts.empty:
+        fig = get_figure_cache().figure(
+            ('risk_factors', filters, dataset_version), lambda: risk_factor_bar(factor_counts)
+        )
+        st.plotly_chart(fig, use_container_width=True)
+    else:
+        st.info("No risk factors found with current filters.")
+    
+    profiler.begin("leaderboard")
+    # Merchant list with risk scoring
+    st.markdown("## MERCHANT RISK LEADERBOARD")
+    
+    # Highest risk score first, fetched one page at a time
+    num_pages = max(1, -(-merchant_count // LEADERBOARD_PAGE_SIZE))
+    if num_pages > 1:
+        page = st.number_input("Page:", min_value=1, max_value=num_pages, value=1, step=1) - 1
+    else:
+        page = 0
+    page_merchants = backend.leaderboard_page(filters, page, LEADERBOARD_PAGE_SIZE)
+    
+    # Format, style and display the table
+    display_df = format_leaderboard(page_merchants)
+    styled_df = style_leaderboard(display_df)
+    st.dataframe(styled_df, use_container_width=True, height=400)
+    if num_pages > 1:
+        first_rank = page * LEADERBOARD_PAGE_SIZE + 1
+        st.caption(f"Merchants {first_rank:,}-{first_rank + len(page_merchants) - 1:,} of {merchant_count:,}")
+    
+    # Export every filtered merchant, not just this page; the file is only built when clicked
+    format_col, download_col = st.columns([1, 3])
+    with format_col:
+        export_format = st.selectbox("Export Format:", options=EXPORT_FORMATS, format_func=str.upper)
+    with download_col:
+        if merchant_count <= EXPORT_MAX_ROWS:
+            st.download_button(
+                f"⬇ EXPORT {merchant_count:,} MERCHANTS",
+                data=lambda: export_leaderboard_bytes(backend, filters, export_format),
+                file_name=f"merchant-leaderboard.{export_format}",
+                mime=EXPORT_MIME_TYPES[export_format],
+                on_click="ignore"
+            )
+        else:
+            # Too large to buffer in the server's memory; the CLI streams it straight to disk.
+            # Fully selected filters are left out of the command, as they keep everything
+            all_options = (industry_options, segment_options, manager_options, ["High", "Medium", "Low"])
+            command_filters = MerchantFilters(*(
+                None if set(values) == set(options) else values for values, options in zip(filters, all_options)
+            ))
+            st.info(f"{merchant_count:,} merchants is more than the {EXPORT_MAX_ROWS:,} the dashboard exports. "
+                    f"Narrow the filters, or export them with:")
+            st.code(export_command(command_filters, f"merchant-leaderboard.{export_format}", export_format,
+                                   store_dir=SHARED_STORE_DIR, database_dir=DATABASE_DIR), language='bash')
+    
+    profiler.begin("deep_dive")
+    # Merchant detail view
+    st.markdown("## MERCHANT DEEP DIVE")
+    
+    # Merchants on the current leaderboard page
+    selected_merchant = st.selectbox(
+        "Select Merchant to Analyze:",
+        options=page_merchants['merchant_name'].tolist()
+    )
+    
+    if selected_merchant is None:
+        st.info("No merchants match the current filters.")
+    else:
+        # Get the selected merchant data
+        merchant_data = page_merchants[page_merchants['merchant_name'] == selected_merchant].iloc[0]
+        render_merchant_deep_dive(merchant_data, backend, dataset_version)
+    
+    profiler.begin("retention_curves")
+    # Tenure-based retention curves
+    st.markdown("## RETENTION CURVES")
+    
+    survival_groupings = {
+        "Segment": 'segment',
+        "Industry": 'industry',
+        "Onboarding Cohort": 'onboarding_cohort'
+    }
+    survival_group_label = st.radio(
+        "Group Curves By:",
+        options=list(survival_groupings.keys()),
+        horizontal=True
+    )
+    
+    if merchant_count > 0:
+        survival_df = compute_survival_curves(
+            dataset_version, filters, survival_groupings[survival_group_label], backend
+        )
+        
+        curve_colors = ['#01EDED', '#FF355E', '#50FC00', '#FFDA00', '#FF9933', '#F5F5F5', '#B967FF']
+        
+        fig = go.Figure()
+        for i, group in enumerate(survival_df.columns):
+            fig.add_trace(go.Scatter(
+                x=survival_df.index, y=survival_df[group] * 100,
+                mode='lines',
+                line=dict(width=3, shape='hv', color=curve_colors[i % len(curve_colors)]),
+                name=str(group)
+            ))
+        
+        fig.update_layout(
+            title={
+                'text': "EXPECTED RETENTION BY TENURE",
+                'font': {'family': "Press Start 2P", 'size': 18, 'color': "#01EDED"},
+                'y': 0.95
+            },
+            paper_bgcolor='rgba(0,0,0,0)',
+            plot_bgcolor='rgba(0,0,0,0)',
+            font=dict(family="VT323", size=16, color="#F5F5F5"),
+            xaxis_title="Tenure (Months)",
+            yaxis_title="Merchants Retained (%)",
+            margin=dict(l=40, r=40, t=80, b=40),
+            legend=dict(
+                font=dict(family="VT323", size=16, color="#F5F5F5"),
+                bgcolor="rgba(0,0,0,0.5)",
+                bordercolor="#01EDED",
+                borderwidth=2
+            ),
+            height=400
+        )
+        
+        fig.update_xaxes(gridcolor='#333333', gridwidth=0.5)
+        fig.update_yaxes(gridcolor='#333333', gridwidth=0.5, range=[0, 100])
+        
+        st.plotly_chart(fig, use_container_width=True)
+        st.caption("Kaplan-Meier estimate using each merchant's risk score as its churn probability at its current tenure.")
+    else:
+        st.info("No merchants to chart with current filters.")
+    
+    profiler.begin("cohort_matrix")
+    # Onboarding cohort heatmap
+    st.markdown("## COHORT RETENTION MATRIX")
+    
+    cohort_metrics = {
+        "Merchants Transacting": 'active',
+        "Volume Retained": 'volume'
+    }
+    cohort_metric_label = st.radio(
+        "Cohort Metric:",
+        options=list(cohort_metrics.keys()),
+        horizontal=True
+    )
+    
+    cohort_df = compute_cohort_matrix(dataset_version, cohort_metrics[cohort_metric_label], backend)
+    
+    if not cohort_df.empty:
+        fig = go.Figure(go.Heatmap(
+            z=cohort_df.to_numpy() * 100,
+            x=cohort_df.columns.tolist(),
+            y=cohort_df.index.tolist(),
+            colorscale=[[0, '#120458'], [0.5, '#FF355E'], [1, '#01EDED']],
+            zmin=0,
+            zmax=100 if cohort_metrics[cohort_metric_label] == 'active' else None,
+            hoverongaps=False,
+            colorbar=dict(title="%", tickfont=dict(family="VT323", size=14, color="#F5F5F5"))
+        ))
+        
+        fig.update_layout(
+            title={
+                'text': "RETENTION BY ONBOARDING COHORT",
+                'font': {'family': "Press Start 2P", 'size': 18, 'color': "#01EDED"},
+                'y': 0.97
+            },
+            paper_bgcolor='rgba(0,0,0,0)',
+            plot_bgcolor='rgba(0,0,0,0)',
+            font=dict(family="VT323", size=16, color="#F5F5F5"),
+            xaxis_title="Months Since Onboarding",
+            yaxis_title="Onboarding Month",
+            yaxis=dict(autorange='reversed'),
+            margin=dict(l=40, r=40, t=80, b=40),
+            height=500
+        )
+        
+        st.plotly_chart(fig, use_container_width=True)
+    else:
+        st.info("No volume history available for cohort analysis.")
+    
+    profiler.begin("simulator")
+    # What-if churn simulation
+    st.markdown("## WHAT-IF SIMULATOR")
+    
+    with st.expander("SCENARIO SETTINGS", expanded=False):
+        st.markdown("#### RISK LEVEL MULTIPLIERS")
+        sim_cols = st.columns(3)
+        category_multipliers = {}
+        for col, category in zip(sim_cols, ["High", "Medium", "Low"]):
+            with col:
+                category_multipliers[category] = st.slider(
+                    f"{category} Risk", 0.0, 2.0, 1.0, 0.05, key=f"sim_category_{category}"
+                )
+        
+        st.markdown("#### SEGMENT MULTIPLIERS")
+        sim_cols = st.columns(len(segment_options))
+        segment_multipliers = {}
+        for col, segment in zip(sim_cols, segment_options):
+            with col:
+                segment_multipliers[segment] = st.slider(
+                    segment, 0.0, 2.0, 1.0, 0.05, key=f"sim_segment_{segment}"
+                )
+        
+        st.markdown("#### RISK FACTOR MULTIPLIERS")
+        factor_options = backend.risk_factor_options()
+        sim_cols = st.columns(4)
+        factor_multipliers = {}
+        for i, factor in enumerate(factor_options):
+            with sim_cols[i % 4]:
+                factor_multipliers[factor] = st.slider(
+                    factor, 0.0, 2.0, 1.0, 0.05, key=f"sim_factor_{factor}"
+                )
+        
+        n_scenarios = st.select_slider(
+            "Scenarios:",
+            options=[1000, 2000, 5000, 10000],
+            value=1000
+        )
+    
+    if merchant_count > 0:
+        from utils.simulation import scenario_count
+        # Large books run fewer scenarios so the page stays interactive
+        requested_scenarios = n_scenarios
+        n_scenarios = scenario_count(merchant_count, requested_scenarios)
+        if n_scenarios < requested_scenarios:
+            st.caption(
+                f"Running {n_scenarios:,} of {requested_scenarios:,} scenarios for "
+                f"{merchant_count:,} merchants to keep the page responsive"
+            )
+        baseline = run_churn_simulation(
+            dataset_version, filters, (), (), (), n_scenarios, backend
+        )
+        scenario = run_churn_simulation(
+            dataset_version, filters,
+            tuple(sorted(category_multipliers.items())),
+            tuple(sorted(segment_multipliers.items())),
+            tuple(sorted(factor_multipliers.items())),
+            n_scenarios, backend
+        )
+        
+        col1, col2, col3 = st.columns(3)
+        baseline_p50 = baseline['total']['p50'].iloc[0]
+        scenario_p50 = scenario['total']['p50'].iloc[0]
+        scenario_p90 = scenario['total']['p90'].iloc[0]
+        saved = baseline_p50 - scenario_p50
+        
+        with col1:
+            st.markdown(metric_card("LOST VOLUME P50", f"${scenario_p50:,.0f}"), unsafe_allow_html=True)
+        
+        with col2:
+            st.markdown(metric_card("LOST VOLUME P90", f"${scenario_p90:,.0f}", 'high-risk'), unsafe_allow_html=True)
+        
+        with col3:
+            st.markdown(metric_card("VOLUME SAVED VS BASELINE (P50)", f"${saved:,.0f}",
+                                    'low-risk' if saved >= 0 else 'high-risk'), unsafe_allow_html=True)
+        
+        col1, col2 = st.columns(2)
+        
+        for col, group_col, title in [(col1, 'segment', "LOST VOLUME BY SEGMENT"),
+                                      (col2, 'account_manager', "LOST VOLUME BY MANAGER")]:
+            with col:
+                sim_df = scenario[group_col].reset_index()
                 
-                <div style="margin-bottom: 15px;">
-                    <div style="font-family: 'VT323', monospace; font-size: 1.2rem; margin-bottom: 5px; display: flex; justify-content: space-between;">
-                        <span>Authorization Rate</span>
-                        <span>{authorization_rate*100:.1f}%</span>
-                    </div>
-                    <div style="height: 20px; width: 100%; background-color: #333; border: 2px solid var(--secondary);">
-                        <div style="height: 100%; width: {authorization_rate*100}%; background-color: var(--tertiary);"></div>
-                    </div>
-                </div>
+                fig = go.Figure()
+                fig.add_trace(go.Bar(
+                    x=sim_df[group_col], y=sim_df['p50'],
+                    marker_color='#01EDED',
+                    marker_line_color='#120458',
+                    marker_line_width=2,
+                    name="P50"
+                ))
+                fig.add_trace(go.Bar(
+                    x=sim_df[group_col], y=sim_df['p90'],
+                    marker_color='#FF355E',
+                    marker_line_color='#120458',
+                    marker_line_width=2,
+                    name="P90"
+                ))
                 
-                <div style="margin-bottom: 15px;">
-                    <div style="font-family: 'VT323', monospace; font-size: 1.2rem; margin-bottom: 5px; display: flex; justify-content: space-between;">
-                        <span>Fraud Detection Rate</span>
-                        <span>{fraud_rate*100:.1f}%</span>
-                    </div>
-                    <div style="height: 20px; width: 100%; background-color: #333; border: 2px solid var(--secondary);">
-                        <div style="height: 100%; width: {fraud_rate*100}%; background-color: var(--danger);"></div>
-                    </div>
-                </div>
-            </div>
-            """, unsafe_allow_html=True)
-            
+                fig.update_layout(
+                    title={
+                        'text': title,
+                        'font': {'family': "Press Start 2P", 'size': 14, 'color': "#01EDED"},
+                        'y': 0.95
+                    },
+                    barmode='group',
+                    paper_bgcolor='rgba(0,0,0,0)',
+                    plot_bgcolor='rgba(0,0,0,0)',
+                    font=dict(family="VT323", size=16, color="#F5F5F5"),
+                    xaxis_title=None,
+                    yaxis_title="Monthly Volume ($)",
+                    margin=dict(l=40, r=20, t=60, b=40),
+                    height=350
+                )
+                
+                fig.update_xaxes(gridcolor='#333333', gridwidth=0.5)
+                fig.update_yaxes(gridcolor='#333333', gridwidth=0.5)
+                
+                st.plotly_chart(fig, use_container_width=True)
+    else:
+        st.info("No merchants to simulate with current filters.")
+    
+    profiler.begin("historical_chart")
     # Historical trend analysis
     st.markdown("## CHURN RISK HISTORICAL TRENDS")
     
@@ -1108,61 +1153,11 @@ def main():
     low_risk_data = [68, 64, 61, 59, 59, 57, 57, 55, 55, 52, 58, 59]
     
     # Create figure
-    fig = go.Figure()
-    
-    # Add traces
-    fig.add_trace(go.Scatter(
-        x=months, y=high_risk_data,
-        mode='lines',
-        line=dict(width=0, color='#FF0000'),
-        stackgroup='one',
-        fillcolor='#FF0000',
-        name='High Risk'
-    ))
-    
-    fig.add_trace(go.Scatter(
-        x=months, y=medium_risk_data,
-        mode='lines',
-        line=dict(width=0, color='#FF9933'),
-        stackgroup='one',
-        fillcolor='#FF9933',
-        name='Medium Risk'
-    ))
-    
-    fig.add_trace(go.Scatter(
-        x=months, y=low_risk_data,
-        mode='lines',
-        line=dict(width=0, color='#50FC00'),
-        stackgroup='one',
-        fillcolor='#50FC00',
-        name='Low Risk'
-    ))
-    
-    # Customize layout
-    fig.update_layout(
-        title={
-            'text': "MERCHANT RISK DISTRIBUTION OVER TIME",
-            'font': {'family': "Press Start 2P", 'size': 18, 'color': "#01EDED"},
-            'y': 0.95
-        },
-        paper_bgcolor='rgba(0,0,0,0)',
-        plot_bgcolor='rgba(0,0,0,0)',
-        font=dict(family="VT323", size=16, color="#F5F5F5"),
-        xaxis_title=None,
-        yaxis_title="Percentage of Merchants",
-        margin=dict(l=40, r=40, t=80, b=40),
-        legend=dict(
-            font=dict(family="VT323", size=16, color="#F5F5F5"),
-            bgcolor="rgba(0,0,0,0.5)",
-            bordercolor="#01EDED",
-            borderwidth=2
-        ),
-        height=400
+    fig = get_figure_cache().figure(
+        ('risk_history', None, dataset_version),
+        lambda: risk_history_area(months, high_risk_data, medium_risk_data, low_risk_data)
     )
     
-    fig.update_xaxes(gridcolor='#333333', gridwidth=0.5)
-    fig.update_yaxes(gridcolor='#333333', gridwidth=0.5)
-    
     st.plotly_chart(fig, use_container_width=True)
     
     # Footer
@@ -1171,6 +1166,103 @@ def main():
         PAYPLUG CHURN RISK RADAR - DEMO VERSION 1.0 | © 2025 PAYPLUG | PRESS START TO SAVE YOUR MERCHANTS
     </div>
     """, unsafe_allow_html=True)
+    
+    # Close out the run's timings
+    run_summary = profiler.finish()
+    run_summary['dataset_version'] = dataset_version
+    
+    if 'profiler_runs' not in st.session_state:
+        st.session_state['profiler_runs'] = deque(maxlen=DEBUG_HISTORY_RUNS)
+    st.session_state['profiler_runs'].append(run_summary)
+    
+    if timing_log_path:
+        append_timing_log(timing_log_path, run_summary)
+    
+    if debug_enabled:
+        render_debug_panel(st.session_state['profiler_runs'], snapshot)
+
+# Sidebar block showing which dataset version this session sees and how fresh it is
+def render_data_freshness(refresher, snapshot):
+    st.sidebar.markdown("### 🗄️ DATA")
+    
+    age_minutes = (datetime.datetime.now() - snapshot.loaded_at).total_seconds() / 60
+    st.sidebar.markdown(
+        f"**Version:** `{snapshot.version}`  \n"
+        f"**Loaded:** {snapshot.loaded_at:%Y-%m-%d %H:%M} ({age_minutes:.0f} min ago)"
+    )
+    ingestion = snapshot.derived.get('event_ingestion')
+    if ingestion is not None:
+        st.sidebar.caption(
+            f"{ingestion['events_ingested']:,} payment events ingested for {ingestion['merchants']:,} merchants"
+            + (f" ({ingestion['events_skipped']:,} malformed skipped)" if ingestion['events_skipped'] else "")
+        )
+    if refresher.last_checked is not None:
+        st.sidebar.caption(f"Last checked for updates at {refresher.last_checked:%H:%M:%S}")
+    
+    if refresher.last_error:
+        st.sidebar.warning(f"Refresh failing, showing the last good data: {refresher.last_error}")
+    
+    latest = refresher.current()
+    if latest.version != snapshot.version:
+        st.sidebar.info(f"New data available: {latest.version}")
+        if st.sidebar.button("LOAD LATEST DATA"):
+            st.session_state['dataset_version'] = latest.version
+            st.rerun()
+
+# Hidden debug panel (enable with ?debug=1 or CHURN_DASHBOARD_DEBUG=1)
+def render_debug_panel(runs, snapshot):
+    import pandas as pd
+    from data.compaction import memory_report
+    
+    st.sidebar.markdown("### 🛠️ DEBUG")
+    
+    latest = runs[-1]
+    st.sidebar.markdown(f"**Last run:** {latest['total_seconds']*1000:.0f} ms")
+    
+    latest_df = pd.DataFrame(latest['sections'])
+    latest_df['ms'] = (latest_df['seconds'] * 1000).round(1)
+    latest_df['payload KB'] = (latest_df['payload_bytes'] / 1024).round(1)
+    st.sidebar.dataframe(
+        latest_df[['section', 'ms', 'payload KB']],
+        hide_index=True,
+        use_container_width=True
+    )
+    
+    # One row per past run, one column per section (milliseconds)
+    history_df = pd.DataFrame([
+        {'run': run['timestamp'][11:23], 'total': run['total_seconds'] * 1000,
+         **{section['section']: section['seconds'] * 1000 for section in run['sections']}}
+        for run in runs
+    ]).set_index('run').round(1)
+    st.sidebar.markdown(f"**Last {len(runs)} runs (ms):**")
+    st.sidebar.dataframe(history_df.iloc[::-1], use_container_width=True)
+    
+    figure_stats = get_figure_cache().stats()
+    st.sidebar.markdown(
+        f"**Figure cache:** {figure_stats['hits']:,} hits / {figure_stats['misses']:,} misses, "
+        f"{figure_stats['entries']}/{figure_stats['max_entries']} figures ({figure_stats['bytes'] / 1024:.0f} KB)"
+    )
+    
+    # Bytes per column; datasets attached from the shared store were compacted by the publisher
+    if snapshot.merchants_df is None:
+        st.sidebar.markdown("**Memory:** queries run against the SQLite store; no merchant data held")
+        return
+    report = snapshot.derived.get('memory_report')
+    if report is None:
+        report = memory_report(None, {'merchants': snapshot.merchants_df, 'volumes': snapshot.volumes})
+    report_df = pd.DataFrame({
+        'column': report['table'] + '.' + report['column'],
+        'dtype': report['dtype_after'],
+        'before KB': (report['bytes_before'] / 1024).round(1),
+        'after KB': (report['bytes_after'] / 1024).round(1)
+    })
+    total_after = report['bytes_after'].sum() / 1024 ** 2
+    if report['bytes_before'].notna().all():
+        total_before = report['bytes_before'].sum() / 1024 ** 2
+        st.sidebar.markdown(f"**Memory:** {total_before:.2f} MB → {total_after:.2f} MB")
+    else:
+        st.sidebar.markdown(f"**Memory:** {total_after:.2f} MB")
+    st.sidebar.dataframe(report_df, hide_index=True, use_container_width=True)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,270 @@
+"""
+Throughput test for the read-only JSON API (`python cli.py api`).
+
+Starts the API in-process on a free local port over mock data and drives it
+with N concurrent keep-alive HTTP clients. Each client polls a fixed pool of
+requests the way an internal tool would: KPIs and risk-factor counts for
+random sidebar filters, leaderboard pages and merchant profiles. Every
+client count is run in three modes:
+
+    uncached     response cache disabled, every request runs its queries
+    cached       warm response cache, full bodies returned
+    conditional  warm cache, clients send If-None-Match and get 304s
+
+The report lists requests per second, latency percentiles, status counts
+and the API's cache counters per mode and client count.
+
+Usage:
+    python benchmarks/api_load_test.py
+    python benchmarks/api_load_test.py --clients 1 4 16 --requests 500 --merchants 100000 --output api.json
+"""
+import argparse
+import datetime
+import http.client
+import json
+import os
+import platform
+import random
+import sys
+import threading
+import time
+import warnings
+from urllib.parse import urlencode, urlsplit
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+if BENCHMARK_DIR not in sys.path:
+    sys.path.insert(0, BENCHMARK_DIR)
+
+import numpy as np
+
+import run_benchmarks
+from data.backends import FILTER_COLUMNS
+
+DEFAULT_CLIENTS = [1, 4, 16]
+DEFAULT_REQUESTS = 200
+DEFAULT_MERCHANTS = 10_000
+MODES = ['uncached', 'cached', 'conditional']
+
+# Distinct requests the clients poll, like a handful of dashboards refreshing the same views
+DEFAULT_POOL = 100
+
+# Filter column -> API query parameter
+FILTER_PARAMS = {
+    'industry': 'industry',
+    'segment': 'segment',
+    'account_manager': 'manager',
+    'risk_category': 'risk_category'
+}
+
+def request_pool(backend, size, seed):
+    """
+    Random API paths over the dataset's filter values and merchant ids.
+
+    Args:
+        backend (FrameBackend): Backend to read the filter options and ids from
+        size (int): Number of distinct paths
+        seed (int): Random seed
+
+    Returns:
+        list: URL paths with query strings
+    """
+    rng = random.Random(seed)
+    options = {column: backend.distinct(column) for column in FILTER_COLUMNS}
+    merchant_ids = backend.frame(columns=['merchant_id'])['merchant_id'].tolist()
+
+    def random_filters():
+        params = []
+        for column in rng.sample(FILTER_COLUMNS, rng.randint(0, 2)):
+            params.extend((FILTER_PARAMS[column], value) for value in rng.sample(options[column], rng.randint(1, 2)))
+        return params
+
+    paths = []
+    for _ in range(size):
+        kind = rng.choices(['kpis', 'risk-factors', 'leaderboard', 'merchant'], [3, 2, 3, 2])[0]
+        if kind == 'merchant':
+            paths.append(f"/merchants/{rng.choice(merchant_ids)}")
+        elif kind == 'leaderboard':
+            params = random_filters() + [('page', rng.randint(1, 5))]
+            paths.append(f"/leaderboard?{urlencode(params)}")
+        else:
+            paths.append(f"/{kind}?{urlencode(random_filters())}")
+    return paths
+
+def run_client(port, paths, num_requests, conditional, seed, barrier):
+    """
+    One polling client on a keep-alive connection.
+
+    Args:
+        port (int): API port on localhost
+        paths (list): Request pool to draw from
+        num_requests (int): Requests to send
+        conditional (bool): Send the last ETag seen for a path as If-None-Match
+        seed (int): Random seed for the request order
+        barrier (Barrier): Barrier so all clients start together
+
+    Returns:
+        list: (status, seconds) per request; status 0 for connection errors
+    """
+    rng = random.Random(seed)
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+    etags = {}
+    results = []
+    barrier.wait()
+    for _ in range(num_requests):
+        path = rng.choice(paths)
+        headers = {'If-None-Match': etags[path]} if conditional and path in etags else {}
+        start = time.perf_counter()
+        try:
+            connection.request('GET', path, headers=headers)
+            response = connection.getresponse()
+            response.read()
+            status = response.status
+            if response.getheader('ETag'):
+                etags[path] = response.getheader('ETag')
+        except (OSError, http.client.HTTPException):
+            connection.close()
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+            status = 0
+        results.append((status, time.perf_counter() - start))
+    connection.close()
+    return results
+
+def run_level(api, port, paths, num_clients, num_requests, mode, seed=0):
+    """
+    Run num_clients concurrent clients in one mode and summarize the results.
+
+    Args:
+        api (MetricsAPI): API behind the server (its cache is reset for the run)
+        port (int): API port on localhost
+        paths (list): Request pool
+        num_clients (int): Concurrent clients
+        num_requests (int): Requests per client
+        mode (str): One of MODES
+        seed (int): Base random seed
+
+    Returns:
+        dict: Throughput, latency percentiles, status counts and cache counters
+    """
+    from utils.api import API_CACHE_ENTRIES
+
+    api._cache.clear()
+    api.cache_entries = 0 if mode == 'uncached' else API_CACHE_ENTRIES
+    if mode != 'uncached':
+        # Warm the cache; conditional clients still fetch each path once to learn its ETag
+        for path in paths:
+            url = urlsplit(path)
+            api.handle(url.path, url.query)
+    api.hits = api.misses = api.not_modified = 0
+
+    barrier = threading.Barrier(num_clients + 1)
+    client_results = [None] * num_clients
+
+    def worker(client_id):
+        client_results[client_id] = run_client(port, paths, num_requests, mode == 'conditional',
+                                               seed + client_id, barrier)
+
+    threads = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(num_clients)]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    wall_start = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    wall_seconds = time.perf_counter() - wall_start
+
+    results = [result for client in client_results for result in client]
+    latencies = np.array([seconds for status, seconds in results if status in (200, 304)])
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) if len(latencies) else [float('nan')] * 3
+    statuses = {}
+    for status, _ in results:
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+
+    return {
+        'mode': mode,
+        'clients': num_clients,
+        'requests': len(results),
+        'errors': sum(status not in (200, 304) for status, _ in results),
+        'statuses': statuses,
+        'requests_per_second': len(latencies) / wall_seconds if wall_seconds > 0 else float('nan'),
+        'p50_ms': float(p50) * 1000,
+        'p95_ms': float(p95) * 1000,
+        'p99_ms': float(p99) * 1000,
+        'wall_seconds': wall_seconds,
+        'cache': api.stats()
+    }
+
+def environment_info():
+    """Describe the machine and interpreter the numbers were taken with."""
+    return {
+        'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count()
+    }
+
+def format_table(levels):
+    """Render the levels as a fixed-width text table."""
+    lines = [
+        f"{'MODE':<12} {'CLIENTS':>7} {'REQUESTS':>8} {'ERRORS':>6} {'REQ/S':>9} "
+        f"{'P50 MS':>8} {'P95 MS':>8} {'P99 MS':>8} {'HITS':>6} {'304S':>6}"
+    ]
+    for level in levels:
+        lines.append(
+            f"{level['mode']:<12} {level['clients']:>7} {level['requests']:>8} {level['errors']:>6} "
+            f"{level['requests_per_second']:>9.1f} {level['p50_ms']:>8.2f} {level['p95_ms']:>8.2f} "
+            f"{level['p99_ms']:>8.2f} {level['cache']['hits']:>6} {level['cache']['not_modified']:>6}"
+        )
+    return "\n".join(lines)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test the read-only JSON API with concurrent clients.")
+    parser.add_argument('--clients', type=int, nargs='+', default=DEFAULT_CLIENTS,
+                        help="Concurrent client counts to test (default: 1 4 16)")
+    parser.add_argument('--requests', type=int, default=DEFAULT_REQUESTS, help="Requests per client")
+    parser.add_argument('--merchants', type=int, default=DEFAULT_MERCHANTS,
+                        help="Mock merchants served (default: 10000)")
+    parser.add_argument('--pool', type=int, default=DEFAULT_POOL, help="Distinct requests polled (default: 100)")
+    parser.add_argument('--modes', nargs='+', choices=MODES, default=MODES, help="Modes to run (default: all)")
+    parser.add_argument('--seed', type=int, default=0, help="Random seed for the request pool and order")
+    parser.add_argument('--output', help="Write machine-readable JSON results to this file")
+    args = parser.parse_args(argv)
+
+    warnings.simplefilter('ignore')
+    from data.compaction import compact_dataset
+    from data.refresh import DatasetRefresher
+    from utils.api import MetricsAPI, api_derived_data, make_api_server
+
+    app = run_benchmarks._load_app()
+    merchants_df, volumes = compact_dataset(*app.generate_mock_data(args.merchants))
+    refresher = DatasetRefresher(lambda loaded_version: (merchants_df, volumes, f"mock-{args.merchants}"),
+                                 build_derived=api_derived_data)
+    refresher.refresh_now()
+
+    api = MetricsAPI(refresher)
+    server = make_api_server(api, port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    port = server.server_address[1]
+    paths = request_pool(refresher.current().derived['backend'], args.pool, args.seed)
+
+    levels = []
+    try:
+        for mode in args.modes:
+            for num_clients in args.clients:
+                levels.append(run_level(api, port, paths, num_clients, args.requests, mode, args.seed))
+                # The table goes to stderr so stdout stays valid JSON
+                print(format_table(levels), file=sys.stderr, flush=True)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    report = {'environment': environment_info(), 'merchants': args.merchants, 'levels': levels}
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump(report, output, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+    return 1 if any(level['errors'] for level in levels) else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,121 @@
+"""
+Chart payload and build time against volume history length.
+
+Builds the deep dive's transaction history chart for synthetic daily
+volume histories of increasing length, with and without downsampling, and
+records the points sent to the browser, the serialized figure size (what
+st.plotly_chart ships) and the build + serialize time. With downsampling
+both the point count and the payload should level off once the history is
+longer than CHART_MAX_POINTS.
+
+Usage:
+    python benchmarks/chart_payload.py
+    python benchmarks/chart_payload.py --lengths 365 3650 36500 --repeats 5 --output charts.json
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCHMARK_DIR)
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import numpy as np
+
+# History lengths in days: a year, three years, ten years, a century of daily rows
+DEFAULT_LENGTHS = [12, 365, 1095, 3650, 36500]
+DEFAULT_REPEATS = 3
+
+def synthetic_history(length, seed=0):
+    """Daily-style labels and noisy, trending volumes with a few spikes and gaps."""
+    rng = np.random.default_rng(seed)
+    labels = (np.datetime64('2000-01-01') + np.arange(length)).astype(str)
+    volumes = 5000 + np.cumsum(rng.normal(0, 50, length)) + rng.gamma(2, 500, length)
+    volumes[rng.integers(0, length, max(1, length // 500))] *= 5
+    volumes[rng.integers(0, length, max(1, length // 1000))] = np.nan
+    return labels, volumes
+
+def measure(length, downsample, repeats):
+    """
+    Build and serialize the volume chart for one history length.
+
+    Args:
+        length (int): Points in the history
+        downsample (bool): Use the chart's default point cap (False sends every point)
+        repeats (int): Timed builds; the median is reported
+
+    Returns:
+        dict: length, mode, trace type, points sent, payload bytes and median milliseconds
+    """
+    from utils.figures import CHART_MAX_POINTS, monthly_volume_bar
+
+    labels, volumes = synthetic_history(length)
+    max_points = CHART_MAX_POINTS if downsample else length
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fig = monthly_volume_bar(labels, volumes, max_points=max_points)
+        payload = fig.to_json()
+        timings.append(time.perf_counter() - start)
+
+    return {
+        'length': length,
+        'mode': 'downsampled' if downsample else 'full',
+        'trace': fig.data[0].type,
+        'points': len(fig.data[0].y),
+        'payload_bytes': len(payload.encode('utf-8')),
+        'build_ms': float(np.median(timings)) * 1000
+    }
+
+def format_table(results):
+    """Render the results as a fixed-width text table."""
+    lines = [f"{'LENGTH':>8} {'MODE':<12} {'TRACE':<10} {'POINTS':>7} {'PAYLOAD KB':>11} {'BUILD MS':>9}"]
+    for result in results:
+        lines.append(
+            f"{result['length']:>8} {result['mode']:<12} {result['trace']:<10} {result['points']:>7} "
+            f"{result['payload_bytes'] / 1024:>11.1f} {result['build_ms']:>9.2f}"
+        )
+    return "\n".join(lines)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure chart payload size and build time against history length.")
+    parser.add_argument('--lengths', type=int, nargs='+', default=DEFAULT_LENGTHS,
+                        help="History lengths to test (default: 12 365 1095 3650 36500)")
+    parser.add_argument('--repeats', type=int, default=DEFAULT_REPEATS, help="Timed builds per case")
+    parser.add_argument('--output', help="Write machine-readable JSON results to this file")
+    args = parser.parse_args(argv)
+
+    import plotly
+    from utils.figures import CHART_MAX_POINTS, WEBGL_POINT_THRESHOLD
+
+    # Untimed build so imports and Plotly's validator setup are not charged to the first case
+    measure(12, True, 1)
+
+    results = []
+    for length in args.lengths:
+        for downsample in (False, True):
+            results.append(measure(length, downsample, args.repeats))
+
+    # The table goes to stderr so stdout stays valid JSON
+    print(format_table(results), file=sys.stderr, flush=True)
+
+    report = {
+        'python': sys.version.split()[0],
+        'plotly': plotly.__version__,
+        'chart_max_points': CHART_MAX_POINTS,
+        'webgl_point_threshold': WEBGL_POINT_THRESHOLD,
+        'results': results
+    }
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump(report, output, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+    return report
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,137 @@
+"""
+Cold-start and time-to-first-paint measurement for the dashboard.
+
+Each run spawns a fresh Python process (an empty pod), boots Streamlit's
+testing runtime and executes app.py once, recording when the first element,
+the page title and the last KPI card are sent to the browser. A second run
+in the same process gives the warm rerun time for comparison.
+
+Usage:
+    python benchmarks/cold_start.py
+    python benchmarks/cold_start.py --runs 10 --output cold.json
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCHMARK_DIR)
+APP_PATH = os.path.join(ROOT, 'app.py')
+
+DEFAULT_RUNS = 5
+
+# Markdown snippets marking the milestones of the first paint
+TITLE_MARKER = "CHURN RISK RADAR"
+KPI_MARKER = "AVG RISK SCORE"
+
+# (key, label) in the order the milestones are reached
+MILESTONES = [
+    ('boot_seconds', 'streamlit imported'),
+    ('first_element_seconds', 'first element'),
+    ('title_seconds', 'title painted'),
+    ('first_paint_seconds', 'KPIs painted'),
+    ('full_run_seconds', 'full page'),
+    ('warm_rerun_seconds', 'warm rerun'),
+]
+
+def _child(spawned_at):
+    """Measure one cold run; timings are seconds since the parent spawned this process."""
+    from streamlit import logger as st_logger
+    from streamlit.delta_generator import DeltaGenerator
+    from streamlit.testing.v1 import AppTest
+
+    marks = {'boot_seconds': time.time() - spawned_at}
+    original_enqueue = DeltaGenerator._enqueue
+
+    def _enqueue(self, delta_type, element_proto, *args, **kwargs):
+        elapsed = time.time() - spawned_at
+        marks.setdefault('first_element_seconds', elapsed)
+        body = element_proto.body if delta_type == 'markdown' else ''
+        if TITLE_MARKER in body:
+            marks.setdefault('title_seconds', elapsed)
+        elif KPI_MARKER in body:
+            marks.setdefault('first_paint_seconds', elapsed)
+        return original_enqueue(self, delta_type, element_proto, *args, **kwargs)
+
+    DeltaGenerator._enqueue = _enqueue
+    st_logger.set_log_level('error')
+
+    at = AppTest.from_file(APP_PATH, default_timeout=300)
+    at.run()
+    marks['full_run_seconds'] = time.time() - spawned_at
+
+    start = time.perf_counter()
+    at.run()
+    marks['warm_rerun_seconds'] = time.perf_counter() - start
+    marks['exceptions'] = [str(exc.value) for exc in at.exception]
+
+    print(json.dumps(marks))
+
+def measure_cold_start():
+    """
+    Spawn one fresh interpreter and collect its cold-start milestones.
+
+    Returns:
+        dict: Seconds from process spawn to each milestone, plus the warm rerun time
+    """
+    env = dict(os.environ, PYTHONWARNINGS='ignore')
+    spawned_at = time.time()
+    completed = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--child', repr(spawned_at)],
+        capture_output=True, text=True, cwd=ROOT, env=env, check=True
+    )
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+def summarize(runs):
+    """Median of every milestone across runs."""
+    summary = {}
+    for key, _ in MILESTONES:
+        values = sorted(run[key] for run in runs if key in run)
+        summary[key] = values[len(values) // 2] if values else None
+    return summary
+
+def format_table(summary, num_runs):
+    """Render the median milestones as a fixed-width text table."""
+    lines = [f"{'MILESTONE':<22} {'MEDIAN S':>10} {'SINCE BOOT S':>13}   (n={num_runs})"]
+    for key, label in MILESTONES:
+        value = summary[key]
+        if value is None:
+            lines.append(f"{label:<22} {'-':>10} {'-':>13}")
+        elif key in ('boot_seconds', 'warm_rerun_seconds'):
+            lines.append(f"{label:<22} {value:>10.3f} {'':>13}")
+        else:
+            # Boot time is Streamlit's own import; the rest is what app.py controls
+            lines.append(f"{label:<22} {value:>10.3f} {value - summary['boot_seconds']:>13.3f}")
+    return "\n".join(lines)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure the dashboard's cold start and time-to-first-paint.")
+    parser.add_argument('--runs', type=int, default=DEFAULT_RUNS,
+                        help="Fresh processes to spawn (default: 5)")
+    parser.add_argument('--output', help="Write machine-readable JSON results to this file")
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        _child(float(args.child))
+        return None
+
+    runs = [measure_cold_start() for _ in range(args.runs)]
+    summary = summarize(runs)
+    # The table goes to stderr so stdout stays valid JSON
+    print(format_table(summary, len(runs)), file=sys.stderr, flush=True)
+
+    report = {'python': sys.version.split()[0], 'median': summary, 'runs': runs}
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump(report, output, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+    return report
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,214 @@
+"""
+Performance regression gate for the dashboard benchmarks.
+
+Reruns the benchmark scenarios recorded in a baseline file (see
+benchmarks/baselines/), compares each stage's median wall time against the
+baseline with bootstrap confidence intervals, prints a per-stage diff table
+and exits non-zero when a stage regresses beyond the threshold or has no
+baseline to compare against.
+
+Usage:
+    python benchmarks/compare.py
+    python benchmarks/compare.py --threshold 0.15 --tolerance 0.0005 --repeats 9
+    python benchmarks/compare.py --update          # re-record the baseline
+"""
+import argparse
+import json
+import os
+import sys
+
+import numpy as np
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+if BENCHMARK_DIR not in sys.path:
+    sys.path.insert(0, BENCHMARK_DIR)
+
+import run_benchmarks
+
+DEFAULT_BASELINE = os.path.join(BENCHMARK_DIR, 'baselines', 'default.json')
+
+# Stages guarding the interactive hot paths; the rest are reported but never fail the gate
+DEFAULT_GATED_STAGES = [
+    'generate_mock_data[app]',
+    'backend_count',
+    'backend_kpis',
+    'backend_risk_factor_counts',
+    'backend_leaderboard_page',
+    'leaderboard_format',
+    'leaderboard_styler',
+    'plotly_figures_cached',
+]
+
+# Absolute slack on top of the relative threshold: millisecond stages move by this
+# much with timer and scheduler noise alone, so it keeps them gated without flapping
+TOLERANCE_SECONDS = 0.001
+
+# Tiers recorded by --update: the fast backend query stages only take a few
+# milliseconds at 1,000 merchants, so a larger tier gates them at a measurable size
+DEFAULT_BASELINE_TIERS = [1_000, 10_000]
+
+def bootstrap_median_ci(samples, confidence=0.95, resamples=2000, seed=0):
+    """
+    Bootstrap a confidence interval for the median of timing samples.
+
+    Args:
+        samples (list): Wall-time samples in seconds
+        confidence (float): Confidence level of the interval
+        resamples (int): Number of bootstrap resamples
+        seed (int): Seed for the resampling generator
+
+    Returns:
+        tuple: (low, high) bounds of the median
+    """
+    samples = np.asarray(samples, dtype=np.float64)
+    if len(samples) < 2:
+        return float(samples[0]), float(samples[0])
+
+    rng = np.random.default_rng(seed)
+    resampled = rng.choice(samples, size=(resamples, len(samples)), replace=True)
+    medians = np.median(resampled, axis=1)
+    tail = (1 - confidence) / 2 * 100
+    low, high = np.percentile(medians, [tail, 100 - tail])
+    return float(low), float(high)
+
+def compare_stage(baseline_samples, current_samples, threshold, tolerance=TOLERANCE_SECONDS):
+    """
+    Classify one stage as OK, REGRESSION or IMPROVED.
+
+    A stage only regresses when its median is slower than the baseline median
+    by more than ``threshold`` (relative) plus ``tolerance`` (absolute) AND
+    the two confidence intervals do not overlap, so a single noisy run cannot
+    fail the gate and millisecond stages are gated too.
+
+    Args:
+        baseline_samples (list): Baseline wall-time samples
+        current_samples (list): Current wall-time samples
+        threshold (float): Allowed relative slowdown, e.g. 0.2 for 20%
+        tolerance (float): Allowed absolute slowdown in seconds on top of the relative one
+
+    Returns:
+        dict: Medians, confidence intervals, relative change and status
+    """
+    baseline_median = float(np.median(baseline_samples))
+    current_median = float(np.median(current_samples))
+    baseline_ci = bootstrap_median_ci(baseline_samples)
+    current_ci = bootstrap_median_ci(current_samples)
+    change = current_median / baseline_median - 1 if baseline_median > 0 else 0.0
+
+    allowed = baseline_median * threshold + tolerance
+    if current_median > baseline_median + allowed and current_ci[0] > baseline_ci[1]:
+        status = 'REGRESSION'
+    elif current_median < baseline_median - allowed and current_ci[1] < baseline_ci[0]:
+        status = 'IMPROVED'
+    else:
+        status = 'OK'
+
+    return {
+        'baseline_median': baseline_median,
+        'current_median': current_median,
+        'baseline_ci': baseline_ci,
+        'current_ci': current_ci,
+        'change': change,
+        'status': status
+    }
+
+def load_baseline(path):
+    """
+    Load a baseline file and index its results by (tier, stage).
+
+    Args:
+        path (str): Baseline JSON path
+
+    Returns:
+        tuple: (report, results) - the raw report and a {(tier, stage): row} dict
+    """
+    with open(path) as baseline_file:
+        report = json.load(baseline_file)
+    results = {(row['tier'], row['stage']): row for row in report['results']}
+    return report, results
+
+def format_diff_table(rows):
+    """Render comparison rows as a fixed-width text table."""
+    lines = [
+        f"{'TIER':>10}  {'STAGE':<42} {'BASELINE':>10} {'CURRENT':>10} {'CHANGE':>8}  "
+        f"{'CURRENT 95% CI':<21} {'STATUS':<10}"
+    ]
+    for row in rows:
+        ci = f"[{row['current_ci'][0]:.4f}, {row['current_ci'][1]:.4f}]"
+        status = row['status'] if row['gated'] else f"{row['status']}*"
+        lines.append(
+            f"{row['tier']:>10,}  {row['stage']:<42} {row['baseline_median']:>10.4f} "
+            f"{row['current_median']:>10.4f} {row['change'] * 100:>+7.1f}%  {ci:<21} {status:<10}"
+        )
+    lines.append("* informational only, not gated")
+    return "\n".join(lines)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare benchmark results against a stored baseline.")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE,
+                        help="Baseline JSON file (default: benchmarks/baselines/default.json)")
+    parser.add_argument('--threshold', type=float, default=0.20,
+                        help="Allowed relative slowdown of a stage's median (default: 0.20)")
+    parser.add_argument('--repeats', type=int, default=7,
+                        help="Timed runs per stage (default: 7)")
+    parser.add_argument('--tiers', type=int, nargs='+',
+                        help="Merchant counts to run (default: the baseline's tiers)")
+    parser.add_argument('--stages', nargs='+', default=DEFAULT_GATED_STAGES,
+                        help="Stages that fail the gate on regression")
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE_SECONDS,
+                        help="Allowed absolute slowdown in seconds on top of --threshold (default: 0.001)")
+    parser.add_argument('--update', action='store_true',
+                        help="Rerun the benchmarks and overwrite the baseline instead of comparing")
+    args = parser.parse_args(argv)
+
+    if args.update:
+        tiers = args.tiers or DEFAULT_BASELINE_TIERS
+        results = []
+        for tier in tiers:
+            results.extend(run_benchmarks.run_tier(tier, repeats=args.repeats, trace_memory=False, warmup=1))
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        with open(args.baseline, 'w') as baseline_file:
+            json.dump({'environment': run_benchmarks.environment_info(), 'results': results},
+                      baseline_file, indent=2)
+            baseline_file.write('\n')
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    baseline_report, baseline = load_baseline(args.baseline)
+    tiers = args.tiers or sorted({tier for tier, _ in baseline})
+
+    rows, missing = [], []
+    for tier in tiers:
+        for current in run_benchmarks.run_tier(tier, repeats=args.repeats, trace_memory=False, warmup=1):
+            key = (tier, current['stage'])
+            if key not in baseline:
+                missing.append(key)
+                continue
+            row = compare_stage(baseline[key]['samples'], current['samples'], args.threshold, args.tolerance)
+            row.update({'tier': tier, 'stage': current['stage'], 'gated': current['stage'] in args.stages})
+            rows.append(row)
+
+    print(f"Baseline recorded {baseline_report['environment']['timestamp']} "
+          f"(python {baseline_report['environment']['python']}, pandas {baseline_report['environment']['pandas']})")
+    print(format_diff_table(rows))
+
+    budget = f"{args.threshold:.0%} + {args.tolerance * 1000:g} ms"
+    failed = False
+    if missing:
+        # A stage without a baseline would otherwise pass unchecked forever
+        print(f"\nFAILED: {len(missing)} stage(s) missing from {args.baseline}: "
+              f"{', '.join(f'{stage} at {tier:,}' for tier, stage in missing)}; re-record it with --update")
+        failed = True
+
+    regressions = [row for row in rows if row['gated'] and row['status'] == 'REGRESSION']
+    if regressions:
+        print(f"\nFAILED: {len(regressions)} stage(s) regressed more than {budget}")
+        failed = True
+
+    if failed:
+        return 1
+    print(f"\nPASSED: no gated stage regressed more than {budget}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
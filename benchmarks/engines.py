@@ -0,0 +1,239 @@
+"""
+Parity check and timings for the query engines behind the dashboard.
+
+Builds the same mock dataset for every engine (pandas FrameBackend, Polars
+PolarsBackend, SQLiteBackend over a temporary database), replays the
+dashboard's queries - count, KPIs, risk-factor counts, a leaderboard page,
+a filtered column fetch and the alert id match - over random sidebar
+selections, and checks every engine returns what the pandas engine returns.
+Prints the median time per query and engine and exits non-zero on any
+mismatch. Engines whose package is not installed are reported as skipped.
+
+Usage:
+    python benchmarks/engines.py
+    python benchmarks/engines.py --tiers 10000 1000000 --engines pandas polars --output engines.json
+"""
+import argparse
+import datetime
+import json
+import math
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+if BENCHMARK_DIR not in sys.path:
+    sys.path.insert(0, BENCHMARK_DIR)
+
+import numpy as np
+import pandas as pd
+
+import run_benchmarks
+from data.backends import ENGINES, FILTER_COLUMNS, MerchantFilters, frame_backend
+
+DEFAULT_TIERS = [10_000, 100_000]
+DEFAULT_ENGINES = list(ENGINES) + ['sqlite']
+
+# Random sidebar selections replayed per tier
+DEFAULT_CASES = 25
+
+# Columns fetched by the 'frame' query, as the survival curves do
+FRAME_COLUMNS = ['merchant_id', 'tenure', 'risk_score', 'segment']
+
+# Candidate ids for the 'matching_ids' query, like the queued alerts
+MATCH_CANDIDATES = 50
+
+def _random_selection(rng, options):
+    """No filter, nothing selected, or a random subset - the shapes the sidebar produces."""
+    draw = rng.random()
+    if draw < 0.2:
+        return None
+    if draw < 0.25:
+        return ()
+    return tuple(sorted(rng.sample(options, rng.randint(1, len(options)))))
+
+def random_cases(backend, num_cases, seed):
+    """
+    Random filter states plus alert candidates to replay against every engine.
+
+    Args:
+        backend (FrameBackend): Reference backend to read the filter options from
+        num_cases (int): Number of cases
+        seed (int): Random seed
+
+    Returns:
+        list: (MerchantFilters, candidate merchant ids) tuples
+    """
+    rng = random.Random(seed)
+    options = {column: backend.distinct(column) for column in FILTER_COLUMNS}
+    merchant_ids = backend.frame(columns=['merchant_id'])['merchant_id'].tolist()
+    return [
+        (MerchantFilters(*(_random_selection(rng, options[column]) for column in FILTER_COLUMNS)),
+         rng.sample(merchant_ids, min(MATCH_CANDIDATES, len(merchant_ids))))
+        for _ in range(num_cases)
+    ]
+
+# Dashboard queries, each reduced to plain Python values that compare across engines
+QUERIES = [
+    ('count', lambda backend, filters, ids: backend.count(filters)),
+    ('kpis', lambda backend, filters, ids: backend.kpis(filters)),
+    ('risk_factor_counts', lambda backend, filters, ids: [
+        (factor, int(count)) for factor, count in backend.risk_factor_counts(filters).itertuples(index=False)
+    ]),
+    ('leaderboard_page', lambda backend, filters, ids: (
+        backend.leaderboard_page(filters, 0, run_benchmarks.SPARKLINE_MERCHANTS)['merchant_id'].tolist()
+    )),
+    ('frame', lambda backend, filters, ids: (
+        backend.frame(filters, FRAME_COLUMNS)[['merchant_id', 'tenure']].values.tolist()
+    )),
+    ('matching_ids', lambda backend, filters, ids: backend.matching_ids(filters, ids)),
+]
+
+def _same_value(expected, actual):
+    if isinstance(expected, dict):
+        return expected.keys() == actual.keys() and all(_same_value(expected[key], actual[key]) for key in expected)
+    if isinstance(expected, (float, np.floating)):
+        # Means are taken in float32 by pandas and in float64 elsewhere
+        if math.isnan(expected):
+            return math.isnan(actual)
+        return math.isclose(expected, actual, rel_tol=1e-6, abs_tol=1e-6)
+    return expected == actual
+
+def build_backends(engines, merchants_df, volumes, database_dir):
+    """
+    One backend per engine over the same data.
+
+    Args:
+        engines (list): Engine names (ENGINES or 'sqlite')
+        merchants_df (DataFrame): Compacted merchant data
+        volumes (VolumeMatrix): Compacted volume history
+        database_dir (str): Directory for the temporary SQLite database
+
+    Returns:
+        tuple: (engine name -> backend, engine name -> reason skipped)
+    """
+    backends, skipped = {}, {}
+    for engine in engines:
+        try:
+            if engine == 'sqlite':
+                from data.sqlite_backend import SQLiteBackend, build_database
+                path = os.path.join(database_dir, 'engines.sqlite')
+                build_database(merchants_df, volumes, path)
+                backends[engine] = SQLiteBackend(path)
+            else:
+                backends[engine] = frame_backend(merchants_df, volumes, engine=engine)
+        except ImportError as e:
+            skipped[engine] = str(e)
+    return backends, skipped
+
+def run_tier(num_merchants, engines, num_cases=DEFAULT_CASES, seed=0):
+    """
+    Check and time every engine for one merchant count.
+
+    Args:
+        num_merchants (int): Number of merchants to generate
+        engines (list): Engines to run; 'pandas' is always added as the reference
+        num_cases (int): Random filter states replayed
+        seed (int): Random seed
+
+    Returns:
+        dict: Median seconds per engine and query, mismatches and skipped engines
+    """
+    from data.compaction import compact_dataset
+
+    app = run_benchmarks._load_app()
+    merchants_df, volumes = compact_dataset(*app.generate_mock_data(num_merchants))
+    engines = ['pandas'] + [engine for engine in engines if engine != 'pandas']
+
+    with tempfile.TemporaryDirectory() as database_dir:
+        backends, skipped = build_backends(engines, merchants_df, volumes, database_dir)
+        cases = random_cases(backends['pandas'], num_cases, seed)
+
+        seconds = {engine: {} for engine in backends}
+        mismatches = []
+        for query, func in QUERIES:
+            expected = []
+            for engine, backend in backends.items():
+                samples = []
+                for case_number, (filters, ids) in enumerate(cases):
+                    start = time.perf_counter()
+                    result = func(backend, filters, ids)
+                    samples.append(time.perf_counter() - start)
+
+                    if engine == 'pandas':
+                        expected.append(result)
+                    elif not _same_value(expected[case_number], result):
+                        mismatches.append({'engine': engine, 'query': query, 'filters': filters._asdict()})
+                seconds[engine][query] = float(np.median(samples))
+
+    return {
+        'tier': num_merchants,
+        'cases': num_cases,
+        'seconds': seconds,
+        'mismatches': mismatches,
+        'skipped': skipped
+    }
+
+def environment_info():
+    """Interpreter and engine library versions."""
+    info = {
+        'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'pandas': pd.__version__
+    }
+    try:
+        import polars
+        info['polars'] = polars.__version__
+    except ImportError:
+        info['polars'] = None
+    return info
+
+def format_table(results):
+    """Render per-query medians as a fixed-width text table, one column per engine."""
+    lines = []
+    for result in results:
+        engines = list(result['seconds'])
+        lines.append(f"{'TIER':>10}  {'QUERY':<20}" + ''.join(f"{engine.upper():>12}" for engine in engines))
+        for query, _ in QUERIES:
+            lines.append(
+                f"{result['tier']:>10,}  {query:<20}"
+                + ''.join(f"{result['seconds'][engine][query]:>12.4f}" for engine in engines)
+            )
+        for engine, reason in result['skipped'].items():
+            lines.append(f"{'':>10}  skipped {engine}: {reason}")
+        for mismatch in result['mismatches']:
+            lines.append(f"{'':>10}  MISMATCH {mismatch['engine']} {mismatch['query']}: {mismatch['filters']}")
+    return "\n".join(lines)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check that every query engine matches pandas, and time them.")
+    parser.add_argument('--tiers', type=int, nargs='+', default=DEFAULT_TIERS,
+                        help="Merchant counts to run (default: 10000 100000)")
+    parser.add_argument('--engines', nargs='+', choices=DEFAULT_ENGINES, default=DEFAULT_ENGINES,
+                        help="Engines compared against pandas (default: all)")
+    parser.add_argument('--cases', type=int, default=DEFAULT_CASES,
+                        help="Random filter states replayed per tier")
+    parser.add_argument('--seed', type=int, default=0, help="Random seed for the filter states")
+    parser.add_argument('--output', help="Write machine-readable JSON results to this file")
+    args = parser.parse_args(argv)
+
+    results = [run_tier(tier, args.engines, args.cases, args.seed) for tier in args.tiers]
+    # The table goes to stderr so stdout stays valid JSON
+    print(format_table(results), file=sys.stderr)
+
+    report = {'environment': environment_info(), 'results': results}
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump(report, output, indent=2, default=list)
+    else:
+        print(json.dumps(report, indent=2, default=list))
+
+    return 1 if any(result['mismatches'] for result in results) else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,333 @@
+"""
+Concurrent-session load test for the Streamlit dashboard.
+
+Drives app.py headlessly through Streamlit's testing API with N simulated
+account-manager sessions in parallel threads, all inside this process - the
+same way a single server process shares its caches and CPU between browser
+sessions. Each session replays a randomized interaction script (filter
+changes, portfolio switches, merchant picks, chart options, simulator
+sliders) and every rerun is timed.
+
+For each session count the report lists rerun latency percentiles,
+throughput, process CPU utilization and peak RSS, to size deployments.
+
+Usage:
+    python benchmarks/load_test.py
+    python benchmarks/load_test.py --sessions 1 4 16 --actions 30 --output load.json
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import resource
+import sys
+import threading
+import time
+import warnings
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import numpy as np
+
+APP_PATH = os.path.join(ROOT, 'app.py')
+
+DEFAULT_SESSIONS = [1, 2, 4, 8]
+DEFAULT_ACTIONS = 20
+
+# Seconds a single rerun may take before the session records it as failed
+RERUN_TIMEOUT = 120
+
+# How often the background sampler reads the process RSS
+RSS_SAMPLE_INTERVAL = 0.1
+
+def _widget(at, kind, label):
+    """Find a widget of the given kind (e.g. 'multiselect') by its label."""
+    for widget in getattr(at, kind):
+        if widget.label == label:
+            return widget
+    raise LookupError(f"No {kind} labelled {label!r}")
+
+def _random_subset(rng, options):
+    return rng.sample(list(options), rng.randint(1, len(options)))
+
+# Interaction steps; each one changes widget state and returns a short description.
+# Tab switches in st.tabs happen entirely in the browser and never rerun the script,
+# so the replay picks merchants and chart options instead.
+
+def _change_industries(at, rng):
+    widget = _widget(at.sidebar, 'multiselect', "Industry:")
+    widget.set_value(_random_subset(rng, widget.options))
+    return 'filter_industry'
+
+def _change_segments(at, rng):
+    widget = _widget(at.sidebar, 'multiselect', "Size Segment:")
+    widget.set_value(_random_subset(rng, widget.options))
+    return 'filter_segment'
+
+def _change_risk_levels(at, rng):
+    widget = _widget(at.sidebar, 'multiselect', "Risk Category:")
+    widget.set_value(_random_subset(rng, widget.options))
+    return 'filter_risk'
+
+def _toggle_portfolio(at, rng):
+    widget = _widget(at.sidebar, 'radio', "View Mode:")
+    widget.set_value("All Merchants" if widget.value == "My Portfolio" else "My Portfolio")
+    return 'view_mode'
+
+def _pick_merchant(at, rng):
+    widget = _widget(at.main, 'selectbox', "Select Merchant to Analyze:")
+    if not widget.options:
+        return _change_risk_levels(at, rng)
+    widget.set_value(rng.choice(widget.options))
+    return 'pick_merchant'
+
+def _change_survival_grouping(at, rng):
+    widget = _widget(at.main, 'radio', "Group Curves By:")
+    widget.set_value(rng.choice(widget.options))
+    return 'survival_grouping'
+
+def _change_cohort_metric(at, rng):
+    widget = _widget(at.main, 'radio', "Cohort Metric:")
+    widget.set_value(rng.choice(widget.options))
+    return 'cohort_metric'
+
+def _move_simulator_slider(at, rng):
+    widget = at.slider(key=f"sim_category_{rng.choice(['High', 'Medium', 'Low'])}")
+    widget.set_value(round(rng.uniform(0.5, 1.5) / 0.05) * 0.05)
+    return 'simulator_slider'
+
+# (step, weight) - filters and merchant picks dominate a typical account-manager session
+INTERACTIONS = [
+    (_change_industries, 3),
+    (_change_segments, 2),
+    (_change_risk_levels, 3),
+    (_toggle_portfolio, 2),
+    (_pick_merchant, 5),
+    (_change_survival_grouping, 1),
+    (_change_cohort_metric, 1),
+    (_move_simulator_slider, 1),
+]
+
+def _current_rss_bytes():
+    """Resident set size of this process, or None where /proc is unavailable."""
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return None
+
+class RssSampler(threading.Thread):
+    """Background thread tracking the peak RSS while a session level runs."""
+
+    def __init__(self, interval=RSS_SAMPLE_INTERVAL):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.peak_bytes = _current_rss_bytes()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            rss = _current_rss_bytes()
+            if rss is not None and (self.peak_bytes is None or rss > self.peak_bytes):
+                self.peak_bytes = rss
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+        return self.peak_bytes
+
+def run_session(session_id, num_actions, think_time, seed, barrier=None):
+    """
+    Simulate one browser session: the initial page load followed by num_actions interactions.
+
+    Args:
+        session_id (int): Session number, used for the per-session seed
+        num_actions (int): Interactions replayed after the initial load
+        think_time (float): Mean pause between interactions in seconds
+        seed (int): Base random seed
+        barrier (Barrier): Optional barrier so all sessions start together
+
+    Returns:
+        tuple: (reruns, lookup_misses) - one dict per rerun with the action, latency and
+               error (if any), and the messages of interactions whose widget was still
+               missing after a refresh
+    """
+    from streamlit.testing.v1 import AppTest
+
+    rng = random.Random(seed + session_id)
+    steps, weights = zip(*INTERACTIONS)
+    at = AppTest.from_file(APP_PATH, default_timeout=RERUN_TIMEOUT)
+    reruns = []
+    lookup_misses = []
+
+    if barrier is not None:
+        barrier.wait()
+
+    action = 'initial_load'
+    for i in range(num_actions + 1):
+        if i > 0:
+            if think_time > 0:
+                time.sleep(rng.expovariate(1 / think_time))
+            step = rng.choices(steps, weights)[0]
+            try:
+                action = step(at, rng)
+            except LookupError:
+                # The element tree of a failed rerun is empty; refresh it once, untimed, and retry
+                try:
+                    at.run()
+                    action = step(at, rng)
+                except Exception as e:
+                    # A replay problem, not an app failure: it is counted apart from the rerun errors
+                    lookup_misses.append(f"{type(e).__name__}: {e}")
+                    continue
+
+        start = time.perf_counter()
+        try:
+            at.run()
+            error = '; '.join(str(exc.value) for exc in at.exception) or None
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        reruns.append({
+            'session': session_id,
+            'action': action,
+            'seconds': time.perf_counter() - start,
+            'error': error
+        })
+
+    return reruns, lookup_misses
+
+def run_level(num_sessions, num_actions, think_time=0.0, seed=0):
+    """
+    Run num_sessions concurrent sessions and summarize latency and resource use.
+
+    Args:
+        num_sessions (int): Concurrent sessions
+        num_actions (int): Interactions per session
+        think_time (float): Mean pause between interactions in seconds
+        seed (int): Base random seed
+
+    Returns:
+        dict: Latency percentiles, throughput, CPU utilization, peak RSS, rerun errors
+              and widget lookup misses
+    """
+    barrier = threading.Barrier(num_sessions + 1)
+    session_results = [None] * num_sessions
+
+    def worker(session_id):
+        try:
+            session_results[session_id] = run_session(session_id, num_actions, think_time, seed, barrier)
+        except threading.BrokenBarrierError:
+            session_results[session_id] = ([], [])
+
+    threads = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(num_sessions)]
+    for thread in threads:
+        thread.start()
+
+    # Measure from the moment every session is ready to send its first request
+    sampler = RssSampler()
+    barrier.wait()
+    sampler.start()
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+
+    for thread in threads:
+        thread.join()
+
+    wall_seconds = time.perf_counter() - wall_start
+    cpu_seconds = time.process_time() - cpu_start
+    peak_rss = sampler.stop()
+
+    reruns = [rerun for session in session_results if session for rerun in session[0]]
+    lookup_misses = [miss for session in session_results if session for miss in session[1]]
+    latencies = np.array([rerun['seconds'] for rerun in reruns if rerun['error'] is None])
+    p50, p90, p95, p99 = np.percentile(latencies, [50, 90, 95, 99]) if len(latencies) else [float('nan')] * 4
+
+    return {
+        'sessions': num_sessions,
+        'reruns': len(reruns),
+        'errors': sum(rerun['error'] is not None for rerun in reruns),
+        'lookup_misses': len(lookup_misses),
+        'p50_seconds': float(p50),
+        'p90_seconds': float(p90),
+        'p95_seconds': float(p95),
+        'p99_seconds': float(p99),
+        'max_seconds': float(latencies.max()) if len(latencies) else float('nan'),
+        'throughput_per_second': len(latencies) / wall_seconds if wall_seconds > 0 else float('nan'),
+        'wall_seconds': wall_seconds,
+        'cpu_seconds': cpu_seconds,
+        'cpu_utilization': cpu_seconds / wall_seconds if wall_seconds > 0 else float('nan'),
+        'peak_rss_bytes': peak_rss,
+        'sample_errors': sorted({rerun['error'] for rerun in reruns if rerun['error']})[:5],
+        'sample_lookup_misses': sorted(set(lookup_misses))[:5]
+    }
+
+def environment_info():
+    """Describe the machine and library versions the numbers were taken with."""
+    import streamlit
+    return {
+        'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'streamlit': streamlit.__version__,
+        # ru_maxrss is in kilobytes on Linux and bytes on macOS
+        'process_max_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    }
+
+def format_table(levels):
+    """Render session levels as a fixed-width text table."""
+    lines = [
+        f"{'SESSIONS':>8} {'RERUNS':>7} {'ERRORS':>6} {'MISSES':>6} {'P50 S':>8} {'P90 S':>8} {'P99 S':>8} "
+        f"{'MAX S':>8} {'RERUN/S':>8} {'CPU %':>7} {'PEAK RSS MB':>12}"
+    ]
+    for level in levels:
+        rss_mb = level['peak_rss_bytes'] / 1e6 if level['peak_rss_bytes'] is not None else float('nan')
+        lines.append(
+            f"{level['sessions']:>8} {level['reruns']:>7} {level['errors']:>6} {level['lookup_misses']:>6} "
+            f"{level['p50_seconds']:>8.3f} {level['p90_seconds']:>8.3f} {level['p99_seconds']:>8.3f} "
+            f"{level['max_seconds']:>8.3f} {level['throughput_per_second']:>8.2f} "
+            f"{level['cpu_utilization'] * 100:>7.1f} {rss_mb:>12.1f}"
+        )
+    return "\n".join(lines)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test the churn dashboard with concurrent sessions.")
+    parser.add_argument('--sessions', type=int, nargs='+', default=DEFAULT_SESSIONS,
+                        help="Concurrent session counts to test (default: 1 2 4 8)")
+    parser.add_argument('--actions', type=int, default=DEFAULT_ACTIONS,
+                        help="Interactions replayed per session after the initial load")
+    parser.add_argument('--think-time', type=float, default=0.0,
+                        help="Mean pause between a session's interactions in seconds (default: none)")
+    parser.add_argument('--seed', type=int, default=0,
+                        help="Base random seed for the interaction scripts")
+    parser.add_argument('--output', help="Write machine-readable JSON results to this file")
+    args = parser.parse_args(argv)
+
+    from streamlit import logger as st_logger
+    st_logger.set_log_level('error')
+    warnings.simplefilter('ignore')
+
+    # Warm the process-wide caches once, like a server that has already served a page
+    run_session(0, 0, 0.0, args.seed)
+
+    levels = []
+    for num_sessions in args.sessions:
+        levels.append(run_level(num_sessions, args.actions, args.think_time, args.seed))
+        # The table goes to stderr so stdout stays valid JSON
+        print(format_table(levels), file=sys.stderr, flush=True)
+
+    report = {'environment': environment_info(), 'levels': levels}
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump(report, output, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+    return report
+
+if __name__ == '__main__':
+    main()
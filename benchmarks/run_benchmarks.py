@@ -0,0 +1,309 @@
+"""
+Headless benchmark suite for the dashboard's hot paths.
+
+Times data generation (both generate_mock_data copies), the queries the page
+sends to the app's backend (filtered count, KPIs, risk-factor counts, one
+leaderboard page), formatting and styling that page, create_pixel_chart and
+Plotly figure construction at several merchant counts, without starting a
+Streamlit server. Results are printed as a table
+and can be written as JSON to track regressions between releases.
+
+Usage:
+    python benchmarks/run_benchmarks.py
+    python benchmarks/run_benchmarks.py --tiers 1000 100000 --output bench.json
+"""
+import argparse
+import datetime
+import gc
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+import warnings
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_TIERS = [1_000, 100_000, 1_000_000]
+
+# Merchants rendered as pixel sparklines, i.e. one leaderboard page
+SPARKLINE_MERCHANTS = 100
+
+def _load_app():
+    """Import app.py without running main(); Streamlit calls run in bare mode."""
+    from streamlit import logger as st_logger
+    st_logger.set_log_level('error')
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        import app
+    return app
+
+def measure(func, *args, trace_memory=False):
+    """
+    Run func once and measure its wall time, or its peak memory.
+
+    Tracing allocations slows down Python-heavy code, so timing runs and
+    memory runs are kept separate.
+
+    Args:
+        func (callable): Stage function
+        *args: Arguments for func
+        trace_memory (bool): Measure peak traced allocations instead of time
+
+    Returns:
+        tuple: (result, seconds, peak_memory_bytes) - peak is None for timing runs
+    """
+    gc.collect()
+
+    if not trace_memory:
+        start = time.perf_counter()
+        result = func(*args)
+        return result, time.perf_counter() - start, None
+
+    tracemalloc.start()
+    try:
+        start = time.perf_counter()
+        result = func(*args)
+        seconds = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return result, seconds, peak
+
+def _filter_selection(merchants_df):
+    """A realistic sidebar state: one industry and two managers deselected, Low risk hidden."""
+    industries = sorted(merchants_df['industry'].unique())[1:]
+    segments = sorted(merchants_df['segment'].unique())
+    managers = sorted(merchants_df['account_manager'].unique())[2:]
+    return industries, segments, managers, ['High', 'Medium']
+
+def _filters(merchants_df):
+    """The sidebar state as the app passes it to the backend: sorted tuples in a MerchantFilters."""
+    from data.backends import MerchantFilters
+    return MerchantFilters(*(tuple(sorted(values)) for values in _filter_selection(merchants_df)))
+
+def _style_leaderboard_like_streamlit(styled_df):
+    """Compute every cell's style, as st.dataframe does when it marshals a Styler (pandas' own render limit lifted)."""
+    with pd.option_context('styler.render.max_elements', max(styled_df.data.size, 1)):
+        # The public render path; it also writes the HTML table, which st.dataframe skips
+        return styled_df.to_html()
+
+def _stage_generate_app(context):
+    merchants_df, volumes = context['app'].generate_mock_data(context['num_merchants'])
+    context['merchants_df'] = merchants_df
+    context['volumes'] = volumes
+
+def _stage_generate_module(context):
+    from data.mock_data import generate_mock_data
+    generate_mock_data(context['num_merchants'])
+
+def _stage_count(context):
+    context['backend'].count(context['filters'])
+
+def _stage_kpis(context):
+    context['backend'].kpis(context['filters'])
+
+def _stage_risk_factors(context):
+    context['factor_counts'] = context['backend'].risk_factor_counts(context['filters'])
+
+def _stage_leaderboard_page(context):
+    context['page_merchants'] = context['backend'].leaderboard_page(
+        context['filters'], 0, context['app'].LEADERBOARD_PAGE_SIZE
+    )
+
+def _stage_leaderboard_format(context):
+    from utils.metrics import format_leaderboard
+    context['display_df'] = format_leaderboard(context['page_merchants'])
+
+def _stage_leaderboard_styler(context):
+    from utils.metrics import style_leaderboard
+    _style_leaderboard_like_streamlit(style_leaderboard(context['display_df']))
+
+def _stage_pixel_chart(context):
+    for series in context['sparkline_series']:
+        context['app'].create_pixel_chart(series, color='cyan')
+
+def _stage_pixel_chart_module(context):
+    from utils.visualizations import create_pixel_chart
+    for series in context['sparkline_series']:
+        create_pixel_chart(series, color='cyan')
+
+def _stage_plotly_figures(context):
+    from utils.figures import monthly_volume_bar, risk_factor_bar, risk_gauge, risk_history_area
+    months = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+    figures = [
+        risk_gauge(float(context['page_merchants']['risk_score'].iloc[0])),
+        monthly_volume_bar(months, context['sparkline_series'][0]),
+        risk_history_area(months, list(range(12)), list(range(12)), list(range(12)))
+    ]
+    if not context['factor_counts'].empty:
+        figures.append(risk_factor_bar(context['factor_counts']))
+    # Serialization is part of what st.plotly_chart pays per figure
+    for fig in figures:
+        fig.to_json()
+
+def _stage_plotly_figures_cached(context):
+    from utils.figures import monthly_volume_bar, risk_gauge
+    # Every rerun after a merchant's first view: rebuild from the cached JSON, then serialize
+    cache = context['figure_cache']
+    months = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+    for merchant_id, series in zip(context['page_merchants']['merchant_id'], context['sparkline_series']):
+        cache.figure(('monthly_volume', merchant_id, 'bench'), lambda: monthly_volume_bar(months, series)).to_json()
+    risk_score = float(context['page_merchants']['risk_score'].iloc[0])
+    cache.figure(('risk_gauge', None, 'bench'), lambda: risk_gauge(risk_score)).to_json()
+
+# (name, function, feeds_later_stages) in execution order; later stages read what
+# earlier ones store in the context, so skipped feeder stages still run untimed
+STAGES = [
+    ('generate_mock_data[app]', _stage_generate_app, True),
+    ('generate_mock_data[data.mock_data]', _stage_generate_module, False),
+    ('backend_count', _stage_count, False),
+    ('backend_kpis', _stage_kpis, False),
+    ('backend_risk_factor_counts', _stage_risk_factors, True),
+    ('backend_leaderboard_page', _stage_leaderboard_page, True),
+    ('leaderboard_format', _stage_leaderboard_format, True),
+    ('leaderboard_styler', _stage_leaderboard_styler, False),
+    ('create_pixel_chart[app]', _stage_pixel_chart, False),
+    ('create_pixel_chart[utils.visualizations]', _stage_pixel_chart_module, False),
+    ('plotly_figures', _stage_plotly_figures, False),
+    ('plotly_figures_cached', _stage_plotly_figures_cached, False),
+]
+
+def _prepare_backend(context):
+    """Compact the generated data and build the backend the app queries, outside any timed stage."""
+    from data.backends import frame_backend
+    from data.compaction import compact_dataset
+    merchants_df, volumes = compact_dataset(context['merchants_df'], context['volumes'])
+    context['volumes'] = volumes
+    context['backend'] = frame_backend(merchants_df, volumes, engine=context['app'].ENGINE)
+    context['filters'] = _filters(merchants_df)
+
+def _prepare_sparklines(context):
+    """Volume series of one leaderboard page of merchants, built outside any timed stage."""
+    top_ids = context['page_merchants']['merchant_id'].head(SPARKLINE_MERCHANTS)
+    matrix = context['volumes'].take(top_ids).values
+    context['sparkline_series'] = [
+        [float(v) for v in row[~np.isnan(row)]] or [0.0]
+        for row in matrix
+    ]
+
+def _prepare_figure_cache(context):
+    """A FigureCache holding the figures the cached stage reads, filled outside any timed stage."""
+    from utils.figures import FigureCache
+    context['figure_cache'] = FigureCache()
+    _stage_plotly_figures_cached(context)
+
+def run_tier(num_merchants, skip=(), repeats=1, trace_memory=True, warmup=0):
+    """
+    Run every benchmark stage for one merchant count.
+
+    Args:
+        num_merchants (int): Number of merchants to generate
+        skip (set): Stage names to leave untimed
+        repeats (int): Timed runs per stage
+        trace_memory (bool): Add one traced run per stage to record peak memory
+        warmup (int): Untimed runs per stage before the timed ones
+
+    Returns:
+        list: One dict per stage with wall-time samples and peak memory
+    """
+    context = {'app': _load_app(), 'num_merchants': num_merchants}
+    results = []
+
+    for name, func, feeds_later_stages in STAGES:
+        if name.startswith('backend_') and 'backend' not in context:
+            _prepare_backend(context)
+        if name.startswith('create_pixel_chart') and 'sparkline_series' not in context:
+            _prepare_sparklines(context)
+        if name == 'plotly_figures_cached' and 'figure_cache' not in context:
+            _prepare_figure_cache(context)
+
+        if name in skip:
+            if feeds_later_stages:
+                func(context)
+            continue
+
+        for _ in range(warmup):
+            func(context)
+
+        samples = []
+        for _ in range(repeats):
+            _, seconds, _ = measure(func, context)
+            samples.append(seconds)
+
+        peak_memory = None
+        if trace_memory:
+            _, _, peak_memory = measure(func, context, trace_memory=True)
+
+        results.append({
+            'tier': num_merchants,
+            'stage': name,
+            'samples': samples,
+            'seconds': float(np.median(samples)),
+            'peak_memory_bytes': peak_memory
+        })
+
+    return results
+
+def environment_info():
+    """Describe the interpreter and library versions the numbers were taken with."""
+    import plotly
+    import PIL
+    return {
+        'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'plotly': plotly.__version__,
+        'pillow': PIL.__version__
+    }
+
+def format_table(results):
+    """Render results as a fixed-width text table."""
+    lines = [f"{'TIER':>10}  {'STAGE':<42} {'SECONDS':>10} {'PEAK MB':>10}"]
+    for row in results:
+        peak_mb = row['peak_memory_bytes'] / 1e6 if row['peak_memory_bytes'] is not None else float('nan')
+        lines.append(f"{row['tier']:>10,}  {row['stage']:<42} {row['seconds']:>10.4f} {peak_mb:>10.2f}")
+    return "\n".join(lines)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the churn dashboard hot paths.")
+    parser.add_argument('--tiers', type=int, nargs='+', default=DEFAULT_TIERS,
+                        help="Merchant counts to benchmark (default: 1k, 100k, 1M)")
+    parser.add_argument('--skip', nargs='*', default=[],
+                        help="Stage names to leave untimed")
+    parser.add_argument('--repeats', type=int, default=1,
+                        help="Timed runs per stage")
+    parser.add_argument('--no-memory', action='store_true',
+                        help="Skip the extra traced run that records peak memory")
+    parser.add_argument('--output', help="Write machine-readable JSON results to this file")
+    args = parser.parse_args(argv)
+
+    results = []
+    for tier in args.tiers:
+        tier_results = run_tier(tier, skip=set(args.skip), repeats=args.repeats,
+                                trace_memory=not args.no_memory)
+        # The table goes to stderr so stdout stays valid JSON
+        print(format_table(tier_results), file=sys.stderr, flush=True)
+        results.extend(tier_results)
+
+    report = {'environment': environment_info(), 'results': results}
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump(report, output, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+    return report
+
+if __name__ == '__main__':
+    main()
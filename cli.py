@@ -0,0 +1,262 @@
+"""
+Command-line tools for running the churn dashboard in production.
+
+Usage:
+    python cli.py publish --store /dev/shm/churn-radar --merchants 100000
+    python cli.py publish --format sqlite --store /var/tmp/churn-radar-db --merchants 10000000
+    python cli.py simulate-events --log /var/tmp/churn-radar-events.jsonl --events 100000
+    python cli.py report --output-dir reports/ --store /dev/shm/churn-radar --workers 4
+    python cli.py api --port 8502 --store /dev/shm/churn-radar
+    python cli.py export --output at-risk.parquet --format parquet --store /dev/shm/churn-radar --risk-categories High
+"""
+import argparse
+import os
+import sys
+import time
+import warnings
+
+def _generate_mock_data(num_merchants):
+    """The dashboard's own mock data generator, imported without running the app."""
+    from streamlit import logger as st_logger
+    st_logger.set_log_level('error')
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        import app
+    return app.generate_mock_data(num_merchants)
+
+def publish(args):
+    """Generate the dataset, compact it and publish it to the shared or SQLite store as a new version."""
+    from data.compaction import compact_dataset
+
+    merchants_df, volumes = compact_dataset(*_generate_mock_data(args.merchants))
+
+    if args.format == 'sqlite':
+        from data.sqlite_backend import default_database_dir, publish_database
+
+        store_dir = args.store or default_database_dir()
+        path = publish_database(merchants_df, volumes, store_dir, version=args.version, keep=args.keep)
+        print(f"Published {path} ({len(merchants_df):,} merchants, {len(volumes.months)} months of volumes)")
+        return 0
+
+    from data.shared_store import default_store_dir, publish_dataset
+
+    store_dir = args.store or default_store_dir()
+    manifest = publish_dataset(merchants_df, volumes, store_dir, version=args.version, keep=args.keep)
+    print(f"Published {manifest['version']} to {store_dir} "
+          f"({manifest['tables']['merchants']['rows']:,} merchants, "
+          f"{len(manifest['volumes']['months'])} months of volumes)")
+    return 0
+
+def simulate_events(args):
+    """Append random payment events for the mock merchants to an event log, standing in for the event bus."""
+    import datetime
+    import numpy as np
+    import pandas as pd
+    from data.events import EVENT_STATUSES, append_events
+
+    rng = np.random.default_rng(args.seed)
+    # Same ids as generate_mock_data
+    merchant_ids = np.array([f'M{i:04d}' for i in range(1, args.merchants + 1)])
+    seconds_ago = rng.uniform(0, args.days * 86400, args.events)
+
+    events_df = pd.DataFrame({
+        'merchant_id': rng.choice(merchant_ids, args.events),
+        'timestamp': pd.Timestamp(datetime.datetime.now()) - pd.to_timedelta(seconds_ago, unit='s'),
+        'amount': np.round(rng.lognormal(4, 1, args.events), 2),
+        'status': rng.choice(EVENT_STATUSES, args.events, p=[0.9, 0.03, 0.07]),
+        'fraud': rng.random(args.events) < 0.01
+    }).sort_values('timestamp')
+
+    append_events(args.log, events_df)
+    print(f"Appended {args.events:,} events for {args.merchants:,} merchants to {args.log}")
+    return 0
+
+def _dataset_source(args):
+    """Dataset source (see utils.reports.open_backend) and version for --database, --store or mock data."""
+    if args.database:
+        from data.shared_store import current_version
+        from data.sqlite_backend import DATABASE_SUFFIX
+
+        version = current_version(args.database)
+        source = ('sqlite', os.path.join(args.database, version + DATABASE_SUFFIX))
+    elif args.store:
+        from data.shared_store import current_version
+
+        version = current_version(args.store)
+        source = ('shared', args.store, version)
+    else:
+        from data.compaction import compact_dataset
+
+        merchants_df, volumes = compact_dataset(*_generate_mock_data(args.merchants))
+        version = f"mock-{args.merchants}"
+        source = ('frames', merchants_df, volumes)
+    return source, version
+
+def report(args):
+    """Write one static HTML digest per account manager, rendered in parallel worker processes."""
+    from utils.reports import generate_reports
+
+    source, version = _dataset_source(args)
+
+    managers = args.managers
+    if not managers:
+        from utils.reports import open_backend
+        managers = open_backend(source).distinct('account_manager')
+
+    start = time.perf_counter()
+    results = generate_reports(source, managers, args.output_dir, version, workers=args.workers, top_n=args.top)
+    wall_seconds = time.perf_counter() - start
+
+    print(f"{'MANAGER':<24} {'RENDER MS':>10} {'SIZE KB':>10}  FILE")
+    for result in results:
+        print(f"{result['manager']:<24} {result['seconds'] * 1000:>10.0f} "
+              f"{result['bytes'] / 1024:>10.1f}  {result['path']}")
+    print(f"{len(results)} reports for data version {version}, "
+          f"{sum(result['bytes'] for result in results) / 1024:,.1f} KB in total, "
+          f"{wall_seconds:.2f} s wall time")
+    return 0
+
+def export(args):
+    """Stream the filtered leaderboard to a CSV or Parquet file (or stdout) in chunks."""
+    from data.backends import MerchantFilters
+    from utils.export import export_leaderboard
+    from utils.reports import open_backend
+
+    source, version = _dataset_source(args)
+    backend = open_backend(source)
+    filters = MerchantFilters(*(
+        tuple(values) if values else None
+        for values in (args.industries, args.segments, args.managers, args.risk_categories)
+    ))
+
+    start = time.perf_counter()
+    if args.output == '-':
+        rows = export_leaderboard(backend, filters, sys.stdout.buffer, args.format, args.chunk_size)
+    else:
+        with open(args.output, 'wb') as output:
+            rows = export_leaderboard(backend, filters, output, args.format, args.chunk_size)
+    # Progress goes to stderr so the export itself can go to stdout
+    print(f"Exported {rows:,} merchants from data version {version} to {args.output} "
+          f"({time.perf_counter() - start:.2f} s)", file=sys.stderr)
+    return 0
+
+def _dataset_loader(args):
+    """DatasetRefresher loader for --database, --store or mock data generated once."""
+    if args.database:
+        from data.sqlite_backend import sqlite_loader
+        return sqlite_loader(args.database)
+    if args.store:
+        from data.refresh import shared_store_loader
+        return shared_store_loader(args.store)
+
+    def load_mock(loaded_version):
+        if loaded_version:
+            return None
+        from data.compaction import compact_dataset
+        merchants_df, volumes = compact_dataset(*_generate_mock_data(args.merchants))
+        return merchants_df, volumes, f"mock-{args.merchants}"
+
+    return load_mock
+
+def api(args):
+    """Serve KPIs, risk factors, leaderboard pages and merchant profiles as read-only JSON."""
+    from data.refresh import DatasetRefresher
+    from utils.api import MetricsAPI, api_derived_data, make_api_server
+
+    refresher = DatasetRefresher(_dataset_loader(args), build_derived=api_derived_data,
+                                 interval_seconds=args.refresh_seconds or None)
+    refresher.refresh_now()
+    refresher.start()
+
+    server = make_api_server(MetricsAPI(refresher, cache_entries=args.cache_entries),
+                             args.host, args.port, access_log=args.access_log)
+    print(f"Serving data version {refresher.current().version} on "
+          f"http://{server.server_address[0]}:{server.server_address[1]}/ (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        refresher.stop()
+    return 0
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Churn Risk Radar command-line tools.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    publish_parser = subparsers.add_parser(
+        'publish', help="Publish the dataset to the shared store read by the Streamlit workers")
+    publish_parser.add_argument('--format', choices=['npy', 'sqlite'], default='npy',
+                                help="npy: memory-mapped shared store (default); sqlite: on-disk database "
+                                     "the dashboard queries instead of loading")
+    publish_parser.add_argument('--store', help="Store directory (default: /dev/shm/churn-radar, "
+                                                "or /var/tmp/churn-radar-db for sqlite)")
+    publish_parser.add_argument('--merchants', type=int, default=100,
+                                help="Number of merchants to generate (default: 100)")
+    publish_parser.add_argument('--version', help="Version name (default: timestamp based)")
+    publish_parser.add_argument('--keep', type=int, default=2,
+                                help="Versions kept on disk for workers still attached (default: 2)")
+    publish_parser.set_defaults(handler=publish)
+
+    events_parser = subparsers.add_parser(
+        'simulate-events', help="Append random payment events to the log ingested by the dashboard")
+    events_parser.add_argument('--log', required=True, help="Event log file (JSON lines, appended to)")
+    events_parser.add_argument('--merchants', type=int, default=100,
+                               help="Mock merchants the events are spread over (default: 100)")
+    events_parser.add_argument('--events', type=int, default=10000, help="Events to append (default: 10000)")
+    events_parser.add_argument('--days', type=float, default=30,
+                               help="Spread the timestamps over this many past days (default: 30)")
+    events_parser.add_argument('--seed', type=int, help="Random seed (default: unseeded)")
+    events_parser.set_defaults(handler=simulate_events)
+
+    report_parser = subparsers.add_parser(
+        'report', help="Write a static HTML digest of at-risk merchants for each account manager")
+    report_parser.add_argument('--output-dir', default='reports', help="Directory for the reports (default: reports)")
+    report_parser.add_argument('--store', help="Read the shared store in this directory (default: generate mock data)")
+    report_parser.add_argument('--database', help="Read the SQLite store in this directory instead")
+    report_parser.add_argument('--merchants', type=int, default=100,
+                               help="Mock merchants to generate without a store (default: 100)")
+    report_parser.add_argument('--managers', nargs='+', help="Account managers to report on (default: all)")
+    report_parser.add_argument('--top', type=int, default=20, help="At-risk merchants listed per report (default: 20)")
+    report_parser.add_argument('--workers', type=int, help="Worker processes (default: one per CPU)")
+    report_parser.set_defaults(handler=report)
+
+    export_parser = subparsers.add_parser(
+        'export', help="Export the filtered merchant leaderboard, highest risk first, to CSV or Parquet")
+    export_parser.add_argument('--output', required=True, help="File to write, or - for stdout")
+    export_parser.add_argument('--format', choices=['csv', 'parquet'], default='csv',
+                               help="csv: the dashboard's display text (default); parquet: typed values")
+    export_parser.add_argument('--store', help="Read the shared store in this directory (default: generate mock data)")
+    export_parser.add_argument('--database', help="Read the SQLite store in this directory instead")
+    export_parser.add_argument('--merchants', type=int, default=100,
+                               help="Mock merchants to generate without a store (default: 100)")
+    export_parser.add_argument('--industries', nargs='+', help="Industries to keep (default: all)")
+    export_parser.add_argument('--segments', nargs='+', help="Size segments to keep (default: all)")
+    export_parser.add_argument('--managers', nargs='+', help="Account managers to keep (default: all)")
+    export_parser.add_argument('--risk-categories', nargs='+', choices=['High', 'Medium', 'Low'],
+                               help="Risk categories to keep (default: all)")
+    export_parser.add_argument('--chunk-size', type=int, default=50000,
+                               help="Merchants fetched and written per chunk (default: 50000)")
+    export_parser.set_defaults(handler=export)
+
+    api_parser = subparsers.add_parser(
+        'api', help="Serve the dashboard's metrics as a read-only JSON API with ETag caching")
+    api_parser.add_argument('--host', default='127.0.0.1', help="Interface to listen on (default: 127.0.0.1)")
+    api_parser.add_argument('--port', type=int, default=8502, help="Port to listen on (default: 8502)")
+    api_parser.add_argument('--store', help="Read the shared store in this directory (default: generate mock data)")
+    api_parser.add_argument('--database', help="Read the SQLite store in this directory instead")
+    api_parser.add_argument('--merchants', type=int, default=100,
+                            help="Mock merchants to generate without a store (default: 100)")
+    api_parser.add_argument('--refresh-seconds', type=float, default=60,
+                            help="Seconds between checks for a new store version (default: 60, 0 disables)")
+    api_parser.add_argument('--cache-entries', type=int, default=4096,
+                            help="Responses kept in the LRU cache (default: 4096, 0 disables)")
+    api_parser.add_argument('--access-log', action='store_true', help="Log every request to stderr")
+    api_parser.set_defaults(handler=api)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+if __name__ == '__main__':
+    sys.exit(main())
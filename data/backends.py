@@ -0,0 +1,306 @@
+from collections import namedtuple
+
+import numpy as np
+
+from data.volumes import VolumeMatrix
+from utils.metrics import compute_kpis, count_risk_factors, filter_merchants, sort_leaderboard
+from utils.portfolio import build_manager_partitions, manager_workload
+from utils.retention import cohort_retention_matrix
+
+# Sidebar filter state; each field is a tuple of values to keep, or None for no filter.
+# Hashable, so it doubles as the cache key for filtered computations.
+MerchantFilters = namedtuple('MerchantFilters', ['industries', 'segments', 'managers', 'risk_categories'])
+
+# No filtering at all
+ALL_MERCHANTS = MerchantFilters(None, None, None, None)
+
+# Merchant columns the filter options may be read from
+FILTER_COLUMNS = ('industry', 'segment', 'account_manager', 'risk_category')
+
+# Merchants per chunk when a full scan reads the volume history chunk by chunk
+VOLUME_CHUNK_ROWS = 50_000
+
+# Engines that can run the queries over the in-memory data
+ENGINES = ('pandas', 'polars')
+
+def sort_factor_counts(factor_counts):
+    """Most common risk factor first, ties by name, so every backend returns the same order."""
+    return factor_counts.sort_values(
+        ['Count', 'Risk Factor'], ascending=[False, True], ignore_index=True
+    )
+
+class FrameBackend:
+    """
+    Dashboard queries over the in-memory merchant table and volume matrix.
+
+    This is the default backend. SQLiteBackend (data/sqlite_backend.py)
+    answers the same queries from an on-disk database instead, so the app only
+    talks to this interface and never to the frames directly.
+
+    Args:
+        merchants_df (DataFrame): Merchant data
+        volumes (VolumeMatrix): Monthly volume history
+    """
+
+    def __init__(self, merchants_df, volumes):
+        self.merchants_df = merchants_df
+        self.volumes = volumes
+        # Row positions per manager, so a single manager's book is a slice instead of a scan
+        self.manager_partitions = build_manager_partitions(merchants_df)
+
+    def _filtered(self, filters):
+        base_df = self.merchants_df
+        managers = filters.managers
+        if managers is not None and len(managers) == 1:
+            partition = self.manager_partitions.get(managers[0], np.empty(0, dtype=np.int64))
+            base_df, managers = base_df.iloc[partition], None
+        return filter_merchants(base_df, filters.industries, filters.segments, managers, filters.risk_categories)
+
+    def distinct(self, column):
+        """
+        Sorted distinct values of a filter column.
+
+        Args:
+            column (str): One of FILTER_COLUMNS
+
+        Returns:
+            list: Distinct values
+        """
+        if column not in FILTER_COLUMNS:
+            raise ValueError(f"Not a filter column: {column}")
+        return sorted(self.merchants_df[column].unique().tolist())
+
+    def risk_factor_options(self):
+        """
+        Sorted distinct risk factors.
+
+        Returns:
+            list: Risk factor names
+        """
+        return sorted(self.merchants_df['risk_factors'].explode().dropna().unique().tolist())
+
+    def count(self, filters=ALL_MERCHANTS):
+        """
+        Number of merchants matching the filters.
+
+        Args:
+            filters (MerchantFilters): Filter state
+
+        Returns:
+            int: Merchant count
+        """
+        return len(self._filtered(filters))
+
+    def kpis(self, filters):
+        """
+        CURRENT STATUS metric cards for the filtered merchants.
+
+        Args:
+            filters (MerchantFilters): Filter state
+
+        Returns:
+            dict: high_risk_count, medium_risk_count, at_risk_volume and avg_risk_score
+        """
+        return compute_kpis(self._filtered(filters))
+
+    def risk_factor_counts(self, filters):
+        """
+        Merchants per risk factor among the filtered merchants.
+
+        Args:
+            filters (MerchantFilters): Filter state
+
+        Returns:
+            DataFrame: 'Risk Factor' and 'Count' columns, most common first
+        """
+        return sort_factor_counts(count_risk_factors(self._filtered(filters)))
+
+    def leaderboard_page(self, filters, page, page_size):
+        """
+        One page of the filtered merchants, highest risk score first.
+
+        Args:
+            filters (MerchantFilters): Filter state
+            page (int): Zero-based page number
+            page_size (int): Merchants per page
+
+        Returns:
+            DataFrame: Merchant rows of the page, all columns
+        """
+        start = page * page_size
+        return sort_leaderboard(self._filtered(filters)).iloc[start:start + page_size].reset_index(drop=True)
+
+    def _leaderboard_positions(self, filters):
+        # Row positions of the filtered merchants in leaderboard order, without copying any rows
+        positions = np.arange(len(self.merchants_df))
+        if filters.managers is not None and len(filters.managers) == 1:
+            positions = self.manager_partitions.get(filters.managers[0], np.empty(0, dtype=np.int64))
+            filters = filters._replace(managers=None)
+        for column, values in zip(FILTER_COLUMNS, filters):
+            if values is not None:
+                positions = positions[self.merchants_df[column].iloc[positions].isin(values).to_numpy()]
+        # Negated scores keep the stable descending order of sort_leaderboard (NaN last)
+        scores = self.merchants_df['risk_score'].to_numpy(dtype=np.float64)[positions]
+        return positions[np.argsort(-scores, kind='stable')]
+
+    def iter_leaderboard(self, filters, chunk_size, columns=None):
+        """
+        The whole filtered leaderboard, highest risk score first, in chunks.
+
+        Only one chunk of the projected columns is materialized at a time, so
+        exporting a million merchants costs no more memory than a page.
+
+        Args:
+            filters (MerchantFilters): Filter state
+            chunk_size (int): Merchants per chunk
+            columns (list): Columns to return (default: all)
+
+        Yields:
+            DataFrame: Consecutive leaderboard rows with a fresh index
+        """
+        columns = list(columns) if columns is not None else list(self.merchants_df.columns)
+        column_positions = self.merchants_df.columns.get_indexer(columns)
+        positions = self._leaderboard_positions(filters)
+        for start in range(0, len(positions), chunk_size):
+            chunk = self.merchants_df.iloc[positions[start:start + chunk_size], column_positions]
+            yield chunk.reset_index(drop=True)
+
+    def frame(self, filters=ALL_MERCHANTS, columns=None):
+        """
+        Filtered merchant rows with only the given columns, in table order.
+
+        Args:
+            filters (MerchantFilters): Filter state
+            columns (list): Columns to return (default: all)
+
+        Returns:
+            DataFrame: Filtered merchants
+        """
+        filtered_df = self._filtered(filters)
+        return filtered_df if columns is None else filtered_df[list(columns)]
+
+    def matching_ids(self, filters, merchant_ids):
+        """
+        The given merchant ids that match the filters.
+
+        Args:
+            filters (MerchantFilters): Filter state
+            merchant_ids (iterable): Candidate merchant ids (e.g. of queued alerts)
+
+        Returns:
+            set: Matching merchant ids
+        """
+        filtered_df = self._filtered(filters)
+        candidates = filtered_df['merchant_id'][filtered_df['merchant_id'].isin(list(merchant_ids))]
+        return set(candidates.tolist())
+
+    def merchant_names(self, merchant_ids):
+        """
+        Display name of each given merchant.
+
+        Args:
+            merchant_ids (iterable): Merchant ids
+
+        Returns:
+            dict: merchant_id -> merchant_name for the ids that exist
+        """
+        rows = self.merchants_df[self.merchants_df['merchant_id'].isin(list(merchant_ids))]
+        return dict(zip(rows['merchant_id'].tolist(), rows['merchant_name'].tolist()))
+
+    def merchant(self, merchant_id):
+        """
+        One merchant's row.
+
+        Args:
+            merchant_id (str): Merchant id
+
+        Returns:
+            Series: All columns of the merchant, or None if there is no such merchant
+        """
+        rows = self.merchants_df[self.merchants_df['merchant_id'] == merchant_id]
+        return rows.iloc[0] if len(rows) else None
+
+    def merchant_volumes(self, merchant_ids):
+        """
+        Volume history of the given merchants.
+
+        Args:
+            merchant_ids (list): Merchant ids
+
+        Returns:
+            VolumeMatrix: One row per id
+        """
+        return self.volumes.take(merchant_ids)
+
+    def volume_matrix(self, since_month=None):
+        """
+        Volume history of every merchant.
+
+        Args:
+            since_month (int): Only include months from this month index on (default: all)
+
+        Returns:
+            VolumeMatrix: Full matrix, or its trailing months
+        """
+        if since_month is None:
+            return self.volumes
+        start = int(np.searchsorted(self.volumes.months, since_month))
+        return VolumeMatrix(self.volumes.merchant_ids, self.volumes.months[start:], self.volumes.values[:, start:])
+
+    def iter_volume_chunks(self, since_month=None, chunk_rows=VOLUME_CHUNK_ROWS):
+        """
+        Volume history of every merchant in chunks of merchants, for full scans.
+
+        Args:
+            since_month (int): Only include months from this month index on (default: all)
+            chunk_rows (int): Merchants per chunk
+
+        Yields:
+            VolumeMatrix: Consecutive merchants, all with the same months (views of the matrix)
+        """
+        volumes = self.volume_matrix(since_month)
+        for start in range(0, volumes.shape[0], chunk_rows):
+            stop = start + chunk_rows
+            yield VolumeMatrix(volumes.merchant_ids[start:stop], volumes.months, volumes.values[start:stop])
+
+    def manager_workload(self):
+        """
+        Per-manager workload pre-aggregates (see utils.portfolio.manager_workload).
+
+        Returns:
+            DataFrame: One row per account manager
+        """
+        return manager_workload(self.merchants_df)
+
+    def cohort_matrix(self, metric):
+        """
+        Onboarding-cohort retention matrix over all merchants.
+
+        Args:
+            metric (str): 'active' or 'volume' (see cohort_retention_matrix)
+
+        Returns:
+            DataFrame: Cohort x months-since-onboarding matrix
+        """
+        return cohort_retention_matrix(self.merchants_df, self.volumes, metric=metric)
+
+def frame_backend(merchants_df, volumes, engine='pandas'):
+    """
+    Backend over the in-memory data for the given engine.
+
+    'polars' needs the optional polars package; it is only imported when chosen.
+
+    Args:
+        merchants_df (DataFrame): Merchant data
+        volumes (VolumeMatrix): Monthly volume history
+        engine (str): One of ENGINES
+
+    Returns:
+        FrameBackend: FrameBackend or PolarsBackend
+    """
+    if engine == 'pandas':
+        return FrameBackend(merchants_df, volumes)
+    if engine == 'polars':
+        from data.polars_backend import PolarsBackend
+        return PolarsBackend(merchants_df, volumes)
+    raise ValueError(f"Unknown engine: {engine} (expected one of {', '.join(ENGINES)})")
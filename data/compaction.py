@@ -0,0 +1,119 @@
+import numpy as np
+import pandas as pd
+
+# Text columns with at most this share of distinct values become categoricals
+CATEGORY_MAX_RATIO = 0.5
+
+# Columns parsed as datetimes when present
+DATETIME_COLUMNS = ['onboarding_date']
+
+def _is_list_column(series):
+    """Whether an object column holds lists (e.g. risk_factors), which stay as they are."""
+    return len(series) > 0 and isinstance(series.iloc[0], (list, tuple))
+
+def compact_column(series, datetime_column=False):
+    """
+    Smallest dtype that holds a column's values without losing information.
+
+    Integers are downcast to the narrowest type that fits their range (unsigned
+    when nothing is negative), floats become float32, and text columns become
+    categoricals when values repeat or Arrow strings when they are unique.
+
+    Args:
+        series (Series): Column to compact
+        datetime_column (bool): Parse the values as datetimes
+
+    Returns:
+        Series: Compacted column
+    """
+    dtype = series.dtype
+
+    if datetime_column:
+        return pd.to_datetime(series)
+    if pd.api.types.is_bool_dtype(dtype) or isinstance(dtype, pd.CategoricalDtype):
+        return series
+    if pd.api.types.is_integer_dtype(dtype):
+        if len(series) == 0:
+            return series
+        return pd.to_numeric(series, downcast='unsigned' if series.min() >= 0 else 'integer')
+    if pd.api.types.is_float_dtype(dtype):
+        return series.astype(np.float32)
+    if dtype == object and not _is_list_column(series):
+        if series.nunique() <= CATEGORY_MAX_RATIO * len(series):
+            return series.astype('category')
+        return series.astype('string[pyarrow]')
+    return series
+
+def compact_frame(df, datetime_columns=DATETIME_COLUMNS):
+    """
+    Copy of a DataFrame with every column in its smallest dtype.
+
+    Args:
+        df (DataFrame): Data to compact
+        datetime_columns (list): Columns to parse as datetimes
+
+    Returns:
+        DataFrame: Compacted copy with the same columns and index
+    """
+    return pd.DataFrame({
+        name: compact_column(df[name], datetime_column=name in datetime_columns)
+        for name in df.columns
+    }, index=df.index)
+
+def compact_dataset(merchants_df, volumes):
+    """
+    Compact the merchant table and volume matrix at load time.
+
+    Volumes are stored as float32, which holds whole amounts exactly up to
+    16.7M per merchant and month and keeps NaN for months without data.
+
+    Args:
+        merchants_df (DataFrame): Merchant data
+        volumes (VolumeMatrix): Monthly volume history
+
+    Returns:
+        tuple: (merchants_df, volumes) compacted
+    """
+    return compact_frame(merchants_df), volumes.astype(np.float32)
+
+def _memory_usage(table):
+    """Deep bytes per column of a DataFrame, or per component of a VolumeMatrix."""
+    if isinstance(table, pd.DataFrame):
+        return table.memory_usage(index=False, deep=True)
+    return table.memory_usage()
+
+def memory_report(tables_before, tables_after):
+    """
+    Bytes per column before and after compaction.
+
+    String and list columns are measured deeply, so the numbers include the
+    Python objects they point to. A VolumeMatrix is reported per component
+    (values, months, merchant_ids).
+
+    Args:
+        tables_before (dict): Table name -> DataFrame or VolumeMatrix before compaction, or None if unknown
+        tables_after (dict): Table name -> DataFrame or VolumeMatrix as loaded
+
+    Returns:
+        DataFrame: One row per column with table, column, dtypes and byte counts
+    """
+    rows = []
+    for table, after_df in tables_after.items():
+        before_df = (tables_before or {}).get(table)
+        after_bytes = _memory_usage(after_df)
+        before_bytes = _memory_usage(before_df) if before_df is not None else None
+
+        for name in after_df.dtypes.index:
+            rows.append({
+                'table': table,
+                'column': name,
+                'dtype_before': str(before_df.dtypes[name]) if before_df is not None else None,
+                'dtype_after': str(after_df.dtypes[name]),
+                'bytes_before': int(before_bytes[name]) if before_bytes is not None else None,
+                'bytes_after': int(after_bytes[name])
+            })
+
+    # Nullable integers, so unknown 'before' sizes stay missing instead of turning the column into objects
+    return pd.DataFrame(rows, columns=[
+        'table', 'column', 'dtype_before', 'dtype_after', 'bytes_before', 'bytes_after'
+    ]).astype({'bytes_before': 'Int64', 'bytes_after': 'Int64'})
@@ -0,0 +1,460 @@
+import io
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from data.volumes import VolumeMatrix, encode_months
+from utils.transactions import TRANSACTION_COUNTERS, TRANSACTION_WINDOW_MONTHS, with_transaction_counters
+
+# Fields of a payment event, in the order they are written; 'fraud' (bool) is optional
+EVENT_COLUMNS = ['merchant_id', 'timestamp', 'amount', 'status', 'fraud']
+
+# Outcomes of a payment attempt: 'succeeded' was authorized and captured, 'failed' was
+# authorized but not completed (capture error, timeout) and 'declined' was refused
+EVENT_STATUSES = ('succeeded', 'failed', 'declined')
+AUTHORIZED_STATUSES = ('succeeded', 'failed')
+
+# Counters kept per merchant and month, each a uint32 matrix
+COUNTERS = tuple(TRANSACTION_COUNTERS)
+
+# Events read from the log per micro-batch
+DEFAULT_BATCH_EVENTS = 50_000
+
+def append_events(path, events_df):
+    """
+    Append events to a JSON-lines log in a single write.
+
+    Args:
+        path (str): Event log file (created if missing)
+        events_df (DataFrame): Events with EVENT_COLUMNS
+    """
+    payload = events_df.reindex(columns=EVENT_COLUMNS).to_json(orient='records', lines=True, date_format='iso')
+    if not payload.endswith('\n'):
+        payload += '\n'
+    with open(path, 'a') as log:
+        log.write(payload)
+
+def parse_events(data):
+    """
+    Parse a block of JSON-lines events.
+
+    Args:
+        data (bytes): Complete lines from the event log
+
+    Returns:
+        DataFrame: merchant_id, timestamp (datetime64), amount (float64), status and fraud (bool)
+    """
+    if not data.strip():
+        return pd.DataFrame({
+            'merchant_id': pd.Series(dtype=object),
+            'timestamp': pd.Series(dtype='datetime64[ns]'),
+            'amount': pd.Series(dtype=np.float64),
+            'status': pd.Series(dtype=object),
+            'fraud': pd.Series(dtype=bool)
+        })
+    events_df = pd.read_json(io.BytesIO(data), lines=True, dtype=False, convert_dates=False)
+    events_df = events_df.reindex(columns=EVENT_COLUMNS)
+    events_df['timestamp'] = pd.to_datetime(events_df['timestamp'], format='ISO8601', errors='coerce')
+    events_df['amount'] = pd.to_numeric(events_df['amount'], errors='coerce').astype(np.float64)
+    # Events without a fraud flag were not flagged
+    events_df['fraud'] = events_df['fraud'].eq(True)
+    return events_df
+
+class EventLogReader:
+    """
+    Reads an append-only JSON-lines event log in micro-batches.
+
+    The reader keeps the byte offset of the first unread event, so each event
+    is read exactly once and a restarted reader resumes from its checkpointed
+    offset. A last line without a newline is a write still in progress and is
+    left for the next batch.
+
+    Args:
+        path (str): Event log written by append_events (or the event bus)
+        offset (int): Byte offset to resume from
+    """
+
+    def __init__(self, path, offset=0):
+        self.path = path
+        self.offset = offset
+
+    def read_batch(self, max_events=DEFAULT_BATCH_EVENTS):
+        """
+        Read up to max_events new events.
+
+        Args:
+            max_events (int): Batch size
+
+        Returns:
+            DataFrame: Parsed events (empty when the log has nothing new)
+        """
+        lines = []
+        if os.path.exists(self.path):
+            with open(self.path, 'rb') as log:
+                log.seek(self.offset)
+                for line in log:
+                    if not line.endswith(b'\n'):
+                        break
+                    lines.append(line)
+                    if len(lines) >= max_events:
+                        break
+        self.offset += sum(len(line) for line in lines)
+        return parse_events(b''.join(lines))
+
+class MonthlyEventAggregates:
+    """
+    Per-merchant monthly volume and attempt counters, updated one batch at a time.
+
+    State is a set of merchants x months arrays: succeeded volume (float64)
+    plus the COUNTERS as uint32. A batch is added with a scatter-add into the
+    cells it touches, so the cost of an update depends on the batch only and
+    history is never rescanned. Rows grow (doubling their capacity) as new
+    merchants appear and columns as events arrive for new months.
+    """
+
+    def __init__(self):
+        self.merchant_ids = []
+        self._rows = {}
+        self.first_month = None
+        self.volume = np.zeros((0, 0), dtype=np.float64)
+        self.counters = {name: np.zeros((0, 0), dtype=np.uint32) for name in COUNTERS}
+        self.events_ingested = 0
+        self.events_skipped = 0
+
+    @property
+    def months(self):
+        if self.first_month is None:
+            return np.empty(0, dtype=np.int64)
+        return self.first_month + np.arange(self.volume.shape[1], dtype=np.int64)
+
+    def _row_positions(self, merchant_ids):
+        # Resolve each distinct id once; unseen merchants get the next free rows
+        codes, uniques = pd.factorize(merchant_ids)
+        unique_rows = np.empty(len(uniques), dtype=np.int64)
+        for i, merchant_id in enumerate(uniques):
+            row = self._rows.get(merchant_id)
+            if row is None:
+                row = self._rows[merchant_id] = len(self.merchant_ids)
+                self.merchant_ids.append(merchant_id)
+            unique_rows[i] = row
+        return unique_rows[codes]
+
+    def _reserve(self, first_month, last_month):
+        num_rows = len(self.merchant_ids)
+        old_first = self.first_month if self.first_month is not None else first_month
+        old_rows, old_months = self.volume.shape
+        new_first = min(old_first, first_month)
+        new_months = max(old_first + old_months, last_month + 1) - new_first
+        if num_rows <= old_rows and new_first == old_first and new_months == old_months:
+            return
+
+        new_rows = max(num_rows, 2 * old_rows) if num_rows > old_rows else old_rows
+        shift = old_first - new_first
+
+        def grow(array):
+            grown = np.zeros((new_rows, new_months), dtype=array.dtype)
+            grown[:old_rows, shift:shift + old_months] = array
+            return grown
+
+        self.volume = grow(self.volume)
+        self.counters = {name: grow(counts) for name, counts in self.counters.items()}
+        self.first_month = new_first
+
+    def update(self, events_df):
+        """
+        Add a batch of events.
+
+        Events without a merchant id, timestamp or amount are skipped and
+        counted in ``events_skipped``. Every other event is an attempt; the
+        volume of succeeded ones is added to their month and flagged ones
+        count as fraud flags.
+
+        Args:
+            events_df (DataFrame): Events as returned by EventLogReader.read_batch
+
+        Returns:
+            int: Events added
+        """
+        valid = events_df['merchant_id'].notna() & events_df['timestamp'].notna() & events_df['amount'].notna()
+        self.events_skipped += int((~valid).sum())
+        events_df = events_df[valid]
+        if events_df.empty:
+            return 0
+
+        rows = self._row_positions(events_df['merchant_id'].to_numpy())
+        months = encode_months(events_df['timestamp'])
+        self._reserve(int(months.min()), int(months.max()))
+        cols = months - self.first_month
+
+        status = events_df['status'].to_numpy()
+        succeeded = status == 'succeeded'
+        authorized = np.isin(status, AUTHORIZED_STATUSES)
+        flagged = events_df['fraud'].to_numpy(dtype=bool)
+
+        np.add.at(self.counters['attempts'], (rows, cols), 1)
+        np.add.at(self.counters['successes'], (rows[succeeded], cols[succeeded]), 1)
+        np.add.at(self.counters['authorizations'], (rows[authorized], cols[authorized]), 1)
+        np.add.at(self.counters['fraud_flags'], (rows[flagged], cols[flagged]), 1)
+        np.add.at(self.volume, (rows[succeeded], cols[succeeded]), events_df['amount'].to_numpy()[succeeded])
+
+        self.events_ingested += len(events_df)
+        return len(events_df)
+
+    def volume_matrix(self):
+        """
+        Succeeded volume per merchant and month.
+
+        Returns:
+            VolumeMatrix: Copy of the volumes (NaN for months without any attempt)
+        """
+        num_rows = len(self.merchant_ids)
+        attempts = self.counters['attempts'][:num_rows]
+        return VolumeMatrix(self.merchant_ids, self.months, np.where(attempts > 0, self.volume[:num_rows], np.nan))
+
+    def rate_matrix(self, counter):
+        """
+        Monthly share of attempts counted by a counter (e.g. the success rate).
+
+        Args:
+            counter (str): 'successes' or 'authorizations'
+
+        Returns:
+            ndarray: float64 merchants x months rates (NaN for months without attempts)
+        """
+        num_rows = len(self.merchant_ids)
+        attempts = self.counters['attempts'][:num_rows].astype(np.float64)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(attempts > 0, self.counters[counter][:num_rows] / attempts, np.nan)
+
+    def window_totals(self, end_month, months=TRANSACTION_WINDOW_MONTHS):
+        """
+        Counters and succeeded volume per merchant over a trailing window of months.
+
+        Args:
+            end_month (int): Last month index of the window
+            months (int): Window length
+
+        Returns:
+            DataFrame: One row per merchant id with COUNTERS and 'volume' columns
+        """
+        num_rows = len(self.merchant_ids)
+        first_month = self.first_month if self.first_month is not None else end_month + 1
+        start = max(end_month - months + 1 - first_month, 0)
+        stop = max(end_month + 1 - first_month, 0)
+        totals = {name: counts[:num_rows, start:stop].sum(axis=1, dtype=np.int64) for name, counts in self.counters.items()}
+        totals['volume'] = self.volume[:num_rows, start:stop].sum(axis=1)
+        return pd.DataFrame(totals, index=pd.Index(self.merchant_ids, name='merchant_id'))
+
+    def save(self, path, offset):
+        """
+        Write the aggregates and the log offset they cover, atomically.
+
+        Args:
+            path (str): Checkpoint file (.npz)
+            offset (int): Event log offset of the first event not yet added
+        """
+        num_rows = len(self.merchant_ids)
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.npz.tmp')
+        with os.fdopen(fd, 'wb') as checkpoint:
+            np.savez(
+                checkpoint,
+                offset=offset,
+                first_month=-1 if self.first_month is None else self.first_month,
+                merchant_ids=np.array(self.merchant_ids, dtype=str),
+                volume=self.volume[:num_rows],
+                events=np.array([self.events_ingested, self.events_skipped]),
+                **{name: counts[:num_rows] for name, counts in self.counters.items()}
+            )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Restore aggregates written by save.
+
+        Args:
+            path (str): Checkpoint file
+
+        Returns:
+            tuple: (MonthlyEventAggregates, event log offset)
+        """
+        aggregates = cls()
+        with np.load(path) as checkpoint:
+            aggregates.merchant_ids = checkpoint['merchant_ids'].tolist()
+            aggregates._rows = {merchant_id: row for row, merchant_id in enumerate(aggregates.merchant_ids)}
+            first_month = int(checkpoint['first_month'])
+            aggregates.first_month = None if first_month < 0 else first_month
+            aggregates.volume = checkpoint['volume']
+            # Counters added after the checkpoint was written start at zero
+            aggregates.counters = {
+                name: checkpoint[name] if name in checkpoint else np.zeros_like(checkpoint['volume'], dtype=np.uint32)
+                for name in COUNTERS
+            }
+            aggregates.events_ingested, aggregates.events_skipped = checkpoint['events'].tolist()
+            offset = int(checkpoint['offset'])
+        return aggregates, offset
+
+class EventIngestor:
+    """
+    Consumes the event log in micro-batches into MonthlyEventAggregates.
+
+    With a checkpoint path, the aggregates and log offset are saved after
+    every poll that added events and restored on start, so a restart picks
+    up where it stopped instead of replaying the log.
+
+    Args:
+        log_path (str): Event log
+        checkpoint_path (str): Checkpoint file, or None to keep state in memory only
+        batch_events (int): Events per micro-batch
+    """
+
+    def __init__(self, log_path, checkpoint_path=None, batch_events=DEFAULT_BATCH_EVENTS):
+        self.checkpoint_path = checkpoint_path
+        self.batch_events = batch_events
+        offset = 0
+        if checkpoint_path and os.path.exists(checkpoint_path):
+            self.aggregates, offset = MonthlyEventAggregates.load(checkpoint_path)
+        else:
+            self.aggregates = MonthlyEventAggregates()
+        self.reader = EventLogReader(log_path, offset)
+
+    def poll(self):
+        """
+        Add every complete event appended since the last poll, batch by batch.
+
+        Returns:
+            int: Events added
+        """
+        added = 0
+        while True:
+            events_df = self.reader.read_batch(self.batch_events)
+            if events_df.empty:
+                break
+            added += self.aggregates.update(events_df)
+        if added and self.checkpoint_path:
+            self.aggregates.save(self.checkpoint_path, self.reader.offset)
+        return added
+
+    def status(self):
+        """
+        Ingestion counters for display.
+
+        Returns:
+            dict: events_ingested, events_skipped, merchants and log offset
+        """
+        return {
+            'events_ingested': self.aggregates.events_ingested,
+            'events_skipped': self.aggregates.events_skipped,
+            'merchants': len(self.aggregates.merchant_ids),
+            'offset': self.reader.offset
+        }
+
+def _fitting_dtype(values, dtype):
+    """dtype if it holds every value, else int64 (for integer columns compacted to their old range)."""
+    if not np.issubdtype(dtype, np.integer) or len(values) == 0:
+        return dtype
+    limits = np.iinfo(dtype)
+    return dtype if limits.min <= values.min() and values.max() <= limits.max else np.dtype(np.int64)
+
+def apply_event_aggregates(merchants_df, volumes, aggregates):
+    """
+    Add event-derived monthly volumes to a dataset.
+
+    Events are payments made after the base snapshot, so each month with
+    attempts for a known merchant adds its succeeded volume to that
+    merchant's volume for the month. Events newer than the history extend
+    the month axis; such a month is still open, so merchants without events
+    in it stay empty (NaN) rather than dropping to zero. For merchants with
+    events latest_volume / volume_trend are recomputed, and the events of the
+    trailing window are added to their transaction counters.
+    Events for merchants missing from the merchant table are ignored.
+
+    Args:
+        merchants_df (DataFrame): Merchant data
+        volumes (VolumeMatrix): Monthly volume history
+        aggregates (MonthlyEventAggregates): Ingested events
+
+    Returns:
+        tuple: (merchants_df, volumes) updated copies, or the inputs if no events apply
+    """
+    event_volumes = aggregates.volume_matrix()
+    rows = volumes.row_positions(event_volumes.merchant_ids)
+    known = rows >= 0
+    if not known.any():
+        return merchants_df, volumes
+
+    first_month = min(volumes.months[0], event_volumes.months[0])
+    months = np.arange(first_month, max(volumes.months[-1], event_volumes.months[-1]) + 1, dtype=np.int64)
+    values = np.full((volumes.shape[0], len(months)), np.nan, dtype=volumes.values.dtype)
+    values[:, volumes.months - first_month] = volumes.values
+
+    cells = np.ix_(rows[known], event_volumes.months - first_month)
+    base, overlay = values[cells], event_volumes.values[known]
+    values[cells] = np.where(np.isnan(overlay), base, np.nan_to_num(base) + overlay)
+    merged = VolumeMatrix(volumes.merchant_ids, months, values)
+
+    # Recompute the summary columns only for merchants whose history events changed
+    touched = np.zeros(merged.shape[0], dtype=bool)
+    touched[rows[known]] = True
+    positions = merged.row_positions(merchants_df['merchant_id'])
+    updated_rows = (positions >= 0) & touched[positions]
+    latest = merged.values[positions, -1].astype(np.float64)
+    trend = merged.trend(6)[positions]
+
+    # Their transaction counters add the events over the trailing window
+    totals = aggregates.window_totals(int(merged.months[-1])).reindex(merchants_df['merchant_id'].to_numpy())
+    counters = pd.DataFrame({
+        counter: (merchants_df[counter].to_numpy(dtype=np.int64) if counter in merchants_df else 0)
+        + np.where(updated_rows, totals[counter].fillna(0).to_numpy(dtype=np.int64), 0)
+        for counter in TRANSACTION_COUNTERS
+    }, index=merchants_df.index)
+    window_volume = np.where(positions >= 0, merged.window_sum(TRANSACTION_WINDOW_MONTHS)[positions], np.nan)
+
+    merchants_df = with_transaction_counters(merchants_df, counters, window_volume)
+    latest_column = merchants_df['latest_volume']
+    # Event volume can push latest_volume past the range its dtype was compacted to
+    replace = updated_rows & np.isfinite(latest)
+    new_latest = np.where(replace, np.floor(np.nan_to_num(latest)), latest_column.to_numpy(dtype=np.float64))
+    merchants_df['latest_volume'] = new_latest.astype(_fitting_dtype(new_latest, latest_column.dtype))
+    trend_column = merchants_df['volume_trend']
+    merchants_df['volume_trend'] = trend_column.where(
+        ~(updated_rows & np.isfinite(trend)), trend.astype(trend_column.dtype)
+    )
+    return merchants_df, merged
+
+def event_stream_loader(base_loader, ingestor):
+    """
+    Loader that layers ingested events over another loader's dataset.
+
+    Each call asks the base loader for a new base version and polls the
+    event log; when either changed, the event aggregates are applied to the
+    latest base dataset and returned as a new version. The ingestion counters
+    are added to the load metadata as 'event_ingestion'.
+
+    Args:
+        base_loader (callable): Loader for the merchants and volume history (see DatasetRefresher)
+        ingestor (EventIngestor): Event log consumer
+
+    Returns:
+        callable: Loader for DatasetRefresher
+    """
+    state = {'base': None}
+
+    def load(loaded_version):
+        base = base_loader(state['base'][2] if state['base'] is not None else None)
+        if base is not None:
+            state['base'] = base
+        added = ingestor.poll()
+        if base is None and not added and loaded_version is not None:
+            return None
+
+        merchants_df, volumes, base_version = state['base'][:3]
+        metadata = dict(state['base'][3]) if len(state['base']) > 3 else {}
+        merchants_df, volumes = apply_event_aggregates(merchants_df, volumes, ingestor.aggregates)
+        metadata['event_ingestion'] = ingestor.status()
+        return merchants_df, volumes, f"{base_version}+events-{ingestor.aggregates.events_ingested}", metadata
+
+    return load
@@ -0,0 +1,113 @@
+import pandas as pd
+import polars as pl
+
+from data.backends import ALL_MERCHANTS, FILTER_COLUMNS, FrameBackend, sort_factor_counts
+
+# Position of each merchant in merchants_df, carried through the lazy queries
+ROW_COLUMN = '__row'
+
+def to_polars(merchants_df):
+    """
+    Polars copy of the merchant table with a row-position column.
+
+    Categoricals become plain strings, so the filters compare values the
+    same way pandas' isin does.
+
+    Args:
+        merchants_df (DataFrame): Merchant data
+
+    Returns:
+        DataFrame: Polars frame with ROW_COLUMN first
+    """
+    frame = pl.from_pandas(merchants_df.reset_index(drop=True))
+    frame = frame.with_columns(pl.col(pl.Categorical).cast(pl.Utf8))
+    return frame.with_row_index(ROW_COLUMN)
+
+class PolarsBackend(FrameBackend):
+    """
+    FrameBackend whose filters and aggregations run as Polars lazy queries.
+
+    Filters, KPIs, risk-factor counts and the leaderboard sort are planned
+    and executed by Polars across all cores, outside the GIL. Rows are
+    returned by position from merchants_df, so results keep the pandas
+    dtypes and match FrameBackend exactly. Distinct values, names, volumes
+    and the per-version aggregates come from FrameBackend unchanged.
+
+    Args:
+        merchants_df (DataFrame): Merchant data
+        volumes (VolumeMatrix): Monthly volume history
+    """
+
+    def __init__(self, merchants_df, volumes):
+        super().__init__(merchants_df, volumes)
+        self.merchants_pl = to_polars(merchants_df)
+
+    def _query(self, filters):
+        # MerchantFilters fields are in FILTER_COLUMNS order; the values are typed
+        # so an empty selection still compares as strings, and imploded into one
+        # list as newer Polars expects
+        conditions = [
+            pl.col(column).is_in(pl.Series(list(values), dtype=pl.Utf8).implode())
+            for column, values in zip(FILTER_COLUMNS, filters)
+            if values is not None
+        ]
+        query = self.merchants_pl.lazy()
+        return query.filter(pl.all_horizontal(conditions)) if conditions else query
+
+    def _rows(self, query):
+        return query.select(ROW_COLUMN).collect()[ROW_COLUMN].to_numpy()
+
+    def count(self, filters=ALL_MERCHANTS):
+        """Number of merchants matching the filters."""
+        return self._query(filters).select(pl.len()).collect().item()
+
+    def kpis(self, filters):
+        """CURRENT STATUS metric cards, aggregated in one Polars pass."""
+        at_risk = pl.col('risk_category').is_in(['High', 'Medium'])
+        row = self._query(filters).select(
+            (pl.col('risk_category') == 'High').sum().alias('high_risk_count'),
+            (pl.col('risk_category') == 'Medium').sum().alias('medium_risk_count'),
+            pl.col('monthly_volume_avg').filter(at_risk).cast(pl.Int64).sum().alias('at_risk_volume'),
+            pl.col('risk_score').mean().alias('avg_risk_score')
+        ).collect().row(0, named=True)
+        if row['avg_risk_score'] is None:
+            row['avg_risk_score'] = float('nan')
+        return row
+
+    def risk_factor_counts(self, filters):
+        """Merchants per risk factor among the filtered merchants, most common first."""
+        counts = (
+            self._query(filters)
+            .select(pl.col('risk_factors').explode().drop_nulls())
+            .group_by('risk_factors')
+            .len()
+            .collect()
+        )
+        return sort_factor_counts(pd.DataFrame({
+            'Risk Factor': counts['risk_factors'].to_list(),
+            'Count': counts['len'].to_list()
+        }))
+
+    def leaderboard_page(self, filters, page, page_size):
+        """One page of the filtered merchants, highest risk score first (ties in table order)."""
+        query = (
+            self._query(filters)
+            .sort('risk_score', descending=True, maintain_order=True)
+            .slice(page * page_size, page_size)
+        )
+        return self.merchants_df.iloc[self._rows(query)].reset_index(drop=True)
+
+    def _leaderboard_positions(self, filters):
+        query = self._query(filters).sort('risk_score', descending=True, maintain_order=True)
+        return self._rows(query)
+
+    def frame(self, filters=ALL_MERCHANTS, columns=None):
+        """Filtered merchant rows with only the given columns, in table order."""
+        filtered_df = self.merchants_df.iloc[self._rows(self._query(filters))]
+        return filtered_df if columns is None else filtered_df[list(columns)]
+
+    def matching_ids(self, filters, merchant_ids):
+        """The given merchant ids that match the filters."""
+        candidates = pl.Series(list(merchant_ids), dtype=pl.Utf8).implode()
+        query = self._query(filters).filter(pl.col('merchant_id').is_in(candidates))
+        return set(query.select('merchant_id').collect()['merchant_id'].to_list())
@@ -0,0 +1,149 @@
+import datetime
+import logging
+import threading
+from collections import namedtuple
+
+logger = logging.getLogger(__name__)
+
+# One immutable dataset version plus everything derived from it
+DatasetSnapshot = namedtuple('DatasetSnapshot', [
+    'version', 'merchants_df', 'volumes', 'derived', 'loaded_at'
+])
+
+class DatasetRefresher:
+    """
+    Keeps the current dataset snapshot and swaps in new versions in the background.
+
+    A background thread periodically calls ``loader(current_version)``. The
+    loader returns None when nothing changed, or ``(merchants_df, volumes,
+    version)`` for a new version, optionally followed by a dict of load
+    metadata (e.g. a memory report or a query backend) that is merged into the
+    snapshot's derived data. ``build_derived(merchants_df, volumes, metadata,
+    previous)`` then builds the indexes and pre-aggregates for it, still off
+    the request path; ``previous`` is the snapshot being replaced (None on the
+    first load), so incremental state can be carried forward instead of
+    rebuilt. Only the finished snapshot is swapped in with a single reference
+    assignment. The previous snapshot is kept (double buffer) so sessions can
+    finish reading it.
+
+    Args:
+        loader (callable): loader(current_version) -> None or (merchants_df, volumes, version[, metadata])
+        build_derived (callable): build_derived(merchants_df, volumes, metadata, previous) -> dict, optional
+        interval_seconds (float): Seconds between background checks; None disables the thread
+    """
+
+    def __init__(self, loader, build_derived=None, interval_seconds=None):
+        self.loader = loader
+        self.build_derived = build_derived
+        self.interval_seconds = interval_seconds
+        self.last_checked = None
+        self.last_error = None
+        self._current = None
+        self._previous = None
+        self._refresh_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def current(self):
+        """
+        The latest complete snapshot.
+
+        Read it once per rerun and use that object throughout, so one run never
+        mixes two versions.
+
+        Returns:
+            DatasetSnapshot: Current snapshot, or None before the first load
+        """
+        return self._current
+
+    def get(self, version):
+        """
+        Snapshot for a version that is still buffered (current or previous).
+
+        Args:
+            version (str): Dataset version
+
+        Returns:
+            DatasetSnapshot: The snapshot, or None if it has been released
+        """
+        for snapshot in (self._current, self._previous):
+            if snapshot is not None and snapshot.version == version:
+                return snapshot
+        return None
+
+    def refresh_now(self):
+        """
+        Check for a new version and swap it in; blocks until done.
+
+        Loader errors are logged and kept in ``last_error``; the current snapshot
+        stays in place, so users keep seeing the last good data.
+
+        Returns:
+            bool: Whether a new snapshot was swapped in
+        """
+        with self._refresh_lock:
+            self.last_checked = datetime.datetime.now()
+            current_version = self._current.version if self._current is not None else None
+            try:
+                loaded = self.loader(current_version)
+                if loaded is None:
+                    self.last_error = None
+                    return False
+
+                merchants_df, volumes, version = loaded[:3]
+                derived = dict(loaded[3]) if len(loaded) > 3 else {}
+                if self.build_derived:
+                    derived.update(self.build_derived(merchants_df, volumes, derived, self._current))
+                snapshot = DatasetSnapshot(version, merchants_df, volumes, derived, datetime.datetime.now())
+            except Exception as e:
+                logger.exception("Dataset refresh failed")
+                self.last_error = f"{type(e).__name__}: {e}"
+                if self._current is None:
+                    raise
+                return False
+
+            self._previous, self._current = self._current, snapshot
+            self.last_error = None
+            return True
+
+    def start(self):
+        """Start the background refresh thread (no-op without an interval or if running)."""
+        if self.interval_seconds is None or (self._thread is not None and self._thread.is_alive()):
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name='dataset-refresher', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the background thread and wait for an in-progress refresh to finish."""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval_seconds):
+            try:
+                self.refresh_now()
+            except Exception:
+                # Already logged; keep serving the current snapshot and retry next interval
+                pass
+
+def shared_store_loader(store_dir):
+    """
+    Loader that attaches to the shared store whenever a new version is published.
+
+    Args:
+        store_dir (str): Store directory written by `python cli.py publish`
+
+    Returns:
+        callable: Loader for DatasetRefresher
+    """
+    from data.shared_store import attach_dataset, current_version
+
+    def load(loaded_version):
+        version = current_version(store_dir)
+        if version == loaded_version:
+            return None
+        return attach_dataset(store_dir, version)
+
+    return load
@@ -0,0 +1,231 @@
+import datetime
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from data.volumes import VolumeMatrix
+
+# Name of the file holding the current version; replaced atomically on publish
+CURRENT_FILE = 'CURRENT'
+MANIFEST_FILE = 'manifest.json'
+
+def default_store_dir():
+    """
+    Default location of the shared dataset store.
+
+    /dev/shm is memory-backed on Linux, so the mapped files never touch disk
+    and every worker maps the same physical pages.
+
+    Returns:
+        str: Store directory
+    """
+    base_dir = '/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir()
+    return os.path.join(base_dir, 'churn-radar')
+
+def _column_kind(series):
+    """'numeric', 'datetime', 'list' (e.g. risk_factors) or 'categorical' for everything else."""
+    if pd.api.types.is_numeric_dtype(series.dtype) and not pd.api.types.is_bool_dtype(series.dtype):
+        return 'numeric'
+    if pd.api.types.is_datetime64_dtype(series.dtype):
+        return 'datetime'
+    if len(series) and isinstance(series.iloc[0], (list, tuple)):
+        return 'list'
+    return 'categorical'
+
+def _write_table(df, table_dir, prefix):
+    """Write each column as .npy file(s) and return the column specs for the manifest."""
+    columns = []
+    for name in df.columns:
+        series = df[name]
+        kind = _column_kind(series)
+        spec = {'name': name, 'kind': kind}
+
+        if kind in ('numeric', 'datetime'):
+            spec['file'] = f"{prefix}.{name}.npy"
+            np.save(os.path.join(table_dir, spec['file']), np.ascontiguousarray(series.to_numpy()))
+
+        elif kind == 'categorical':
+            # Codes in the dtype pandas picks for the category count, so attaching needs no cast
+            categorical = pd.Categorical(series)
+            spec['file'] = f"{prefix}.{name}.codes.npy"
+            spec['categories'] = categorical.categories.tolist()
+            np.save(os.path.join(table_dir, spec['file']), categorical.codes)
+
+        else:
+            # Ragged list column: flattened category codes plus row offsets (CSR layout)
+            lengths = series.map(len).to_numpy()
+            offsets = np.zeros(len(series) + 1, dtype=np.int64)
+            np.cumsum(lengths, out=offsets[1:])
+            flat = pd.Categorical([item for items in series for item in items])
+            spec['file'] = f"{prefix}.{name}.codes.npy"
+            spec['offsets_file'] = f"{prefix}.{name}.offsets.npy"
+            spec['categories'] = flat.categories.tolist()
+            np.save(os.path.join(table_dir, spec['file']), flat.codes)
+            np.save(os.path.join(table_dir, spec['offsets_file']), offsets)
+
+        columns.append(spec)
+
+    return {'rows': len(df), 'columns': columns}
+
+def _write_volumes(volumes, table_dir):
+    """Write the volume matrix as one 2-D .npy file plus its row ids; return the manifest entry."""
+    np.save(os.path.join(table_dir, 'volumes.values.npy'), np.ascontiguousarray(volumes.values))
+    return {
+        'file': 'volumes.values.npy',
+        'months': volumes.months.tolist(),
+        'merchant_ids': _write_table(pd.DataFrame({'merchant_id': volumes.merchant_ids}), table_dir, 'volumes')
+    }
+
+def publish_dataset(merchants_df, volumes, store_dir=None, version=None, keep=2):
+    """
+    Publish the dataset as memory-mappable column files under a new version.
+
+    The version directory is fully written under a temporary name, renamed
+    into place and only then made current by atomically replacing the CURRENT
+    file, so workers never see a half-written version.
+
+    Args:
+        merchants_df (DataFrame): Merchant data
+        volumes (VolumeMatrix): Monthly volume history
+        store_dir (str): Store directory (default: default_store_dir())
+        version (str): Version name (default: timestamp based)
+        keep (int): Versions to keep on disk, including the new one
+
+    Returns:
+        dict: Manifest of the published version
+    """
+    store_dir = store_dir or default_store_dir()
+    version = version or f"v{datetime.datetime.now():%Y%m%d%H%M%S%f}"
+    os.makedirs(store_dir, exist_ok=True)
+
+    tmp_dir = tempfile.mkdtemp(prefix=f".{version}-", dir=store_dir)
+    try:
+        manifest = {
+            'version': version,
+            'created': datetime.datetime.now().isoformat(timespec='seconds'),
+            'tables': {
+                'merchants': _write_table(merchants_df, tmp_dir, 'merchants')
+            },
+            'volumes': _write_volumes(volumes, tmp_dir)
+        }
+        with open(os.path.join(tmp_dir, MANIFEST_FILE), 'w') as manifest_file:
+            json.dump(manifest, manifest_file)
+        os.rename(tmp_dir, os.path.join(store_dir, version))
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+    set_current_version(store_dir, version)
+    prune_versions(store_dir, keep=keep)
+    return manifest
+
+def set_current_version(store_dir, version):
+    """
+    Point readers at a fully written version by atomically replacing CURRENT.
+
+    Args:
+        store_dir (str): Store directory
+        version (str): Version name
+    """
+    current_tmp = os.path.join(store_dir, f".{CURRENT_FILE}.{os.getpid()}")
+    with open(current_tmp, 'w') as current_file:
+        current_file.write(version)
+    os.replace(current_tmp, os.path.join(store_dir, CURRENT_FILE))
+
+def current_version(store_dir=None):
+    """
+    Version the loader last published.
+
+    Args:
+        store_dir (str): Store directory (default: default_store_dir())
+
+    Returns:
+        str: Version name
+
+    Raises:
+        FileNotFoundError: If nothing has been published yet
+    """
+    store_dir = store_dir or default_store_dir()
+    with open(os.path.join(store_dir, CURRENT_FILE)) as current_file:
+        return current_file.read().strip()
+
+def prune_versions(store_dir=None, keep=2):
+    """
+    Delete all but the newest ``keep`` versions (never the current one).
+
+    Workers still mapping a deleted version keep reading it: on Linux the
+    pages stay alive until the last mapping is closed.
+
+    Args:
+        store_dir (str): Store directory (default: default_store_dir())
+        keep (int): Versions to keep
+    """
+    store_dir = store_dir or default_store_dir()
+    current = current_version(store_dir)
+    versions = sorted(
+        (entry for entry in os.scandir(store_dir)
+         if entry.is_dir() and not entry.name.startswith('.')),
+        key=lambda entry: entry.stat().st_mtime,
+        reverse=True
+    )
+    for entry in versions[max(keep, 1):]:
+        if entry.name != current:
+            shutil.rmtree(entry.path, ignore_errors=True)
+
+def _attach_table(version_dir, table_spec):
+    """Rebuild a DataFrame from read-only memory-mapped column files."""
+    columns = {}
+    for spec in table_spec['columns']:
+        values = np.load(os.path.join(version_dir, spec['file']), mmap_mode='r')
+
+        if spec['kind'] in ('numeric', 'datetime'):
+            columns[spec['name']] = values
+        elif spec['kind'] == 'categorical':
+            columns[spec['name']] = pd.Categorical.from_codes(values, categories=spec['categories'])
+        else:
+            # Python lists cannot live in shared memory; only these are rebuilt per worker
+            offsets = np.load(os.path.join(version_dir, spec['offsets_file']), mmap_mode='r')
+            items = np.asarray(spec['categories'], dtype=object)[values]
+            columns[spec['name']] = [
+                items[start:end].tolist() for start, end in zip(offsets[:-1], offsets[1:])
+            ]
+
+    # copy=False keeps one block per column, so numeric columns stay views of the mapped files
+    return pd.DataFrame(columns, copy=False)
+
+def _attach_volumes(version_dir, volumes_spec):
+    """Rebuild the VolumeMatrix around the read-only memory-mapped 2-D values file."""
+    values = np.load(os.path.join(version_dir, volumes_spec['file']), mmap_mode='r')
+    merchant_ids = _attach_table(version_dir, volumes_spec['merchant_ids'])['merchant_id']
+    return VolumeMatrix(merchant_ids, volumes_spec['months'], values)
+
+def attach_dataset(store_dir=None, version=None):
+    """
+    Attach to a published version as read-only, memory-mapped DataFrames.
+
+    Numeric columns and the codes of categorical columns are zero-copy views
+    of the mapped files, shared by every worker on the host, and so are
+    naive datetime columns (.npy stores datetime64 natively) and the whole
+    volume matrix. Categorical columns come back as pandas categoricals.
+
+    Args:
+        store_dir (str): Store directory (default: default_store_dir())
+        version (str): Version to attach (default: the current one)
+
+    Returns:
+        tuple: (merchants_df, volumes, version)
+    """
+    store_dir = store_dir or default_store_dir()
+    version = version or current_version(store_dir)
+    version_dir = os.path.join(store_dir, version)
+
+    with open(os.path.join(version_dir, MANIFEST_FILE)) as manifest_file:
+        manifest = json.load(manifest_file)
+
+    merchants_df = _attach_table(version_dir, manifest['tables']['merchants'])
+    volumes = _attach_volumes(version_dir, manifest['volumes'])
+    return merchants_df, volumes, version
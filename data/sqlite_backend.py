@@ -0,0 +1,502 @@
+import datetime
+import os
+import sqlite3
+import tempfile
+import threading
+
+import numpy as np
+import pandas as pd
+
+from data.backends import ALL_MERCHANTS, FILTER_COLUMNS, VOLUME_CHUNK_ROWS
+from data.shared_store import current_version, set_current_version
+from data.volumes import VolumeMatrix
+
+DATABASE_SUFFIX = '.sqlite'
+
+# Volume rows converted to an array at a time when reading the full history
+VOLUME_FETCH_ROWS = 100000
+
+# Month index (see encode_months) of a merchant's ISO onboarding date, in SQL
+ONBOARDING_MONTH = (
+    "(CAST(substr(m.onboarding_date, 1, 4) AS INTEGER) * 12 + CAST(substr(m.onboarding_date, 6, 2) AS INTEGER) - 1)"
+)
+
+# Filter fields and the merchant column each one applies to
+FILTER_FIELDS = [
+    ('industries', 'industry'),
+    ('segments', 'segment'),
+    ('managers', 'account_manager'),
+    ('risk_categories', 'risk_category'),
+]
+
+# Secondary indexes backing the pushed-down filters, the leaderboard order and id lookups
+MERCHANT_INDEXES = {
+    'merchants_merchant_id': 'merchant_id',
+    'merchants_industry': 'industry',
+    'merchants_segment': 'segment',
+    'merchants_account_manager': 'account_manager, risk_category',
+    'merchants_risk_category': 'risk_category',
+    'merchants_risk_score': 'risk_score DESC, row_id',
+}
+
+def default_database_dir():
+    """
+    Default location of the SQLite store.
+
+    Unlike the shared memory store, the database lives on disk (/var/tmp
+    survives reboots), so it can hold more data than fits in RAM.
+
+    Returns:
+        str: Store directory
+    """
+    base_dir = '/var/tmp' if os.path.isdir('/var/tmp') else tempfile.gettempdir()
+    return os.path.join(base_dir, 'churn-radar-db')
+
+def _sql_type(series):
+    if pd.api.types.is_bool_dtype(series.dtype) or pd.api.types.is_integer_dtype(series.dtype):
+        return 'INTEGER'
+    if pd.api.types.is_float_dtype(series.dtype):
+        return 'REAL'
+    return 'TEXT'
+
+def _sql_values(series):
+    """Column values as Python objects sqlite3 can bind (dates as ISO text)."""
+    if pd.api.types.is_datetime64_any_dtype(series.dtype):
+        return series.dt.strftime('%Y-%m-%d').tolist()
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series.astype(object).tolist()
+    return series.tolist()
+
+def build_database(merchants_df, volumes, path):
+    """
+    Write the merchant table and volume history to a new SQLite database.
+
+    Merchants keep their table order as ``row_id``. Risk factors go to their
+    own (row_id, position, factor) table and volumes to a (row_id, month, volume) table,
+    both clustered by merchant so one merchant's rows are a single range.
+    Months are stored as integer month indexes (see encode_months).
+
+    Args:
+        merchants_df (DataFrame): Merchant data (with a risk_factors list column)
+        volumes (VolumeMatrix): Monthly volume history
+        path (str): Database file to create (must not exist)
+    """
+    scalar_columns = [name for name in merchants_df.columns if name != 'risk_factors']
+    factor_lists = merchants_df['risk_factors'].tolist()
+
+    connection = sqlite3.connect(path)
+    try:
+        column_defs = ", ".join(f'"{name}" {_sql_type(merchants_df[name])}' for name in scalar_columns)
+        connection.executescript(f"""
+            PRAGMA journal_mode = OFF;
+            PRAGMA synchronous = OFF;
+            CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+            CREATE TABLE merchants (row_id INTEGER PRIMARY KEY, {column_defs}, factor_count INTEGER);
+            CREATE TABLE merchant_risk_factors (
+                row_id INTEGER, position INTEGER, factor TEXT, PRIMARY KEY (row_id, position)
+            ) WITHOUT ROWID;
+            CREATE TABLE volumes (
+                row_id INTEGER, month INTEGER, volume REAL, PRIMARY KEY (row_id, month)
+            ) WITHOUT ROWID;
+        """)
+
+        placeholders = ", ".join("?" * (len(scalar_columns) + 2))
+        connection.executemany(
+            f"INSERT INTO merchants VALUES ({placeholders})",
+            zip(range(len(merchants_df)),
+                *[_sql_values(merchants_df[name]) for name in scalar_columns],
+                [len(factors) for factors in factor_lists])
+        )
+        connection.executemany(
+            "INSERT INTO merchant_risk_factors VALUES (?, ?, ?)",
+            ((row_id, position, factor)
+             for row_id, factors in enumerate(factor_lists) for position, factor in enumerate(factors))
+        )
+
+        # Volume rows follow the merchant table order; ids missing from it are skipped
+        volume_rows = volumes.row_positions(merchants_df['merchant_id'])
+        known = np.flatnonzero(volume_rows >= 0)
+        values = volumes.values[volume_rows[known]]
+        row_ids, cols = np.nonzero(~np.isnan(values))
+        connection.executemany(
+            "INSERT INTO volumes VALUES (?, ?, ?)",
+            zip(known[row_ids].tolist(), volumes.months[cols].tolist(), values[row_ids, cols].tolist())
+        )
+
+        for name, columns in MERCHANT_INDEXES.items():
+            connection.execute(f"CREATE INDEX {name} ON merchants ({columns})")
+        connection.executemany("INSERT INTO meta VALUES (?, ?)", [
+            ('first_month', str(int(volumes.months[0]) if len(volumes.months) else 0)),
+            ('num_months', str(len(volumes.months))),
+        ])
+        connection.execute("ANALYZE")
+        connection.commit()
+    finally:
+        connection.close()
+
+def publish_database(merchants_df, volumes, store_dir=None, version=None, keep=2):
+    """
+    Publish the dataset as a new versioned SQLite database.
+
+    The database is written under a temporary name, renamed to
+    ``<version>.sqlite`` and only then made current, so the dashboard never
+    opens a half-written file. Published files are never modified, which lets
+    sessions still on an older version keep querying it.
+
+    Args:
+        merchants_df (DataFrame): Merchant data
+        volumes (VolumeMatrix): Monthly volume history
+        store_dir (str): Store directory (default: default_database_dir())
+        version (str): Version name (default: timestamp based)
+        keep (int): Database files to keep, including the new one
+
+    Returns:
+        str: Path of the published database
+    """
+    store_dir = store_dir or default_database_dir()
+    version = version or f"v{datetime.datetime.now():%Y%m%d%H%M%S%f}"
+    os.makedirs(store_dir, exist_ok=True)
+
+    path = os.path.join(store_dir, version + DATABASE_SUFFIX)
+    tmp_path = os.path.join(store_dir, f".{version}.{os.getpid()}.tmp")
+    try:
+        build_database(merchants_df, volumes, tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    set_current_version(store_dir, version)
+    prune_databases(store_dir, keep=keep)
+    return path
+
+def prune_databases(store_dir, keep=2):
+    """
+    Delete all but the newest ``keep`` database files (never the current one).
+
+    Args:
+        store_dir (str): Store directory
+        keep (int): Database files to keep
+    """
+    current = current_version(store_dir)
+    databases = sorted(
+        (entry for entry in os.scandir(store_dir)
+         if entry.is_file() and entry.name.endswith(DATABASE_SUFFIX)),
+        key=lambda entry: entry.stat().st_mtime,
+        reverse=True
+    )
+    for entry in databases[max(keep, 1):]:
+        if entry.name != current + DATABASE_SUFFIX:
+            os.remove(entry.path)
+
+def _where(filters, alias='m'):
+    """WHERE clause and parameters for a MerchantFilters; empty selections match nothing."""
+    clauses, params = [], []
+    for field, column in FILTER_FIELDS:
+        values = getattr(filters, field)
+        if values is None:
+            continue
+        if len(values) == 0:
+            clauses.append("0")
+            continue
+        clauses.append(f"{alias}.{column} IN ({', '.join('?' * len(values))})")
+        params.extend(values)
+    return ("WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+class SQLiteBackend:
+    """
+    Dashboard queries pushed down to a published SQLite database.
+
+    Implements the same queries as FrameBackend, but nothing beyond the
+    requested result is loaded: filters, KPI sums and risk-factor counts run
+    as parameterized SQL over indexed columns, the leaderboard is fetched one
+    page at a time and volumes one merchant at a time. Each thread gets its
+    own read-only connection.
+
+    Args:
+        path (str): Database file written by publish_database
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        meta = dict(self._query("SELECT key, value FROM meta"))
+        self.months = int(meta['first_month']) + np.arange(int(meta['num_months']), dtype=np.int64)
+        self.merchant_columns = [
+            row[1] for row in self._query("PRAGMA table_info(merchants)")
+            if row[1] not in ('row_id', 'factor_count')
+        ]
+
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True)
+            connection.execute("PRAGMA query_only = ON")
+            self._local.connection = connection
+        return connection
+
+    def _query(self, sql, params=()):
+        return self._connection().execute(sql, params).fetchall()
+
+    def _frame(self, sql, params=()):
+        cursor = self._connection().execute(sql, params)
+        columns = [description[0] for description in cursor.description]
+        return pd.DataFrame(cursor.fetchall(), columns=columns)
+
+    def _with_risk_factors(self, merchants_df):
+        """Attach the risk_factors lists to merchant rows fetched with their row_id."""
+        row_ids = merchants_df['row_id'].tolist()
+        factor_lists = {row_id: [] for row_id in row_ids}
+        # Chunked so the IN list stays under SQLite's parameter limit
+        for start in range(0, len(row_ids), 10000):
+            chunk = row_ids[start:start + 10000]
+            for row_id, factor in self._query(
+                f"SELECT row_id, factor FROM merchant_risk_factors "
+                f"WHERE row_id IN ({', '.join('?' * len(chunk))}) ORDER BY row_id, position", chunk
+            ):
+                factor_lists[row_id].append(factor)
+        merchants_df['risk_factors'] = [factor_lists[row_id] for row_id in row_ids]
+        return merchants_df
+
+    def _finish_frame(self, merchants_df, columns):
+        if 'risk_factors' in columns:
+            merchants_df = self._with_risk_factors(merchants_df)
+        if 'onboarding_date' in merchants_df.columns:
+            merchants_df['onboarding_date'] = pd.to_datetime(merchants_df['onboarding_date'])
+        return merchants_df[list(columns)]
+
+    def distinct(self, column):
+        """Sorted distinct values of a filter column."""
+        if column not in FILTER_COLUMNS:
+            raise ValueError(f"Not a filter column: {column}")
+        return [row[0] for row in self._query(f"SELECT DISTINCT {column} FROM merchants ORDER BY {column}")]
+
+    def risk_factor_options(self):
+        """Sorted distinct risk factors."""
+        return [row[0] for row in self._query(
+            "SELECT DISTINCT factor FROM merchant_risk_factors ORDER BY factor"
+        )]
+
+    def count(self, filters=ALL_MERCHANTS):
+        """Number of merchants matching the filters."""
+        where, params = _where(filters)
+        return self._query(f"SELECT COUNT(*) FROM merchants m {where}", params)[0][0]
+
+    def kpis(self, filters):
+        """CURRENT STATUS metric cards, summed in SQL."""
+        where, params = _where(filters)
+        high, medium, at_risk_volume, avg_risk_score = self._query(f"""
+            SELECT COALESCE(SUM(m.risk_category = 'High'), 0),
+                   COALESCE(SUM(m.risk_category = 'Medium'), 0),
+                   COALESCE(SUM(CASE WHEN m.risk_category IN ('High', 'Medium')
+                                     THEN m.monthly_volume_avg ELSE 0 END), 0),
+                   AVG(m.risk_score)
+            FROM merchants m {where}
+        """, params)[0]
+        return {
+            'high_risk_count': high,
+            'medium_risk_count': medium,
+            'at_risk_volume': at_risk_volume,
+            'avg_risk_score': float('nan') if avg_risk_score is None else avg_risk_score
+        }
+
+    def risk_factor_counts(self, filters):
+        """Merchants per risk factor among the filtered merchants, most common first."""
+        where, params = _where(filters)
+        return self._frame(f"""
+            SELECT f.factor AS "Risk Factor", COUNT(*) AS "Count"
+            FROM merchant_risk_factors f JOIN merchants m ON m.row_id = f.row_id
+            {where}
+            GROUP BY f.factor
+            ORDER BY "Count" DESC, f.factor
+        """, params)
+
+    def leaderboard_page(self, filters, page, page_size):
+        """One page of the filtered merchants, highest risk score first."""
+        where, params = _where(filters)
+        page_df = self._frame(f"""
+            SELECT m.* FROM merchants m {where}
+            ORDER BY m.risk_score DESC, m.row_id
+            LIMIT ? OFFSET ?
+        """, params + [page_size, page * page_size])
+        return self._finish_frame(page_df, self.merchant_columns + ['risk_factors']).reset_index(drop=True)
+
+    def iter_leaderboard(self, filters, chunk_size, columns=None):
+        """The whole filtered leaderboard in chunks, streamed from one ordered cursor."""
+        columns = list(columns) if columns is not None else self.merchant_columns + ['risk_factors']
+        selected = ", ".join(f"m.{name}" for name in columns if name != 'risk_factors')
+        where, params = _where(filters)
+        cursor = self._connection().execute(f"""
+            SELECT m.row_id{', ' + selected if selected else ''} FROM merchants m {where}
+            ORDER BY m.risk_score DESC, m.row_id
+        """, params)
+        names = [description[0] for description in cursor.description]
+        try:
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield self._finish_frame(pd.DataFrame(rows, columns=names), columns)
+        finally:
+            cursor.close()
+
+    def frame(self, filters=ALL_MERCHANTS, columns=None):
+        """Filtered merchant rows with only the given columns, in table order."""
+        columns = list(columns) if columns is not None else self.merchant_columns + ['risk_factors']
+        selected = ", ".join(f"m.{name}" for name in columns if name != 'risk_factors')
+        where, params = _where(filters)
+        merchants_df = self._frame(
+            f"SELECT m.row_id{', ' + selected if selected else ''} FROM merchants m {where} ORDER BY m.row_id",
+            params
+        )
+        return self._finish_frame(merchants_df, columns)
+
+    def matching_ids(self, filters, merchant_ids):
+        """The given merchant ids that match the filters."""
+        merchant_ids = list(merchant_ids)
+        if not merchant_ids:
+            return set()
+        where, params = _where(filters)
+        id_clause = f"m.merchant_id IN ({', '.join('?' * len(merchant_ids))})"
+        where = f"{where} AND {id_clause}" if where else f"WHERE {id_clause}"
+        return {row[0] for row in self._query(f"SELECT m.merchant_id FROM merchants m {where}",
+                                              params + merchant_ids)}
+
+    def merchant_names(self, merchant_ids):
+        """merchant_id -> merchant_name for the given ids that exist."""
+        merchant_ids = list(merchant_ids)
+        if not merchant_ids:
+            return {}
+        return dict(self._query(
+            f"SELECT merchant_id, merchant_name FROM merchants "
+            f"WHERE merchant_id IN ({', '.join('?' * len(merchant_ids))})", merchant_ids
+        ))
+
+    def merchant(self, merchant_id):
+        """One merchant's row (all columns), or None if there is no such merchant."""
+        merchant_df = self._frame("SELECT m.* FROM merchants m WHERE m.merchant_id = ?", [merchant_id])
+        if merchant_df.empty:
+            return None
+        return self._finish_frame(merchant_df, self.merchant_columns + ['risk_factors']).iloc[0]
+
+    def merchant_volumes(self, merchant_ids):
+        """Volume history of the given merchants, one indexed range read each."""
+        merchant_ids = list(merchant_ids)
+        values = np.full((len(merchant_ids), len(self.months)), np.nan)
+        if merchant_ids and len(self.months):
+            rows = {merchant_id: i for i, merchant_id in enumerate(merchant_ids)}
+            for merchant_id, month, volume in self._query(
+                f"SELECT m.merchant_id, v.month, v.volume FROM merchants m "
+                f"JOIN volumes v ON v.row_id = m.row_id "
+                f"WHERE m.merchant_id IN ({', '.join('?' * len(merchant_ids))})", merchant_ids
+            ):
+                values[rows[merchant_id], month - self.months[0]] = volume
+        return VolumeMatrix(merchant_ids, self.months, values)
+
+    def volume_matrix(self, since_month=None):
+        """Volume history of every merchant, optionally only from since_month on, streamed in chunks."""
+        months = self.months if since_month is None else self.months[self.months >= since_month]
+        merchant_ids = [row[0] for row in self._query("SELECT merchant_id FROM merchants ORDER BY row_id")]
+        values = np.full((len(merchant_ids), len(months)), np.nan, dtype=np.float32)
+        if len(months):
+            cursor = self._connection().execute(
+                "SELECT row_id, month, volume FROM volumes WHERE month >= ?", [int(months[0])]
+            )
+            try:
+                # Only one chunk of Python tuples is alive at a time
+                while True:
+                    rows = cursor.fetchmany(VOLUME_FETCH_ROWS)
+                    if not rows:
+                        break
+                    cells = np.array(rows, dtype=np.float64)
+                    values[cells[:, 0].astype(np.int64), cells[:, 1].astype(np.int64) - months[0]] = cells[:, 2]
+            finally:
+                cursor.close()
+        return VolumeMatrix(merchant_ids, months, values)
+
+    def iter_volume_chunks(self, since_month=None, chunk_rows=VOLUME_CHUNK_ROWS):
+        """Volume history in chunks of merchants, each read as one row_id range; only one chunk is in memory."""
+        months = self.months if since_month is None else self.months[self.months >= since_month]
+        cursor = self._connection().execute("SELECT merchant_id FROM merchants ORDER BY row_id")
+        try:
+            first_row = 0
+            while True:
+                merchant_ids = [row[0] for row in cursor.fetchmany(chunk_rows)]
+                if not merchant_ids:
+                    break
+                values = np.full((len(merchant_ids), len(months)), np.nan, dtype=np.float32)
+                if len(months):
+                    cells = np.array(self._query(
+                        "SELECT row_id, month, volume FROM volumes WHERE row_id >= ? AND row_id < ? AND month >= ?",
+                        [first_row, first_row + len(merchant_ids), int(months[0])]
+                    ), dtype=np.float64).reshape(-1, 3)
+                    values[cells[:, 0].astype(np.int64) - first_row, cells[:, 1].astype(np.int64) - months[0]] = cells[:, 2]
+                yield VolumeMatrix(merchant_ids, months, values)
+                first_row += len(merchant_ids)
+        finally:
+            cursor.close()
+
+    def manager_workload(self):
+        """Per-manager workload pre-aggregates, grouped in SQL."""
+        workload = self._frame("""
+            SELECT account_manager,
+                   COUNT(*) AS merchant_count,
+                   SUM(CASE WHEN risk_category IN ('High', 'Medium') THEN monthly_volume_avg ELSE 0 END) AS at_risk_volume,
+                   SUM(risk_category = 'High') AS high_risk,
+                   SUM(risk_category = 'Medium') AS medium_risk,
+                   SUM(risk_category = 'Low') AS low_risk,
+                   SUM(CASE WHEN risk_category IN ('High', 'Medium') THEN factor_count ELSE 0 END) AS open_actions
+            FROM merchants
+            GROUP BY account_manager
+            ORDER BY account_manager
+        """)
+        return workload.set_index('account_manager').astype(np.int64)
+
+    def cohort_matrix(self, metric):
+        """Onboarding-cohort retention matrix, aggregated per (cohort, offset) in SQL."""
+        from utils.retention import cohort_matrix_from_cells
+        cohort_sizes = np.array(self._query(f"""
+            SELECT {ONBOARDING_MONTH} AS cohort, COUNT(*) FROM merchants m
+            WHERE m.onboarding_date IS NOT NULL
+            GROUP BY cohort ORDER BY cohort
+        """), dtype=np.int64).reshape(-1, 2)
+        first_month, last_month = self._query("SELECT MIN(month), MAX(month) FROM volumes")[0]
+        if len(cohort_sizes) == 0 or first_month is None:
+            return pd.DataFrame()
+
+        # Volume before the onboarding month carries no retention signal
+        cells = np.array(self._query(f"""
+            SELECT c.cohort, v.month - c.cohort AS offset, SUM(v.volume > 0), SUM(v.volume)
+            FROM (SELECT m.row_id, {ONBOARDING_MONTH} AS cohort FROM merchants m
+                  WHERE m.onboarding_date IS NOT NULL) c
+            JOIN volumes v ON v.row_id = c.row_id
+            WHERE v.month >= c.cohort
+            GROUP BY c.cohort, offset
+        """), dtype=np.float64).reshape(-1, 4)
+        return cohort_matrix_from_cells(
+            cohort_sizes[:, 0], cohort_sizes[:, 1], cells[:, 0], cells[:, 1], cells[:, 2], cells[:, 3],
+            (first_month, last_month), metric=metric
+        )
+
+def sqlite_loader(store_dir):
+    """
+    Loader for DatasetRefresher that switches to each newly published database.
+
+    No merchant data is loaded into memory: the snapshot's frames are None and
+    every query goes through the SQLiteBackend passed along as load metadata.
+
+    Args:
+        store_dir (str): Store directory written by `python cli.py publish --format sqlite`
+
+    Returns:
+        callable: Loader for DatasetRefresher
+    """
+    def load(loaded_version):
+        version = current_version(store_dir)
+        if version == loaded_version:
+            return None
+        backend = SQLiteBackend(os.path.join(store_dir, version + DATABASE_SUFFIX))
+        return None, None, version, {'backend': backend}
+
+    return load
@@ -0,0 +1,266 @@
+import numpy as np
+import pandas as pd
+
+def encode_months(values):
+    """
+    Encode month-like values as integer month indexes (year * 12 + month - 1).
+
+    Accepts 'YYYY-MM' / 'YYYY-MM-DD' strings or datetimes. String inputs are
+    factorized first so only the distinct values get parsed, which keeps this
+    cheap even for tens of millions of rows sharing a handful of months.
+
+    Args:
+        values (array-like): Month strings or datetimes
+
+    Returns:
+        ndarray: int64 month index per value (-1 for missing values)
+    """
+    series = pd.Series(values, copy=False)
+
+    if pd.api.types.is_datetime64_any_dtype(series.dtype):
+        month_index = (series.dt.year * 12 + series.dt.month - 1).to_numpy(dtype=np.float64)
+        return np.where(np.isnan(month_index), -1, month_index).astype(np.int64)
+
+    codes, uniques = pd.factorize(series)
+    parsed = pd.to_datetime(pd.Series(uniques).astype(str).str[:7], format='%Y-%m')
+    unique_index = (parsed.dt.year * 12 + parsed.dt.month - 1).to_numpy(dtype=np.int64)
+
+    # Append a -1 sentinel so missing values (code -1) map to it
+    return np.append(unique_index, -1)[codes]
+
+def month_label(month_index):
+    """
+    Format an integer month index back into a 'YYYY-MM' label.
+
+    Args:
+        month_index (int): Month index as produced by encode_months
+
+    Returns:
+        str: Month label
+    """
+    year, month = divmod(int(month_index), 12)
+    return f"{year:04d}-{month + 1:02d}"
+
+def merchant_row_index(merchant_ids, row_merchant_ids):
+    """
+    Map each row's merchant_id to its position in the merchant table.
+
+    Categorical inputs are resolved once per category and then broadcast
+    with the integer codes, avoiding a hash lookup per row.
+
+    Args:
+        merchant_ids (array-like): merchant_id column of the merchant table
+        row_merchant_ids (array-like): merchant_id per row (e.g. of volumes_df)
+
+    Returns:
+        ndarray: Row position in the merchant table, -1 where unknown
+    """
+    merchant_index = pd.Index(merchant_ids)
+    row_merchant_ids = pd.Series(row_merchant_ids, copy=False)
+
+    if isinstance(row_merchant_ids.dtype, pd.CategoricalDtype):
+        category_rows = merchant_index.get_indexer(row_merchant_ids.cat.categories)
+        codes = row_merchant_ids.cat.codes.to_numpy()
+        return np.append(category_rows, -1)[codes]
+
+    return merchant_index.get_indexer(row_merchant_ids)
+
+def volume_matrix(merchant_ids, volumes_df):
+    """
+    Pivot long-format monthly volumes into a merchants x months matrix.
+
+    The month axis is the contiguous range of integer month indexes covered by
+    volumes_df; cells without any volume rows are NaN and duplicate
+    (merchant, month) rows are summed.
+
+    Args:
+        merchant_ids (array-like): merchant_id per matrix row
+        volumes_df (DataFrame): Monthly volumes with merchant_id, month and volume
+
+    Returns:
+        tuple: (matrix, months) - float64 matrix of shape (merchants, months) and
+               the int64 month index of each column
+    """
+    rows = merchant_row_index(merchant_ids, volumes_df['merchant_id'])
+    months = encode_months(volumes_df['month'])
+    volumes = volumes_df['volume'].to_numpy(dtype=np.float64)
+    num_merchants = len(merchant_ids)
+
+    valid = (rows >= 0) & (months >= 0)
+    if not valid.any():
+        return np.empty((num_merchants, 0)), np.empty(0, dtype=np.int64)
+
+    rows, months, volumes = rows[valid], months[valid], volumes[valid]
+    first_month = int(months.min())
+    num_months = int(months.max()) - first_month + 1
+
+    flat = rows * num_months + (months - first_month)
+    cells = num_merchants * num_months
+    totals = np.bincount(flat, weights=volumes, minlength=cells).reshape(num_merchants, num_months)
+    counts = np.bincount(flat, minlength=cells).reshape(num_merchants, num_months)
+
+    matrix = np.where(counts > 0, totals, np.nan)
+    return matrix, first_month + np.arange(num_months, dtype=np.int64)
+
+class VolumeMatrix:
+    """
+    Monthly volumes as a dense merchants x months matrix.
+
+    This is the canonical in-memory form of the volume history: one
+    C-contiguous 2-D array (NaN where a merchant has no volume for a month),
+    a row index of merchant ids and a contiguous axis of integer month
+    indexes. Per-merchant and per-month computations are plain slices and
+    reductions over ``values``; the long (merchant_id, month, volume) table is
+    only built on demand by ``to_long``.
+
+    Args:
+        merchant_ids (array-like): merchant_id per row
+        months (array-like): Integer month index per column (consecutive months)
+        values (ndarray): Volume matrix of shape (merchants, months)
+    """
+
+    def __init__(self, merchant_ids, months, values):
+        self.merchant_ids = pd.Index(merchant_ids, name='merchant_id')
+        self.months = np.asarray(months, dtype=np.int64)
+        self.values = np.ascontiguousarray(values)
+        if self.values.shape != (len(self.merchant_ids), len(self.months)):
+            raise ValueError(
+                f"Volume matrix shape {self.values.shape} does not match "
+                f"{len(self.merchant_ids)} merchants x {len(self.months)} months"
+            )
+
+    @classmethod
+    def from_long(cls, merchant_ids, volumes_df):
+        """
+        Build the matrix from a long-format table.
+
+        Args:
+            merchant_ids (array-like): merchant_id per matrix row
+            volumes_df (DataFrame): Monthly volumes with merchant_id, month and volume
+
+        Returns:
+            VolumeMatrix: Matrix with one row per merchant id
+        """
+        values, months = volume_matrix(merchant_ids, volumes_df)
+        return cls(merchant_ids, months, values)
+
+    @property
+    def shape(self):
+        return self.values.shape
+
+    def month_labels(self):
+        """
+        'YYYY-MM' label of every column.
+
+        Returns:
+            list: Month labels
+        """
+        return [month_label(month) for month in self.months]
+
+    def row_positions(self, merchant_ids):
+        """
+        Row of each merchant id.
+
+        Args:
+            merchant_ids (array-like): Merchant ids to look up
+
+        Returns:
+            ndarray: Row position per id, -1 where unknown
+        """
+        return merchant_row_index(self.merchant_ids, merchant_ids)
+
+    def take(self, merchant_ids):
+        """
+        Sub-matrix for the given merchants, in the given order.
+
+        Args:
+            merchant_ids (array-like): Merchant ids to keep
+
+        Returns:
+            VolumeMatrix: Matrix with one row per id (all NaN for unknown ids)
+        """
+        rows = self.row_positions(merchant_ids)
+        values = self.values[np.where(rows >= 0, rows, 0)]
+        if (rows < 0).any():
+            values = values.astype(np.result_type(values.dtype, np.float32))
+            values[rows < 0] = np.nan
+        return VolumeMatrix(merchant_ids, self.months, values)
+
+    def astype(self, dtype):
+        """
+        Copy with the volumes stored as another dtype (e.g. float32).
+
+        Args:
+            dtype: NumPy dtype
+
+        Returns:
+            VolumeMatrix: Converted matrix
+        """
+        return VolumeMatrix(self.merchant_ids, self.months, self.values.astype(dtype))
+
+    def window_sum(self, months=3):
+        """
+        Total volume per merchant over the last ``months`` columns.
+
+        Args:
+            months (int): Window length in months
+
+        Returns:
+            ndarray: float64 total per merchant (months without data count as 0)
+        """
+        return np.nansum(self.values[:, -months:], axis=1, dtype=np.float64)
+
+    def trend(self, span=6):
+        """
+        Relative change per merchant from ``span`` months back to the latest month.
+
+        ``trend(3)`` compares the latest month with the one two months before
+        it; ``trend(len(months))`` covers the whole history.
+
+        Args:
+            span (int): Number of months covered, including the latest
+
+        Returns:
+            ndarray: float64 change per merchant (NaN without data or a zero start)
+        """
+        if self.values.shape[1] < span or span < 2:
+            return np.full(self.values.shape[0], np.nan)
+        latest = self.values[:, -1].astype(np.float64)
+        start = self.values[:, -span].astype(np.float64)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(start > 0, latest / start - 1, np.nan)
+
+    def memory_usage(self):
+        """
+        Bytes held by each component.
+
+        Returns:
+            Series: Bytes for values, months and merchant_ids
+        """
+        return pd.Series({
+            'values': self.values.nbytes,
+            'months': self.months.nbytes,
+            'merchant_ids': self.merchant_ids.memory_usage(deep=True)
+        })
+
+    @property
+    def dtypes(self):
+        return pd.Series({
+            'values': self.values.dtype,
+            'months': self.months.dtype,
+            'merchant_ids': self.merchant_ids.dtype
+        })
+
+    def to_long(self):
+        """
+        Long-format (merchant_id, month, volume) table, one row per non-empty cell.
+
+        Returns:
+            DataFrame: Columns merchant_id, month ('YYYY-MM') and volume
+        """
+        rows, cols = np.nonzero(~np.isnan(self.values))
+        return pd.DataFrame({
+            'merchant_id': self.merchant_ids[rows],
+            'month': np.asarray(self.month_labels(), dtype=object)[cols],
+            'volume': self.values[rows, cols]
+        })
@@ -0,0 +1,42 @@
+import os
+import sys
+
+# Tests import the app's modules (data/, utils/) from the repository root
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from data.compaction import compact_dataset
+from data.volumes import VolumeMatrix
+
+@pytest.fixture(scope='session')
+def merchant_dataset():
+    """Small compacted (merchants_df, volumes) with every column the backends query, tied risk scores and gaps."""
+    rng = np.random.default_rng(11)
+    num_merchants, num_months = 400, 18
+    factors = ['Volume Drop >30%', 'Payment Failures', 'Low Feature Adoption', 'Competitor Integration']
+    merchants_df = pd.DataFrame({
+        'merchant_id': [f"M{i:05d}" for i in range(num_merchants)],
+        'merchant_name': [f"Merchant {i}" for i in range(num_merchants)],
+        'industry': rng.choice(['Retail', 'SaaS', 'Education'], num_merchants),
+        'segment': rng.choice(['Small Business', 'Mid-Market', 'Enterprise'], num_merchants),
+        'account_manager': rng.choice(['Alex Thompson', 'Rachel Chen', 'David Kim'], num_merchants),
+        'risk_category': rng.choice(['High', 'Medium', 'Low'], num_merchants),
+        # Rounded so the leaderboard has ties to order by table position
+        'risk_score': rng.random(num_merchants).round(2),
+        'monthly_volume_avg': rng.integers(1_000, 200_000, num_merchants),
+        'tenure': rng.integers(1, 37, num_merchants),
+        'success_rate': rng.uniform(0.8, 1.0, num_merchants),
+        'fraud_rate': rng.uniform(0.0, 0.02, num_merchants),
+        'onboarding_date': pd.to_datetime('2022-06-01') + pd.to_timedelta(rng.integers(0, 900, num_merchants), unit='D'),
+        'risk_factors': [list(rng.choice(factors, rng.integers(0, 3), replace=False)) for _ in range(num_merchants)],
+    })
+    values = rng.gamma(2.0, 20_000.0, (num_merchants, num_months))
+    values[rng.random(values.shape) < 0.1] = np.nan
+    values[rng.random(values.shape) < 0.05] = 0.0
+    volumes = VolumeMatrix(merchants_df['merchant_id'], 2023 * 12 + np.arange(num_months), values)
+    return compact_dataset(merchants_df, volumes)
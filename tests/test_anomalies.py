@@ -0,0 +1,76 @@
+import numpy as np
+
+from data.volumes import VolumeMatrix
+from utils.anomalies import VolumeAnomalyDetector
+
+def _history(num_merchants=50, num_months=12, seed=3):
+    rng = np.random.default_rng(seed)
+    values = rng.normal(10_000, 300, (num_merchants, num_months))
+    # Sudden drops spread over the history, and a gap
+    for row in range(0, num_merchants, 5):
+        values[row, 4 + row % (num_months - 4)] *= 0.4
+    values[7, 6] = np.nan
+    merchant_ids = [f"M{i:03d}" for i in range(num_merchants)]
+    return VolumeMatrix(merchant_ids, 24_000 + np.arange(num_months), values)
+
+def _scan(detector, volumes, since_month=None):
+    start = 0 if since_month is None else int(np.searchsorted(volumes.months, since_month))
+    return detector.scan(volumes.merchant_ids.to_numpy(), volumes.values[:, start:], volumes.months[start:])
+
+def test_incremental_scans_match_a_full_scan():
+    volumes = _history()
+    full = VolumeAnomalyDetector()
+    _scan(full, volumes)
+
+    incremental = VolumeAnomalyDetector()
+    for end in (6, 9, 12):
+        # Each refresh only reads the months the detector still needs
+        arrived = VolumeMatrix(volumes.merchant_ids, volumes.months[:end], volumes.values[:, :end])
+        _scan(incremental, arrived, incremental.first_month_needed())
+
+    expected, found = full.latest(), incremental.latest()
+    assert [(a.merchant_id, a.month) for a in found] == [(a.merchant_id, a.month) for a in expected]
+    assert np.allclose([a.pct_change for a in found], [a.pct_change for a in expected])
+    assert np.allclose([a.baseline for a in found], [a.baseline for a in expected])
+    assert incremental.last_scanned_month == full.last_scanned_month
+
+def test_rescanning_known_months_raises_nothing_new():
+    volumes = _history()
+    detector = VolumeAnomalyDetector()
+    assert _scan(detector, volumes)
+    # The last month is scored again, so its baseline window is still needed
+    assert detector.first_month_needed() == volumes.months[-1] - detector.window
+    assert _scan(detector, volumes) == []
+    assert _scan(detector, volumes, detector.first_month_needed()) == []
+
+def test_a_month_still_filling_in_is_rescored():
+    volumes = _history()
+    detector = VolumeAnomalyDetector()
+    # The last month has only arrived in part for the first merchant
+    partial = volumes.values.copy()
+    partial[0, -1] = 1_000.0
+    _scan(detector, VolumeMatrix(volumes.merchant_ids, volumes.months, partial))
+    last_month = [alert for alert in detector.latest() if alert.merchant_id == 'M000']
+    assert last_month and last_month[0].volume == 1_000.0
+
+    # Once it catches up the alert is withdrawn; a drop arriving late is raised
+    caught_up = volumes.values.copy()
+    caught_up[1, -1] = 500.0
+    new_alerts = _scan(detector, VolumeMatrix(volumes.merchant_ids, volumes.months, caught_up),
+                       detector.first_month_needed())
+    assert [(alert.merchant_id, alert.volume) for alert in new_alerts] == [('M001', 500.0)]
+    assert not [alert for alert in detector.latest() if alert.merchant_id == 'M000' and alert.volume == 1_000.0]
+
+def test_chunked_scans_match_a_single_scan():
+    volumes = _history(num_merchants=53)
+    single = VolumeAnomalyDetector(max_alerts=8)
+    _scan(single, volumes)
+
+    chunked = VolumeAnomalyDetector(max_alerts=8)
+    merchant_ids = volumes.merchant_ids.to_numpy()
+    chunked.scan_chunks(
+        (merchant_ids[start:start + 10], volumes.values[start:start + 10], volumes.months)
+        for start in range(0, len(merchant_ids), 10)
+    )
+    assert chunked.latest() == single.latest()
+    assert chunked.last_scanned_month == single.last_scanned_month
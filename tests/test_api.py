@@ -0,0 +1,61 @@
+import json
+
+from data.refresh import DatasetRefresher
+from utils.api import MetricsAPI, api_derived_data
+
+def _api(merchant_dataset, cache_entries=16):
+    """A MetricsAPI over a refresher that publishes a new version of the dataset on every refresh."""
+    merchants_df, volumes = merchant_dataset
+    versions = iter(f"v{i}" for i in range(1, 100))
+    refresher = DatasetRefresher(lambda current_version: (merchants_df, volumes, next(versions)),
+                                 build_derived=api_derived_data)
+    refresher.refresh_now()
+    return MetricsAPI(refresher, cache_entries=cache_entries), refresher
+
+def test_a_repeated_request_with_its_etag_is_not_modified(merchant_dataset):
+    api, _ = _api(merchant_dataset)
+    status, headers, body = api.handle('/kpis', 'segment=Enterprise&risk_category=High')
+    assert status == 200
+    assert json.loads(body)['version'] == 'v1'
+
+    status, again, body = api.handle('/kpis', 'segment=Enterprise&risk_category=High',
+                                     if_none_match=headers['ETag'])
+    assert status == 304
+    assert body == b''
+    assert again['ETag'] == headers['ETag']
+    # Answered from the ETag alone: neither a cache hit nor a miss
+    assert api.stats() == {'hits': 0, 'misses': 1, 'not_modified': 1, 'entries': 1, 'max_entries': 16}
+
+    # Another query has another ETag, so the first one does not match it
+    status, _, _ = api.handle('/kpis', 'segment=Enterprise', if_none_match=headers['ETag'])
+    assert status == 200
+
+def test_a_refresh_changes_the_etag(merchant_dataset):
+    api, refresher = _api(merchant_dataset)
+    _, headers, _ = api.handle('/leaderboard', 'page=2&page_size=10')
+
+    assert refresher.refresh_now()
+    status, refreshed, body = api.handle('/leaderboard', 'page=2&page_size=10', if_none_match=headers['ETag'])
+    assert status == 200
+    assert refreshed['ETag'] != headers['ETag']
+    assert refreshed['X-Dataset-Version'] == 'v2'
+    assert json.loads(body)['version'] == 'v2'
+
+    status, _, _ = api.handle('/leaderboard', 'page=2&page_size=10', if_none_match=refreshed['ETag'])
+    assert status == 304
+
+def test_the_least_recently_used_response_is_evicted_at_max_entries(merchant_dataset):
+    api, _ = _api(merchant_dataset, cache_entries=2)
+    api.handle('/kpis', 'industry=Retail')
+    api.handle('/kpis', 'industry=SaaS')
+    # Reading Retail again makes SaaS the least recently used entry
+    api.handle('/kpis', 'industry=Retail')
+    api.handle('/kpis', 'industry=Education')
+    assert api.stats() == {'hits': 1, 'misses': 3, 'not_modified': 0, 'entries': 2, 'max_entries': 2}
+
+    api.handle('/kpis', 'industry=Retail')
+    api.handle('/kpis', 'industry=Education')
+    assert api.stats()['hits'] == 3
+    api.handle('/kpis', 'industry=SaaS')
+    assert api.stats()['misses'] == 4
+    assert api.stats()['entries'] == 2
@@ -0,0 +1,25 @@
+import os
+import shutil
+
+from utils.assets import ASSET_DIR, FONT_FACES, build_static_assets
+
+def test_missing_fonts_fall_back_to_local_fonts(tmp_path, caplog):
+    asset_dir = tmp_path / 'assets'
+    asset_dir.mkdir()
+    for name in ('retro.css', 'favicon.png'):
+        shutil.copy(os.path.join(ASSET_DIR, name), asset_dir / name)
+    # One bundled font, the others missing
+    (asset_dir / 'fonts').mkdir()
+    (asset_dir / 'fonts' / FONT_FACES[0][1]).write_bytes(b'wOF2 test font')
+
+    static_dir = tmp_path / 'static'
+    manifest = build_static_assets(str(asset_dir), str(static_dir))
+    stylesheet = (static_dir / manifest['retro.css']).read_text()
+
+    assert 'fonts.googleapis.com' not in stylesheet
+    assert f"url('{manifest['fonts/' + FONT_FACES[0][1]]}')" in stylesheet
+    for family, filename in FONT_FACES[1:]:
+        assert f"font-family: '{family}'; font-style: normal; font-weight: 400; src: local('{family}'), " \
+               f"local('Courier New')" in stylesheet
+        assert f'fonts/{filename}' not in manifest
+        assert filename in caplog.text
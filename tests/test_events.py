@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+
+from data.events import MonthlyEventAggregates, apply_event_aggregates
+from data.volumes import VolumeMatrix, encode_months
+
+MONTHS = encode_months(['2026-07', '2026-08', '2026-09'])
+
+def _dataset():
+    merchants_df = pd.DataFrame({
+        'merchant_id': ['M1', 'M2', 'M3'],
+        'latest_volume': np.array([50_377, 40_000, 0], dtype=np.uint16),
+        'volume_trend': np.zeros(3, dtype=np.float32),
+        'attempts': np.array([500, 400, 0], dtype=np.uint32),
+        'successes': np.array([480, 390, 0], dtype=np.uint32),
+        'authorizations': np.array([490, 395, 0], dtype=np.uint32),
+        'fraud_flags': np.array([2, 1, 0], dtype=np.uint32),
+    })
+    values = np.array([
+        [48_000.0, 49_000.0, 50_377.0],
+        [41_000.0, 40_500.0, 40_000.0],
+        [1_000.0, np.nan, np.nan],
+    ], dtype=np.float32)
+    return merchants_df, VolumeMatrix(merchants_df['merchant_id'], MONTHS, values)
+
+def _aggregates(*events):
+    aggregates = MonthlyEventAggregates()
+    aggregates.update(pd.DataFrame(events, columns=['merchant_id', 'timestamp', 'amount', 'status', 'fraud'])
+                      .assign(timestamp=lambda df: pd.to_datetime(df['timestamp'])))
+    return aggregates
+
+def test_events_add_to_the_month_instead_of_replacing_it():
+    merchants_df, volumes = _dataset()
+    aggregates = _aggregates(('M1', '2026-09-20', 100.0, 'succeeded', False),
+                             ('M1', '2026-09-21', 80.0, 'declined', False))
+
+    merchants_df, merged = apply_event_aggregates(merchants_df, volumes, aggregates)
+
+    assert np.array_equal(merged.months, MONTHS)
+    assert merged.values[0, -1] == 50_477
+    # Other merchants and months are untouched
+    assert np.array_equal(merged.values[1:], volumes.values[1:], equal_nan=True)
+    assert merchants_df['latest_volume'].tolist() == [50_477, 40_000, 0]
+    assert merchants_df['attempts'].tolist() == [502, 400, 0]
+    assert merchants_df['successes'].tolist() == [481, 390, 0]
+
+def test_a_month_past_the_history_stays_empty_for_merchants_without_events():
+    merchants_df, volumes = _dataset()
+    aggregates = _aggregates(('M2', '2026-10-02', 250.0, 'succeeded', False))
+
+    merchants_df, merged = apply_event_aggregates(merchants_df, volumes, aggregates)
+
+    assert merged.months[-1] == MONTHS[-1] + 1
+    new_month = merged.values[:, -1]
+    # The month is still open: no events yet is not a drop to zero
+    assert new_month[1] == 250
+    assert np.isnan(new_month[0]) and np.isnan(new_month[2])
+    assert np.array_equal(merged.values[:, :-1], volumes.values, equal_nan=True)
+
+def test_latest_volume_widens_when_events_leave_the_compacted_range():
+    merchants_df, volumes = _dataset()
+    aggregates = _aggregates(('M1', '2026-09-20', 20_000.0, 'succeeded', False))
+
+    merchants_df, _ = apply_event_aggregates(merchants_df, volumes, aggregates)
+
+    assert merchants_df['latest_volume'].dtype == np.int64
+    assert merchants_df['latest_volume'].tolist() == [70_377, 40_000, 0]
@@ -0,0 +1,23 @@
+import io
+import shlex
+
+import cli
+from data.backends import FrameBackend, MerchantFilters
+from data.sqlite_backend import publish_database
+from utils.export import export_command, export_leaderboard
+
+def test_export_command_reproduces_the_filtered_export(merchant_dataset, tmp_path):
+    merchants_df, volumes = merchant_dataset
+    database_dir = str(tmp_path / 'db')
+    publish_database(merchants_df, volumes, store_dir=database_dir)
+    filters = MerchantFilters(None, ('Small Business',), ('Rachel Chen', 'David Kim'), ('High', 'Medium'))
+    output = tmp_path / 'leaderboard.csv'
+
+    args = shlex.split(export_command(filters, str(output), 'csv', database_dir=database_dir))
+    assert args[:3] == ['python', 'cli.py', 'export']
+    assert '--industries' not in args
+    assert cli.main(args[2:]) == 0
+
+    expected = io.BytesIO()
+    assert export_leaderboard(FrameBackend(merchants_df, volumes), filters, expected, 'csv') > 0
+    assert output.read_bytes() == expected.getvalue()
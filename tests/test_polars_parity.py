@@ -0,0 +1,65 @@
+import pandas as pd
+import pytest
+
+pytest.importorskip('polars')
+
+from data.backends import ALL_MERCHANTS, FILTER_COLUMNS, FrameBackend, MerchantFilters
+from data.polars_backend import PolarsBackend
+
+# Sidebar states: everything, single and multiple selections, a one-manager book and an empty selection
+FILTER_STATES = [
+    ALL_MERCHANTS,
+    MerchantFilters(['Retail'], None, None, None),
+    MerchantFilters(['Retail', 'SaaS'], ['Enterprise', 'Mid-Market'], None, ['High', 'Medium']),
+    MerchantFilters(None, None, ['Rachel Chen'], None),
+    MerchantFilters(None, ['Small Business'], ['Alex Thompson', 'David Kim'], ['Low']),
+    MerchantFilters(None, None, None, []),
+]
+
+@pytest.fixture(scope='module')
+def backends(merchant_dataset):
+    merchants_df, volumes = merchant_dataset
+    return FrameBackend(merchants_df, volumes), PolarsBackend(merchants_df, volumes)
+
+@pytest.mark.parametrize('filters', FILTER_STATES)
+def test_queries_match_the_frame_backend(backends, filters):
+    frame_backend, polars_backend = backends
+
+    assert polars_backend.count(filters) == frame_backend.count(filters)
+
+    expected_kpis, found_kpis = frame_backend.kpis(filters), polars_backend.kpis(filters)
+    assert found_kpis.keys() == expected_kpis.keys()
+    for name in ('high_risk_count', 'medium_risk_count', 'at_risk_volume'):
+        assert found_kpis[name] == expected_kpis[name]
+    assert found_kpis['avg_risk_score'] == pytest.approx(expected_kpis['avg_risk_score'], nan_ok=True)
+
+    pd.testing.assert_frame_equal(polars_backend.risk_factor_counts(filters),
+                                  frame_backend.risk_factor_counts(filters), check_dtype=False)
+    pd.testing.assert_frame_equal(polars_backend.frame(filters), frame_backend.frame(filters))
+
+@pytest.mark.parametrize('filters', FILTER_STATES)
+def test_leaderboard_order_matches_the_frame_backend(backends, filters):
+    frame_backend, polars_backend = backends
+
+    for page in range(3):
+        pd.testing.assert_frame_equal(polars_backend.leaderboard_page(filters, page, 25),
+                                      frame_backend.leaderboard_page(filters, page, 25))
+
+    columns = ['merchant_id', 'risk_score', 'risk_category']
+    expected = list(frame_backend.iter_leaderboard(filters, 64, columns=columns))
+    found = list(polars_backend.iter_leaderboard(filters, 64, columns=columns))
+    assert len(found) == len(expected)
+    for found_chunk, expected_chunk in zip(found, expected):
+        pd.testing.assert_frame_equal(found_chunk, expected_chunk)
+
+@pytest.mark.parametrize('filters', FILTER_STATES)
+def test_matching_ids_match_the_frame_backend(backends, filters):
+    frame_backend, polars_backend = backends
+    candidates = frame_backend.merchants_df['merchant_id'].iloc[::7].tolist() + ['M99999']
+    assert polars_backend.matching_ids(filters, candidates) == frame_backend.matching_ids(filters, candidates)
+
+def test_distinct_values_match_the_frame_backend(backends):
+    frame_backend, polars_backend = backends
+    for column in FILTER_COLUMNS:
+        assert polars_backend.distinct(column) == frame_backend.distinct(column)
+    assert polars_backend.risk_factor_options() == frame_backend.risk_factor_options()
@@ -0,0 +1,35 @@
+import numpy as np
+
+from utils.retention import kaplan_meier
+
+def _naive_kaplan_meier(durations, events, max_duration):
+    survival, curve = 1.0, []
+    for month in range(max_duration + 1):
+        at_risk = sum(1 for duration in durations if min(duration, max_duration) >= month)
+        deaths = sum(event for duration, event in zip(durations, events)
+                     if duration == month and duration <= max_duration)
+        survival *= 1 - deaths / at_risk if at_risk else 1
+        curve.append(survival)
+    return np.array(curve)
+
+def test_matches_naive_estimator():
+    durations = [1, 3, 3, 4, 6, 6, 6, 8, 10, 12]
+    events = [1, 1, 0, 1, 0.5, 1, 0, 1, 0, 1]
+    curve = kaplan_meier(durations, events)['All Merchants'].to_numpy()
+    assert np.allclose(curve, _naive_kaplan_meier(durations, events, 12))
+
+def test_events_past_the_window_are_censored():
+    durations = [2, 5, 20, 30, 30]
+    events = [1, 0, 1, 1, 1]
+    curve = kaplan_meier(durations, events, max_duration=10)['All Merchants']
+    # Only the churn at month 2 falls inside the window; the rest are still retained at month 10
+    assert np.isclose(curve.iloc[-1], 0.8)
+    assert np.allclose(curve.to_numpy(), _naive_kaplan_meier(durations, events, 10))
+
+def test_groups_are_independent_curves():
+    durations = np.array([1, 2, 3, 1, 2, 3])
+    events = np.array([1, 0, 1, 0, 0, 1])
+    groups = ['a', 'a', 'a', 'b', 'b', 'b']
+    curves = kaplan_meier(durations, events, groups)
+    for group, mask in (('a', slice(0, 3)), ('b', slice(3, 6))):
+        assert np.allclose(curves[group].to_numpy(), _naive_kaplan_meier(durations[mask], events[mask], 3))
@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+
+from utils.simulation import MIN_SCENARIOS, scenario_count, simulate_lost_volume
+
+def _book():
+    return pd.DataFrame({
+        'segment': ['SMB', 'SMB', 'Enterprise', 'Mid-Market', 'Enterprise', 'SMB', 'Mid-Market'],
+        'account_manager': ['Ann', 'Bob', 'Ann', 'Cy', 'Bob', 'Cy', 'Ann'],
+        'monthly_volume_avg': [1000, 2500, 40000, 8000, 55000, 300, 12000]
+    })
+
+def _naive_lost_volume(merchants_df, probabilities, group_cols, n_scenarios, seed):
+    """One scenario and one merchant at a time, from the same uint16 draws as a single block."""
+    rng = np.random.default_rng(seed)
+    draws = rng.integers(0, 65536, size=(len(merchants_df), n_scenarios), dtype=np.uint16)
+    thresholds = np.round(np.clip(probabilities, 0.0, 1.0) * 65536).clip(max=65535)
+
+    lost = {col: {value: np.zeros(n_scenarios) for value in merchants_df[col].unique()} for col in group_cols}
+    total = np.zeros(n_scenarios)
+    for scenario in range(n_scenarios):
+        for row, merchant in enumerate(merchants_df.itertuples(index=False)):
+            if draws[row, scenario] < thresholds[row]:
+                for col in group_cols:
+                    lost[col][getattr(merchant, col)][scenario] += merchant.monthly_volume_avg
+                total[scenario] += merchant.monthly_volume_avg
+    return lost, total
+
+def test_matches_naive_loop():
+    merchants_df = _book()
+    probabilities = np.array([0.9, 0.1, 0.5, 0.75, 0.3, 1.0, 0.0])
+    group_cols = ('segment', 'account_manager')
+
+    results = simulate_lost_volume(merchants_df, probabilities, group_cols=group_cols, n_scenarios=200, seed=7)
+    lost, total = _naive_lost_volume(merchants_df, probabilities, group_cols, 200, seed=7)
+
+    for col in group_cols:
+        for value, losses in lost[col].items():
+            row = results[col].loc[value]
+            assert np.isclose(row['mean'], losses.mean())
+            assert np.isclose(row['p50'], np.percentile(losses, 50))
+            assert np.isclose(row['p90'], np.percentile(losses, 90))
+    assert np.isclose(results['total']['mean'].iloc[0], total.mean())
+    assert np.isclose(results['total']['p90'].iloc[0], np.percentile(total, 90))
+
+def test_certain_outcomes_do_not_depend_on_blocks():
+    merchants_df = _book()
+    probabilities = np.array([1.0, 0.0, 1.0, 0.0, 1.0, 0.0, 1.0])
+    expected = merchants_df['monthly_volume_avg'][probabilities == 1.0].sum()
+
+    # Tiny blocks split both merchants and scenarios
+    for chunk_cells in (3, 50, 10_000):
+        results = simulate_lost_volume(merchants_df, probabilities, n_scenarios=40, chunk_cells=chunk_cells)
+        assert results['total']['p50'].iloc[0] == expected
+        assert results['total']['p90'].iloc[0] == expected
+        assert results['segment']['mean'].to_dict() == {'Enterprise': 95_000, 'Mid-Market': 12_000, 'SMB': 1_000}
+
+def test_scenario_count_caps_large_books():
+    assert scenario_count(1_000, 10_000) == 10_000
+    assert scenario_count(100_000, 10_000, cell_budget=250_000_000) == 2_500
+    assert scenario_count(10_000_000, 10_000) == MIN_SCENARIOS
+    assert scenario_count(10_000_000, 100) == 100
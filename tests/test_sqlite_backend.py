@@ -0,0 +1,99 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from data.backends import ALL_MERCHANTS, FrameBackend, MerchantFilters
+from data.sqlite_backend import SQLiteBackend, build_database
+
+def _backends(merchant_dataset, tmp_path):
+    merchants_df, volumes = merchant_dataset
+    path = os.path.join(tmp_path, 'merchants.sqlite')
+    build_database(merchants_df, volumes, path)
+    return FrameBackend(merchants_df, volumes), SQLiteBackend(path)
+
+def test_cohort_matrix_in_sql_matches_the_frame_backend(merchant_dataset, tmp_path):
+    frame_backend, sqlite_backend = _backends(merchant_dataset, tmp_path)
+    for metric in ('active', 'volume'):
+        expected = frame_backend.cohort_matrix(metric)
+        assert not expected.empty
+        pd.testing.assert_frame_equal(sqlite_backend.cohort_matrix(metric), expected, rtol=1e-6)
+
+def test_volume_matrix_streams_every_row(merchant_dataset, tmp_path, monkeypatch):
+    import data.sqlite_backend
+    frame_backend, sqlite_backend = _backends(merchant_dataset, tmp_path)
+    # Several fetch chunks, the last one partial
+    monkeypatch.setattr(data.sqlite_backend, 'VOLUME_FETCH_ROWS', 1000)
+
+    expected = frame_backend.volume_matrix()
+    found = sqlite_backend.volume_matrix()
+    assert list(found.merchant_ids) == list(expected.merchant_ids)
+    assert np.array_equal(found.months, expected.months)
+    assert np.array_equal(found.values, expected.values, equal_nan=True)
+
+    since = found.months[-4]
+    recent = sqlite_backend.volume_matrix(since_month=since)
+    assert np.array_equal(recent.months, expected.months[-4:])
+    assert np.array_equal(recent.values, expected.values[:, -4:], equal_nan=True)
+
+def test_volume_chunks_cover_every_merchant_once(merchant_dataset, tmp_path):
+    frame_backend, sqlite_backend = _backends(merchant_dataset, tmp_path)
+    expected = frame_backend.volume_matrix()
+    since = expected.months[-5]
+
+    for backend in (frame_backend, sqlite_backend):
+        chunks = list(backend.iter_volume_chunks(since_month=since, chunk_rows=150))
+        assert [chunk.shape[0] for chunk in chunks] == [150, 150, 100]
+        assert all(np.array_equal(chunk.months, expected.months[-5:]) for chunk in chunks)
+        assert [merchant_id for chunk in chunks for merchant_id in chunk.merchant_ids] == list(expected.merchant_ids)
+        assert np.array_equal(np.vstack([chunk.values for chunk in chunks]), expected.values[:, -5:], equal_nan=True)
+
+# Sidebar states: everything, partial industry, segment, manager and risk selections, and an empty selection
+FILTER_STATES = [
+    ALL_MERCHANTS,
+    MerchantFilters(('Retail',), None, None, None),
+    MerchantFilters(None, ('Enterprise', 'Small Business'), None, None),
+    MerchantFilters(None, None, ('Rachel Chen',), None),
+    MerchantFilters(None, None, None, ('High', 'Medium')),
+    MerchantFilters(('Retail', 'SaaS'), ('Mid-Market',), ('Alex Thompson', 'David Kim'), ('High',)),
+    MerchantFilters(None, (), None, None),
+]
+
+@pytest.mark.parametrize('filters', FILTER_STATES)
+def test_filtered_queries_match_the_frame_backend(merchant_dataset, tmp_path, filters):
+    frame_backend, sqlite_backend = _backends(merchant_dataset, tmp_path)
+
+    assert sqlite_backend.count(filters) == frame_backend.count(filters)
+
+    expected_kpis, found_kpis = frame_backend.kpis(filters), sqlite_backend.kpis(filters)
+    for name in ('high_risk_count', 'medium_risk_count', 'at_risk_volume'):
+        assert found_kpis[name] == expected_kpis[name]
+    assert found_kpis['avg_risk_score'] == pytest.approx(expected_kpis['avg_risk_score'], nan_ok=True)
+
+    pd.testing.assert_frame_equal(sqlite_backend.risk_factor_counts(filters),
+                                  frame_backend.risk_factor_counts(filters), check_dtype=False)
+
+    columns = ['merchant_id', 'risk_score', 'industry', 'segment', 'account_manager', 'risk_category']
+    pd.testing.assert_frame_equal(sqlite_backend.frame(filters, columns).reset_index(drop=True),
+                                  frame_backend.frame(filters, columns).reset_index(drop=True).astype(object),
+                                  check_dtype=False)
+
+@pytest.mark.parametrize('filters', FILTER_STATES)
+def test_leaderboard_pages_match_the_frame_backend(merchant_dataset, tmp_path, filters):
+    frame_backend, sqlite_backend = _backends(merchant_dataset, tmp_path)
+    columns = ['merchant_id', 'risk_score', 'risk_factors']
+
+    # Pages of 40 split the tied risk scores across page boundaries; the last page runs past the end
+    num_pages = frame_backend.count(filters) // 40 + 2
+    for page in range(num_pages):
+        expected = frame_backend.leaderboard_page(filters, page, 40)[columns]
+        found = sqlite_backend.leaderboard_page(filters, page, 40)[columns]
+        pd.testing.assert_frame_equal(found, expected, check_dtype=False)
+
+def test_manager_workload_matches_the_frame_backend(merchant_dataset, tmp_path):
+    frame_backend, sqlite_backend = _backends(merchant_dataset, tmp_path)
+    expected = frame_backend.manager_workload()
+    # Managers are a categorical index in memory and plain text in SQLite
+    expected.index = expected.index.astype(object)
+    pd.testing.assert_frame_equal(sqlite_backend.manager_workload(), expected, check_dtype=False)
@@ -0,0 +1,211 @@
+import threading
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+
+from data.volumes import month_label
+
+Alert = namedtuple('Alert', ['merchant_id', 'month', 'volume', 'baseline', 'pct_change', 'z_score'])
+
+def rolling_drop_scores(matrix, window=3):
+    """
+    Score every (merchant, month) cell against the merchant's trailing window.
+
+    The trailing mean and standard deviation of the previous ``window`` months
+    come from NaN-aware cumulative sums along the month axis, so the whole
+    merchants x months matrix is scored in one vectorized pass.
+
+    Args:
+        matrix (ndarray): Merchants x months volume matrix (NaN = no data)
+        window (int): Number of previous months forming the baseline
+
+    Returns:
+        tuple: (baseline, pct_change, z_score) matrices shaped like ``matrix``;
+               cells without a full baseline window are NaN
+    """
+    present = ~np.isnan(matrix)
+    values = np.where(present, matrix, 0.0)
+
+    # Prepend a zero column so window sums are simple differences
+    zeros = np.zeros((matrix.shape[0], 1))
+    cum_sum = np.hstack([zeros, np.cumsum(values, axis=1)])
+    cum_sq = np.hstack([zeros, np.cumsum(values * values, axis=1)])
+    cum_count = np.hstack([zeros, np.cumsum(present, axis=1)])
+
+    num_months = matrix.shape[1]
+    baseline = np.full(matrix.shape, np.nan)
+    pct_change = np.full(matrix.shape, np.nan)
+    z_score = np.full(matrix.shape, np.nan)
+    if num_months <= window:
+        return baseline, pct_change, z_score
+
+    end = np.arange(window, num_months)
+    start = end - window
+    count = cum_count[:, end] - cum_count[:, start]
+    window_sum = cum_sum[:, end] - cum_sum[:, start]
+    window_sq = cum_sq[:, end] - cum_sq[:, start]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = np.where(count == window, window_sum / count, np.nan)
+        std = np.sqrt(np.maximum(window_sq / count - mean * mean, 0.0))
+        current = matrix[:, window:]
+        baseline[:, window:] = mean
+        pct_change[:, window:] = np.where(mean > 0, current / mean - 1, np.nan)
+        z_score[:, window:] = np.where(std > 0, (current - mean) / std, np.nan)
+
+    return baseline, pct_change, z_score
+
+class VolumeAnomalyDetector:
+    """
+    Incremental volume-drop detector feeding a bounded, deduplicated alert queue.
+
+    Each call to ``scan`` scores the last scanned month again and every month
+    after it (plus the trailing window needed as their baseline), so newly
+    arrived months cost one column each. The last month is re-scored because
+    it may still be filling in (e.g. from ingested events): its alerts are
+    replaced by the new scores, so a drop that was only a partial month is
+    withdrawn once the month catches up.
+    """
+
+    def __init__(self, window=3, drop_threshold=0.30, z_threshold=3.0, z_min_drop=0.10, max_alerts=200):
+        self.window = window
+        self.drop_threshold = drop_threshold
+        self.z_threshold = z_threshold
+        # Short windows can have tiny deviations; z-score alerts also need a real drop
+        self.z_min_drop = z_min_drop
+        self.max_alerts = max_alerts
+        self.last_scanned_month = None
+        # Keyed by (merchant_id, month) so repeated scans never duplicate alerts
+        self._alerts = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _score_chunk(self, merchant_ids, matrix, months, first_new):
+        """Flagged cells of one chunk of merchants as ((month column, -pct_change), key, alert), at most max_alerts."""
+        # Include the trailing window so the scored months have a baseline
+        offset = max(0, first_new - self.window)
+        baseline, pct_change, z_score = rolling_drop_scores(matrix[:, offset:], self.window)
+        new_cols = slice(first_new - offset, None)
+
+        pct_new = pct_change[:, new_cols]
+        z_new = z_score[:, new_cols]
+        with np.errstate(invalid='ignore'):
+            flagged = (pct_new <= -self.drop_threshold) | (
+                (z_new <= -self.z_threshold) & (pct_new <= -self.z_min_drop)
+            )
+        rows, cols = np.nonzero(flagged)
+        order = np.lexsort((-pct_new[rows, cols], cols))[-self.max_alerts:]
+
+        merchant_ids = np.asarray(merchant_ids)
+        scored = []
+        for row, col in zip(rows[order], cols[order]):
+            matrix_col = first_new + col
+            alert = Alert(
+                merchant_id=merchant_ids[row],
+                month=month_label(months[matrix_col]),
+                volume=float(matrix[row, matrix_col]),
+                baseline=float(baseline[row, first_new - offset + col]),
+                pct_change=float(pct_new[row, col]),
+                z_score=float(z_new[row, col])
+            )
+            scored.append(((int(col), -alert.pct_change), (merchant_ids[row], int(months[matrix_col])), alert))
+        return scored
+
+    def scan(self, merchant_ids, matrix, months):
+        """
+        Scan newly arrived months, and the last scanned one again, for sudden volume drops.
+
+        Args:
+            merchant_ids (array-like): merchant_id per matrix row
+            matrix (ndarray): Merchants x months volume matrix
+            months (ndarray): Integer month index per matrix column
+
+        Returns:
+            list: Alerts not queued before this scan, newest and most severe first
+        """
+        return self.scan_chunks([(merchant_ids, matrix, months)])
+
+    def scan_chunks(self, chunks):
+        """
+        Scan a volume history delivered in chunks of merchants.
+
+        Each chunk is scored on its own, so only one chunk of the history has
+        to be in memory (see iter_volume_chunks on the backends); the queue
+        is updated once, after the last chunk.
+
+        Args:
+            chunks (iterable): (merchant_ids, matrix, months) per chunk of merchants, all with the same months
+
+        Returns:
+            list: Alerts not queued before this scan, newest and most severe first
+        """
+        with self._lock:
+            last_scanned_month = self.last_scanned_month
+
+        # Scored outside the lock: readers keep the current queue while chunks are read
+        months, first_new, scored = None, 0, []
+        for merchant_ids, matrix, chunk_months in chunks:
+            if months is None:
+                months = np.asarray(chunk_months)
+                if last_scanned_month is not None:
+                    first_new = int(np.searchsorted(months, last_scanned_month, side='left'))
+                if len(months) == 0 or first_new >= len(months):
+                    return []
+            scored.extend(self._score_chunk(merchant_ids, matrix, months, first_new))
+        if months is None:
+            return []
+
+        # Queue order is oldest month / mildest drop first, so evictions from a
+        # full queue hit those before recent, severe drops
+        scored.sort(key=lambda item: item[0])
+        scored = scored[-self.max_alerts:]
+
+        with self._lock:
+            # Re-scored months replace their earlier alerts
+            first_scored = int(months[first_new])
+            replaced = {key for key in self._alerts if key[1] >= first_scored}
+            for key in replaced:
+                del self._alerts[key]
+
+            new_alerts = []
+            for _, key, alert in scored:
+                self._alerts[key] = alert
+                if key not in replaced:
+                    new_alerts.append(alert)
+
+            while len(self._alerts) > self.max_alerts:
+                self._alerts.popitem(last=False)
+
+            self.last_scanned_month = int(months[-1])
+            return new_alerts[::-1]
+
+    def first_month_needed(self):
+        """
+        Earliest month the next scan needs: the trailing window before the last scanned month.
+
+        Returns:
+            int: Month index, or None if nothing has been scanned yet (the whole history is needed)
+        """
+        with self._lock:
+            if self.last_scanned_month is None:
+                return None
+            return self.last_scanned_month - self.window
+
+    def latest(self, limit=None, merchant_ids=None):
+        """
+        Return queued alerts, newest month first.
+
+        Args:
+            limit (int): Maximum number of alerts to return
+            merchant_ids (set): Only return alerts for these merchants
+
+        Returns:
+            list: Queued alerts
+        """
+        with self._lock:
+            alerts = list(self._alerts.values())
+
+        if merchant_ids is not None:
+            alerts = [alert for alert in alerts if alert.merchant_id in merchant_ids]
+
+        alerts.sort(key=lambda alert: (alert.month, -alert.pct_change), reverse=True)
+        return alerts[:limit] if limit is not None else alerts
@@ -0,0 +1,299 @@
+import datetime
+import hashlib
+import json
+import math
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import numpy as np
+import pandas as pd
+
+from utils.metrics import LEADERBOARD_COLUMNS
+
+# Serialized responses kept per server (least recently used evicted first)
+API_CACHE_ENTRIES = 4096
+
+# Leaderboard page size when none is given, and the largest one allowed
+API_PAGE_SIZE = 100
+API_MAX_PAGE_SIZE = 1000
+
+# Query parameter -> MerchantFilters field; each may be repeated to select several values
+FILTER_PARAMS = {
+    'industry': 'industries',
+    'segment': 'segments',
+    'manager': 'managers',
+    'risk_category': 'risk_categories'
+}
+
+# Columns of each leaderboard row
+LEADERBOARD_FIELDS = ['merchant_id'] + list(LEADERBOARD_COLUMNS)
+
+class APIError(Exception):
+    """A request the API answers with an error status and message."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+def _json_ready(value):
+    """Plain JSON types for NumPy / pandas values; NaN and missing values become null."""
+    if isinstance(value, dict):
+        return {str(key): _json_ready(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return [_json_ready(item) for item in value]
+    if isinstance(value, (bool, np.bool_)):
+        return bool(value)
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    if isinstance(value, (float, np.floating)):
+        return None if math.isnan(value) else float(value)
+    if value is None or value is pd.NaT or value is pd.NA:
+        return None
+    if isinstance(value, datetime.date):
+        return value.isoformat()
+    return str(value)
+
+def _filters(params):
+    from data.backends import ALL_MERCHANTS
+    return ALL_MERCHANTS._replace(**{
+        field: tuple(params[param]) for param, field in FILTER_PARAMS.items() if param in params
+    })
+
+def _int_param(params, name, default, minimum, maximum=None):
+    values = params.get(name)
+    if not values:
+        return default
+    try:
+        value = int(values[-1])
+    except ValueError:
+        raise APIError(400, f"{name} must be an integer")
+    if value < minimum or (maximum is not None and value > maximum):
+        raise APIError(400, f"{name} must be between {minimum} and {maximum}" if maximum is not None
+                       else f"{name} must be at least {minimum}")
+    return value
+
+def _version(snapshot, params):
+    return {'loaded_at': snapshot.loaded_at}
+
+def _kpis(snapshot, params):
+    backend, filters = snapshot.derived['backend'], _filters(params)
+    return {'merchant_count': backend.count(filters), **backend.kpis(filters)}
+
+def _risk_factors(snapshot, params):
+    factor_counts = snapshot.derived['backend'].risk_factor_counts(_filters(params))
+    return {'risk_factors': [
+        {'factor': factor, 'count': count} for factor, count in factor_counts.itertuples(index=False)
+    ]}
+
+def _leaderboard(snapshot, params):
+    backend, filters = snapshot.derived['backend'], _filters(params)
+    page = _int_param(params, 'page', 1, 1)
+    page_size = _int_param(params, 'page_size', API_PAGE_SIZE, 1, API_MAX_PAGE_SIZE)
+    page_merchants = backend.leaderboard_page(filters, page - 1, page_size)
+    return {
+        'page': page,
+        'page_size': page_size,
+        'merchant_count': backend.count(filters),
+        'merchants': page_merchants[LEADERBOARD_FIELDS].to_dict('records')
+    }
+
+def _merchant(snapshot, params, merchant_id):
+    from data.volumes import month_label
+
+    backend = snapshot.derived['backend']
+    merchant = backend.merchant(merchant_id)
+    if merchant is None:
+        raise APIError(404, f"No merchant {merchant_id}")
+    history = backend.merchant_volumes([merchant_id])
+    return {
+        'merchant': merchant.to_dict(),
+        'volume_history': [
+            {'month': month_label(month), 'volume': volume}
+            for month, volume in zip(history.months, history.values[0])
+        ]
+    }
+
+# Path -> handler(snapshot, params); merchant profiles live under MERCHANT_PREFIX
+ROUTES = {
+    '/version': _version,
+    '/kpis': _kpis,
+    '/risk-factors': _risk_factors,
+    '/leaderboard': _leaderboard
+}
+MERCHANT_PREFIX = '/merchants/'
+
+# Query parameters each route accepts; anything else is rejected so it cannot fragment the cache
+ROUTE_PARAMS = {
+    '/version': set(),
+    '/kpis': set(FILTER_PARAMS),
+    '/risk-factors': set(FILTER_PARAMS),
+    '/leaderboard': set(FILTER_PARAMS) | {'page', 'page_size'},
+    MERCHANT_PREFIX: set()
+}
+
+class MetricsAPI:
+    """
+    Read-only JSON answers to the dashboard's queries, cached per dataset version.
+
+    Every request reads the refresher's current snapshot once and runs the
+    same backend queries as the dashboard. Responses are cached as serialized
+    bytes keyed by (dataset version, path, query parameters) with LRU
+    eviction, and carry an ETag derived from that key. A client that sends
+    the ETag back in If-None-Match gets a 304 without any query or cache
+    lookup until a new dataset version is swapped in.
+
+    Args:
+        refresher (DatasetRefresher): Source of dataset snapshots with a 'backend' in their derived data
+        cache_entries (int): Responses kept in the cache (0 disables caching)
+    """
+
+    def __init__(self, refresher, cache_entries=API_CACHE_ENTRIES):
+        self.refresher = refresher
+        self.cache_entries = cache_entries
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def stats(self):
+        """
+        Cache counters since the API started.
+
+        Returns:
+            dict: hits, misses, not_modified (304s), entries and max_entries
+        """
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'not_modified': self.not_modified,
+                'entries': len(self._cache),
+                'max_entries': self.cache_entries
+            }
+
+    def _route(self, path):
+        if path.startswith(MERCHANT_PREFIX) and len(path) > len(MERCHANT_PREFIX):
+            merchant_id = unquote(path[len(MERCHANT_PREFIX):])
+            return MERCHANT_PREFIX, lambda snapshot, params: _merchant(snapshot, params, merchant_id)
+        if path not in ROUTES:
+            raise APIError(404, f"Unknown endpoint {path}")
+        return path, ROUTES[path]
+
+    def _cached(self, key):
+        with self._lock:
+            body = self._cache.get(key)
+            if body is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._cache.move_to_end(key)
+            return body
+
+    def _store(self, key, body):
+        if self.cache_entries <= 0:
+            return
+        with self._lock:
+            self._cache[key] = body
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_entries:
+                self._cache.popitem(last=False)
+
+    def handle(self, path, query='', if_none_match=None):
+        """
+        Answer one GET request.
+
+        Args:
+            path (str): URL path, e.g. '/kpis'
+            query (str): URL query string, e.g. 'segment=Enterprise&risk_category=High'
+            if_none_match (str): If-None-Match request header, if any
+
+        Returns:
+            tuple: (HTTP status, dict of response headers, body bytes)
+        """
+        try:
+            if path == '/stats':
+                return self._response(200, {'cache': self.stats()})
+
+            route, handler = self._route(path)
+            params = parse_qs(query)
+            unknown = set(params) - ROUTE_PARAMS[route]
+            if unknown:
+                raise APIError(400, f"Unknown query parameters: {', '.join(sorted(unknown))}")
+
+            snapshot = self.refresher.current()
+            key = (snapshot.version, path, tuple(sorted((name, tuple(values)) for name, values in params.items())))
+            # Answers are fixed for a version and query, so the ETag can be derived from the key alone
+            etag = '"' + hashlib.sha1(repr(key).encode('utf-8')).hexdigest()[:20] + '"'
+            headers = {'ETag': etag, 'Cache-Control': 'no-cache', 'X-Dataset-Version': snapshot.version}
+
+            if if_none_match and (if_none_match.strip() == '*' or etag in
+                                  [tag.strip() for tag in if_none_match.split(',')]):
+                with self._lock:
+                    self.not_modified += 1
+                return 304, headers, b''
+
+            body = self._cached(key)
+            if body is None:
+                payload = {'version': snapshot.version, **handler(snapshot, params)}
+                body = json.dumps(_json_ready(payload), separators=(',', ':')).encode('utf-8')
+                self._store(key, body)
+            return 200, {'Content-Type': 'application/json', **headers}, body
+        except APIError as e:
+            return self._response(e.status, {'error': str(e)})
+
+    def _response(self, status, payload):
+        body = json.dumps(_json_ready(payload), separators=(',', ':')).encode('utf-8')
+        return status, {'Content-Type': 'application/json', 'Cache-Control': 'no-store'}, body
+
+def _request_handler(api, access_log):
+    class MetricsRequestHandler(BaseHTTPRequestHandler):
+        # Keep-alive, so polling clients do not reconnect for every request
+        protocol_version = 'HTTP/1.1'
+        # Headers and body go out as separate writes; without TCP_NODELAY each small
+        # response waits on the client's delayed ACK (~40 ms)
+        disable_nagle_algorithm = True
+        server_version = 'ChurnRadarAPI/1.0'
+
+        def do_GET(self):
+            url = urlsplit(self.path)
+            status, headers, body = api.handle(url.path, url.query, self.headers.get('If-None-Match'))
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_POST(self):
+            self.send_error(405, "The API is read-only")
+
+        def log_message(self, format, *args):
+            if access_log:
+                super().log_message(format, *args)
+
+    return MetricsRequestHandler
+
+def make_api_server(api, host='127.0.0.1', port=8502, access_log=False):
+    """
+    Threaded HTTP server for a MetricsAPI (call serve_forever() to run it).
+
+    Args:
+        api (MetricsAPI): API answering the requests
+        host (str): Interface to listen on
+        port (int): Port to listen on (0 picks a free one)
+        access_log (bool): Log every request to stderr
+
+    Returns:
+        ThreadingHTTPServer: Bound server
+    """
+    server = ThreadingHTTPServer((host, port), _request_handler(api, access_log))
+    server.daemon_threads = True
+    return server
+
+def api_derived_data(merchants_df, volumes, metadata, previous=None):
+    """build_derived for the API's DatasetRefresher: only the query backend is needed."""
+    from data.backends import frame_backend
+    return {'backend': metadata.get('backend') or frame_backend(merchants_df, volumes)}
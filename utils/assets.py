@@ -0,0 +1,191 @@
+import functools
+import hashlib
+import json
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Source assets (checked in) and the build output Streamlit serves at app/static/
+ASSET_DIR = os.path.join(ROOT_DIR, 'assets')
+STATIC_DIR = os.path.join(ROOT_DIR, 'static')
+STATIC_URL_PREFIX = 'app/static'
+
+# (font family, file under assets/fonts/). The SIL OFL fonts are served from static/ so
+# no page load waits on fonts.googleapis.com
+FONT_FACES = [
+    ('VT323', 'VT323-Regular.woff2'),
+    ('Press Start 2P', 'PressStart2P-Regular.woff2'),
+    ('Space Mono', 'SpaceMono-Regular.woff2'),
+]
+
+# Installed monospace fonts a family falls back to when its file is missing from assets/fonts/
+FALLBACK_LOCAL_FONTS = ['Courier New', 'DejaVu Sans Mono', 'Liberation Mono', 'Menlo', 'Consolas']
+
+# Merchant icon colors rendered to static PNGs
+ICON_COLORS = ['cyan', 'pink', 'green', 'yellow', 'orange', 'red']
+
+def content_hash(data):
+    """
+    Short content hash used in static file names.
+
+    Args:
+        data (bytes): File contents
+
+    Returns:
+        str: First 10 hex digits of the SHA-256 digest
+    """
+    return hashlib.sha256(data).hexdigest()[:10]
+
+def _write_hashed(static_dir, name, data):
+    """Write data as <name>.<hash><ext> under static_dir and return the relative path."""
+    base, ext = os.path.splitext(name)
+    hashed_name = f"{base}.{content_hash(data)}{ext}"
+    path = os.path.join(static_dir, hashed_name)
+
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write-then-rename so concurrent server processes never serve a partial file
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as tmp_file:
+            tmp_file.write(data)
+        os.replace(tmp_path, path)
+
+    return hashed_name
+
+def font_face_css(font_files, missing_families=()):
+    """
+    @font-face rules for the bundled fonts.
+
+    Installed copies are tried first, then the bundled file. A family whose
+    file is missing maps to an installed copy or, failing that, to the first
+    installed font of FALLBACK_LOCAL_FONTS, so the stylesheet's font stacks
+    never reach for a web font.
+
+    Args:
+        font_files (dict): Font family -> URL relative to the stylesheet
+        missing_families (iterable): Families without a bundled file
+
+    Returns:
+        str: CSS rules
+    """
+    rules = []
+    for family, url in font_files.items():
+        rules.append(
+            f"@font-face {{ font-family: '{family}'; font-style: normal; font-weight: 400; "
+            f"font-display: swap; src: local('{family}'), url('{url}') format('woff2'); }}"
+        )
+    for family in missing_families:
+        sources = ", ".join(f"local('{name}')" for name in [family] + FALLBACK_LOCAL_FONTS)
+        rules.append(
+            f"@font-face {{ font-family: '{family}'; font-style: normal; font-weight: 400; src: {sources}; }}"
+        )
+    return "\n".join(rules)
+
+def build_static_assets(asset_dir=ASSET_DIR, static_dir=STATIC_DIR):
+    """
+    Build content-hashed copies of the stylesheet, fonts, favicon and icons.
+
+    Files are only written when their content changed, so rebuilding on every
+    server start is cheap and old hashed names keep working for open sessions.
+
+    Args:
+        asset_dir (str): Source asset directory
+        static_dir (str): Output directory served by Streamlit
+
+    Returns:
+        dict: Manifest mapping logical asset names to hashed paths under static_dir
+    """
+    from utils.visualizations import merchant_icon_png
+
+    manifest = {}
+
+    font_files = {}
+    missing_fonts = []
+    for family, filename in FONT_FACES:
+        font_path = os.path.join(asset_dir, 'fonts', filename)
+        if not os.path.exists(font_path):
+            missing_fonts.append((family, filename))
+            continue
+        with open(font_path, 'rb') as font_file:
+            manifest[f'fonts/{filename}'] = _write_hashed(static_dir, f'fonts/{filename}', font_file.read())
+        font_files[family] = manifest[f'fonts/{filename}']
+
+    if missing_fonts:
+        logger.warning(
+            "Fonts missing from %s (%s); falling back to installed monospace fonts",
+            os.path.join(asset_dir, 'fonts'), ', '.join(filename for _, filename in missing_fonts)
+        )
+
+    with open(os.path.join(asset_dir, 'retro.css')) as css_file:
+        stylesheet = font_face_css(font_files, [family for family, _ in missing_fonts]) + "\n" + css_file.read()
+    manifest['retro.css'] = _write_hashed(static_dir, 'retro.css', stylesheet.encode())
+
+    with open(os.path.join(asset_dir, 'favicon.png'), 'rb') as favicon_file:
+        manifest['favicon.png'] = _write_hashed(static_dir, 'favicon.png', favicon_file.read())
+
+    for color in ICON_COLORS:
+        manifest[f'icons/merchant-{color}.png'] = _write_hashed(
+            static_dir, f'icons/merchant-{color}.png', merchant_icon_png(color)
+        )
+
+    with open(os.path.join(static_dir, 'manifest.json'), 'w') as manifest_file:
+        json.dump(manifest, manifest_file, indent=2, sort_keys=True)
+
+    return manifest
+
+@functools.lru_cache(maxsize=1)
+def static_manifest():
+    """Build the static assets once per process and return the manifest."""
+    return build_static_assets()
+
+def static_url(name, manifest=None):
+    """
+    URL of a built asset, e.g. static_url('retro.css') -> 'app/static/retro.<hash>.css'.
+
+    Args:
+        name (str): Logical asset name (a manifest key)
+        manifest (dict): Manifest to use (default: the process-wide build)
+
+    Returns:
+        str: URL relative to the app's base path
+    """
+    manifest = manifest if manifest is not None else static_manifest()
+    return f"{STATIC_URL_PREFIX}/{manifest[name]}"
+
+def static_path(name, manifest=None):
+    """
+    Filesystem path of a built asset.
+
+    Args:
+        name (str): Logical asset name (a manifest key)
+        manifest (dict): Manifest to use (default: the process-wide build)
+
+    Returns:
+        str: Absolute path under STATIC_DIR
+    """
+    manifest = manifest if manifest is not None else static_manifest()
+    return os.path.join(STATIC_DIR, manifest[name])
+
+def stylesheet_tag(inline=False, manifest=None):
+    """
+    HTML that applies the retro stylesheet.
+
+    Normally a <link> to the hashed file, so the browser downloads the CSS once
+    and each rerun only sends the tag. With inline=True (static serving
+    disabled) the built stylesheet is embedded instead.
+
+    Args:
+        inline (bool): Embed the stylesheet instead of linking it
+        manifest (dict): Manifest to use (default: the process-wide build)
+
+    Returns:
+        str: HTML for st.markdown(..., unsafe_allow_html=True)
+    """
+    if not inline:
+        return f'<link rel="stylesheet" href="{static_url("retro.css", manifest)}">'
+
+    with open(static_path('retro.css', manifest)) as css_file:
+        return f"<style>\n{css_file.read()}\n</style>"
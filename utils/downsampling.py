@@ -0,0 +1,75 @@
+import numpy as np
+
+def minmax_indices(values, buckets):
+    """
+    Positions of each bucket's smallest and largest value.
+
+    Splits the series into `buckets` contiguous, near-equal buckets and keeps
+    the minimum and maximum of each, so peaks and dips survive at any
+    length. At most 2 * buckets positions are returned; shorter series come
+    back whole. NaN values are only picked for a bucket that holds nothing
+    else.
+
+    Args:
+        values (array-like): Series to thin out
+        buckets (int): Number of buckets (e.g. half the chart's pixel width)
+
+    Returns:
+        ndarray: Sorted int64 positions into values
+    """
+    values = np.asarray(values, dtype=np.float64)
+    num_values = len(values)
+    if buckets <= 0 or num_values <= 2 * buckets:
+        return np.arange(num_values)
+
+    edges = np.linspace(0, num_values, buckets + 1).astype(np.int64)
+    bucket = np.repeat(np.arange(buckets), np.diff(edges))
+    missing = np.isnan(values)
+
+    # Sorting by (bucket, value) puts each bucket's minimum first and maximum last
+    by_low = np.lexsort((np.where(missing, np.inf, values), bucket))
+    by_high = np.lexsort((np.where(missing, -np.inf, values), bucket))
+    return np.unique(np.concatenate([by_low[edges[:-1]], by_high[edges[1:] - 1]]))
+
+def lttb_indices(values, points):
+    """
+    Positions picked by Largest-Triangle-Three-Buckets downsampling.
+
+    Keeps the first and last value and, from each of points - 2 buckets in
+    between, the value that forms the largest triangle with the previously
+    kept value and the next bucket's average. This follows the shape of a
+    line far better than taking every n-th value. Values are taken as evenly
+    spaced; NaN counts as zero when choosing (the returned positions still
+    point at the NaN, so gaps stay gaps).
+
+    Args:
+        values (array-like): Series to thin out
+        points (int): Number of values to keep (at least 3)
+
+    Returns:
+        ndarray: Sorted int64 positions into values
+    """
+    values = np.nan_to_num(np.asarray(values, dtype=np.float64))
+    num_values = len(values)
+    if points < 3 or num_values <= points:
+        return np.arange(num_values)
+
+    edges = np.linspace(1, num_values - 1, points - 1).astype(np.int64)
+    selected = np.empty(points, dtype=np.int64)
+    selected[0], selected[-1] = 0, num_values - 1
+
+    previous = 0
+    for bucket in range(points - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        # Average of the next bucket (the last value for the final bucket)
+        next_end = edges[bucket + 2] if bucket + 2 < len(edges) else num_values
+        next_x = (end + next_end - 1) / 2
+        next_y = values[end:next_end].mean()
+
+        x = np.arange(start, end)
+        areas = np.abs((previous - next_x) * (values[start:end] - values[previous])
+                       - (previous - x) * (next_y - values[previous]))
+        previous = start + int(areas.argmax())
+        selected[bucket + 1] = previous
+
+    return selected
@@ -0,0 +1,114 @@
+import shlex
+
+from utils.metrics import LEADERBOARD_COLUMNS, format_leaderboard
+
+# File formats the leaderboard can be exported to
+EXPORT_FORMATS = ('csv', 'parquet')
+
+# MIME type per export format, for the download button
+EXPORT_MIME_TYPES = {'csv': 'text/csv', 'parquet': 'application/vnd.apache.parquet'}
+
+# Merchants fetched, formatted and written per chunk
+EXPORT_CHUNK_ROWS = 50_000
+
+# MerchantFilters field -> `cli.py export` flag
+EXPORT_FILTER_FLAGS = {
+    'industries': '--industries',
+    'segments': '--segments',
+    'managers': '--managers',
+    'risk_categories': '--risk-categories',
+}
+
+def _leaderboard_chunks(backend, filters, chunk_size):
+    """Leaderboard columns in chunks; a single empty chunk when nothing matches, so headers are still written."""
+    columns = list(LEADERBOARD_COLUMNS)
+    empty = True
+    for chunk in backend.iter_leaderboard(filters, chunk_size, columns=columns):
+        empty = False
+        yield chunk
+    if empty:
+        yield backend.leaderboard_page(filters, 0, 0)[columns]
+
+def _write_csv(chunks, output):
+    for number, chunk in enumerate(chunks):
+        # Same text as the dashboard table, one chunk-sized string at a time
+        output.write(format_leaderboard(chunk).to_csv(index=False, header=number == 0).encode('utf-8'))
+
+def _write_parquet(chunks, output):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    writer = None
+    try:
+        for chunk in chunks:
+            # Typed values under the display names; the first chunk fixes the schema
+            chunk = chunk.rename(columns=LEADERBOARD_COLUMNS)
+            if writer is None:
+                schema = pa.Schema.from_pandas(chunk, preserve_index=False)
+                writer = pq.ParquetWriter(output, schema)
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+    finally:
+        if writer is not None:
+            writer.close()
+
+def export_leaderboard(backend, filters, output, export_format='csv', chunk_size=EXPORT_CHUNK_ROWS):
+    """
+    Write the filtered leaderboard, highest risk score first, to a file.
+
+    Rows are streamed from the backend chunk by chunk and each chunk is
+    projected to the leaderboard columns, formatted and written before the
+    next one is fetched, so memory use does not grow with the row count.
+    CSV holds the dashboard's display text; Parquet keeps the typed values
+    (one row group per chunk) under the same column names.
+
+    Args:
+        backend (FrameBackend or SQLiteBackend): Dashboard query backend
+        filters (MerchantFilters): Filter state
+        output (file object): Binary file to write to
+        export_format (str): One of EXPORT_FORMATS
+        chunk_size (int): Merchants per chunk
+
+    Returns:
+        int: Number of merchants written
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {export_format} (expected one of {', '.join(EXPORT_FORMATS)})")
+
+    rows = 0
+    def counted(chunks):
+        nonlocal rows
+        for chunk in chunks:
+            rows += len(chunk)
+            yield chunk
+
+    chunks = counted(_leaderboard_chunks(backend, filters, chunk_size))
+    if export_format == 'csv':
+        _write_csv(chunks, output)
+    else:
+        _write_parquet(chunks, output)
+    return rows
+
+def export_command(filters, output, export_format='csv', store_dir=None, database_dir=None):
+    """
+    `python cli.py export` command line for the same filtered leaderboard.
+
+    Args:
+        filters (MerchantFilters): Filter state (empty selections match nothing, so they are never exported)
+        output (str): File the command writes to
+        export_format (str): One of EXPORT_FORMATS
+        store_dir (str): Shared store directory, if the data comes from one
+        database_dir (str): SQLite store directory, if the data comes from one
+
+    Returns:
+        str: Shell command
+    """
+    args = ['python', 'cli.py', 'export', '--output', output, '--format', export_format]
+    if database_dir:
+        args += ['--database', database_dir]
+    elif store_dir:
+        args += ['--store', store_dir]
+    for field, flag in EXPORT_FILTER_FLAGS.items():
+        values = getattr(filters, field)
+        if values:
+            args += [flag, *values]
+    return shlex.join(args)
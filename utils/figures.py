@@ -0,0 +1,302 @@
+import json
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import plotly.graph_objects as go
+import plotly.io as pio
+
+from utils.downsampling import lttb_indices, minmax_indices
+
+# Serialized figures kept per process (least recently used evicted first)
+FIGURE_CACHE_ENTRIES = 512
+
+# Most points a chart is sent: about one per horizontal pixel of a full-width chart
+CHART_MAX_POINTS = 1000
+
+# Series longer than this are drawn with WebGL traces; SVG bars and lines slow the browser down
+# well before CHART_MAX_POINTS
+WEBGL_POINT_THRESHOLD = 200
+
+# Transparent background, VT323 text and dark grid lines shared by every chart. Built and
+# validated once; each figure starts from it instead of re-applying the styling. (A Plotly
+# template would not do: Streamlit's chart theme overrides template values in the browser.)
+RETRO_LAYOUT = go.Layout(
+    paper_bgcolor='rgba(0,0,0,0)',
+    plot_bgcolor='rgba(0,0,0,0)',
+    font=dict(family="VT323", size=16, color="#F5F5F5"),
+    xaxis=dict(gridcolor='#333333', gridwidth=0.5),
+    yaxis=dict(gridcolor='#333333', gridwidth=0.5)
+)
+
+# Title style of the full-width charts
+RETRO_TITLE_FONT = {'family': "Press Start 2P", 'size': 18, 'color': "#01EDED"}
+
+class FigureCache:
+    """
+    LRU cache of serialized Plotly figures.
+
+    Keys are (chart type, subject, dataset version) tuples, where the subject
+    is a merchant id or a hashable filter state. A miss builds the figure and
+    stores its JSON; a hit rebuilds a fresh Figure from that JSON without
+    re-running Plotly's property validation (the JSON came from a validated
+    figure), which is several times cheaper than building it again. Each call
+    returns its own Figure, so callers may still modify it.
+
+    Args:
+        max_entries (int): Figures kept before the least recently used is evicted
+    """
+
+    def __init__(self, max_entries=FIGURE_CACHE_ENTRIES):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def figure(self, key, build):
+        """
+        The figure for key, built with build() on a miss.
+
+        Args:
+            key (tuple): (chart type, subject, dataset version)
+            build (callable): build() -> Figure
+
+        Returns:
+            Figure: Plotly figure
+        """
+        with self._lock:
+            spec = self._entries.get(key)
+            if spec is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._entries.move_to_end(key)
+
+        if spec is not None:
+            return go.Figure(json.loads(spec), _validate=False)
+
+        fig = build()
+        spec = pio.to_json(fig, validate=False)
+        with self._lock:
+            self._entries[key] = spec
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return fig
+
+    def stats(self):
+        """
+        Hit / miss counters and the cache's size.
+
+        Returns:
+            dict: hits, misses, entries, max_entries and bytes (serialized JSON held)
+        """
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'bytes': sum(len(spec) for spec in self._entries.values())
+            }
+
+    def clear(self):
+        """Drop every cached figure (the counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+
+def risk_factor_bar(factor_counts):
+    """
+    Horizontal bar chart of the most common risk factors.
+
+    Args:
+        factor_counts (DataFrame): 'Risk Factor' / 'Count' rows, most common first
+
+    Returns:
+        Figure: Plotly figure
+    """
+    top_factors = factor_counts.head(5)
+    fig = go.Figure(go.Bar(
+        x=top_factors['Count'],
+        y=top_factors['Risk Factor'],
+        orientation='h',
+        marker_color='#01EDED',
+        marker_line_width=2,
+        marker_line_color="#120458",
+        hovertemplate="Number of Merchants=%{x}<br>Risk Factor=%{y}<extra></extra>"
+    ), layout=RETRO_LAYOUT)
+
+    fig.update_layout(
+        margin=dict(l=0, r=10, t=10, b=0),
+        height=300
+    )
+
+    return fig
+
+def risk_gauge(risk_score):
+    """
+    Gauge showing a merchant's risk score against the risk level bands.
+
+    Args:
+        risk_score (float): Risk score between 0 and 1
+
+    Returns:
+        Figure: Plotly figure
+    """
+    fig = go.Figure(go.Indicator(
+        mode = "gauge+number",
+        value = risk_score,
+        domain = {'x': [0, 1], 'y': [0, 1]},
+        title = {'text': "RISK SCORE", 'font': {'family': "Press Start 2P", 'size': 16}},
+        gauge = {
+            'axis': {'range': [0, 1], 'tickwidth': 2, 'tickcolor': "#F5F5F5"},
+            'bar': {'color': "#01EDED"},
+            'bgcolor': "black",
+            'borderwidth': 2,
+            'bordercolor': "#01EDED",
+            'steps': [
+                {'range': [0, 0.4], 'color': '#50FC00'},
+                {'range': [0.4, 0.7], 'color': '#FF9933'},
+                {'range': [0.7, 1], 'color': '#FF0000'}
+            ],
+            'threshold': {
+                'line': {'color': "white", 'width': 4},
+                'thickness': 0.75,
+                'value': risk_score
+            }
+        },
+        number = {'font': {'family': "Press Start 2P", 'size': 24}}
+    ), layout=RETRO_LAYOUT)
+
+    fig.update_layout(
+        margin=dict(l=20, r=20, t=50, b=20),
+        height=300
+    )
+
+    return fig
+
+def monthly_volume_bar(months, monthly_data, max_points=CHART_MAX_POINTS):
+    """
+    Bar chart of a merchant's transaction volume history.
+
+    Histories longer than WEBGL_POINT_THRESHOLD are drawn as a filled WebGL
+    line instead of bars, thinned out to at most max_points with min/max
+    bucketing so every peak and dip is kept. The figure's size and the
+    browser's drawing work stay flat however long the history grows.
+
+    Args:
+        months (list): Period labels (months, or days for daily volumes)
+        monthly_data (list): Volume per period
+        max_points (int): Most points sent to the browser
+
+    Returns:
+        Figure: Plotly figure
+    """
+    fig = go.Figure(layout=RETRO_LAYOUT)
+
+    if len(monthly_data) <= WEBGL_POINT_THRESHOLD:
+        # Add volume bars
+        fig.add_trace(go.Bar(
+            x=months,
+            y=monthly_data,
+            marker_color='#01EDED',
+            marker_line_color='#120458',
+            marker_line_width=2,
+            opacity=0.8,
+            name="Monthly Volume"
+        ))
+    else:
+        keep = minmax_indices(monthly_data, max_points // 2) if len(monthly_data) > max_points \
+            else np.arange(len(monthly_data))
+        fig.add_trace(go.Scattergl(
+            x=np.asarray(months)[keep],
+            y=np.asarray(monthly_data, dtype=np.float64)[keep],
+            mode='lines',
+            line=dict(width=1, color='#01EDED'),
+            fill='tozeroy',
+            fillcolor='rgba(1, 237, 237, 0.6)',
+            name="Volume"
+        ))
+
+    # Customize layout
+    fig.update_layout(
+        title={'text': "MONTHLY TRANSACTION VOLUME", 'font': RETRO_TITLE_FONT, 'y': 0.95},
+        xaxis_title=None,
+        yaxis_title="Volume ($)",
+        margin=dict(l=40, r=40, t=80, b=40),
+        height=400
+    )
+
+    return fig
+
+def risk_history_area(months, high_risk_data, medium_risk_data, low_risk_data, max_points=CHART_MAX_POINTS):
+    """
+    Stacked area chart of the merchant risk distribution over time.
+
+    Long histories are thinned out to at most max_points with LTTB on the
+    High risk share, and all three series keep the same periods so they
+    still stack. (WebGL traces cannot stack, so this chart stays SVG.)
+
+    Args:
+        months (list): Month labels
+        high_risk_data (list): High risk share per month
+        medium_risk_data (list): Medium risk share per month
+        low_risk_data (list): Low risk share per month
+        max_points (int): Most points per series sent to the browser
+
+    Returns:
+        Figure: Plotly figure
+    """
+    if len(months) > max_points:
+        keep = lttb_indices(high_risk_data, max_points)
+        months, high_risk_data, medium_risk_data, low_risk_data = (
+            np.asarray(series)[keep] for series in (months, high_risk_data, medium_risk_data, low_risk_data)
+        )
+
+    fig = go.Figure(layout=RETRO_LAYOUT)
+
+    # Add traces
+    fig.add_trace(go.Scatter(
+        x=months, y=high_risk_data,
+        mode='lines',
+        line=dict(width=0, color='#FF0000'),
+        stackgroup='one',
+        fillcolor='#FF0000',
+        name='High Risk'
+    ))
+
+    fig.add_trace(go.Scatter(
+        x=months, y=medium_risk_data,
+        mode='lines',
+        line=dict(width=0, color='#FF9933'),
+        stackgroup='one',
+        fillcolor='#FF9933',
+        name='Medium Risk'
+    ))
+
+    fig.add_trace(go.Scatter(
+        x=months, y=low_risk_data,
+        mode='lines',
+        line=dict(width=0, color='#50FC00'),
+        stackgroup='one',
+        fillcolor='#50FC00',
+        name='Low Risk'
+    ))
+
+    # Customize layout
+    fig.update_layout(
+        title={'text': "MERCHANT RISK DISTRIBUTION OVER TIME", 'font': RETRO_TITLE_FONT, 'y': 0.95},
+        xaxis_title=None,
+        yaxis_title="Percentage of Merchants",
+        margin=dict(l=40, r=40, t=80, b=40),
+        legend=dict(
+            font=dict(family="VT323", size=16, color="#F5F5F5"),
+            bgcolor="rgba(0,0,0,0.5)",
+            bordercolor="#01EDED",
+            borderwidth=2
+        ),
+        height=400
+    )
+
+    return fig
@@ -0,0 +1,229 @@
+import html
+from string import Formatter
+from textwrap import dedent
+
+import numpy as np
+
+class HTMLTemplate:
+    """
+    An HTML snippet with str.format-style fields, parsed once.
+
+    The source is split into literal text and (field, format spec) pairs
+    when the template is created, so rendering is a single join with no
+    parsing. String values are HTML-escaped, except in fields whose name
+    ends in _html (already rendered fragments); numbers are formatted with
+    the field's spec, e.g. {volume:,} or {rate:.1f}.
+
+    Args:
+        source (str): Template text; leading indentation and blank lines are stripped
+    """
+
+    def __init__(self, source):
+        # Blank lines would end Markdown's HTML block, so they are dropped
+        lines = [line for line in dedent(source).strip().splitlines() if line.strip()]
+        self.parts = [
+            (literal, field, spec or '')
+            for literal, field, spec, _ in Formatter().parse("\n".join(lines))
+        ]
+
+    def render(self, **values):
+        """
+        Fill in the fields.
+
+        Args:
+            **values: Value per field name
+
+        Returns:
+            str: HTML
+        """
+        pieces = []
+        for literal, field, spec in self.parts:
+            pieces.append(literal)
+            if field is None:
+                continue
+            value = values[field]
+            if isinstance(value, str):
+                pieces.append(value if field.endswith('_html') else html.escape(value))
+            else:
+                pieces.append(format(value, spec))
+        return ''.join(pieces)
+
+PROFILE_CARD = HTMLTemplate("""
+    <div style="border: 3px solid var(--secondary); padding: 15px; margin-bottom: 20px; background-color: var(--dark);">
+        <div style="text-align: center; margin-bottom: 15px;">
+            <img src="{icon_url}" style="width: 64px; height: 64px;">
+        </div>
+        <div style="font-family: 'VT323', monospace; font-size: 1.5rem; text-align: center; color: var(--secondary); margin-bottom: 10px;">
+            {merchant_name}
+        </div>
+        <div style="font-family: 'VT323', monospace; font-size: 1.2rem; margin-bottom: 5px;">
+            <span style="color: var(--light);">Industry:</span> {industry}
+        </div>
+        <div style="font-family: 'VT323', monospace; font-size: 1.2rem; margin-bottom: 5px;">
+            <span style="color: var(--light);">Segment:</span> {segment}
+        </div>
+        <div style="font-family: 'VT323', monospace; font-size: 1.2rem; margin-bottom: 5px;">
+            <span style="color: var(--light);">Account Manager:</span> {account_manager}
+        </div>
+        <div style="font-family: 'VT323', monospace; font-size: 1.2rem; margin-bottom: 5px;">
+            <span style="color: var(--light);">Onboarded:</span> {onboarding_date}
+        </div>
+        <div style="font-family: 'VT323', monospace; font-size: 1.2rem; margin-bottom: 5px;">
+            <span style="color: var(--light);">Tenure:</span> {tenure} months
+        </div>
+        <div style="font-family: 'VT323', monospace; font-size: 1.2rem; margin-bottom: 5px;">
+            <span style="color: var(--light);">Support Tickets:</span> {support_tickets}
+        </div>
+    </div>
+""")
+
+# Labelled progress bar: feature usage, risk factor severity and transaction rates
+PROGRESS_BAR = HTMLTemplate("""
+    <div style="margin-bottom: 15px;">
+        <div style="font-family: 'VT323', monospace; font-size: 1.2rem; margin-bottom: 5px; display: flex; justify-content: space-between;">
+            <span>{label}</span>
+            <span>{value_label}</span>
+        </div>
+        <div style="height: 20px; width: 100%; background-color: #333; border: 2px solid var(--secondary);">
+            <div style="height: 100%; width: {width:.1f}%; background-color: {color};"></div>
+        </div>
+    </div>
+""")
+
+VOLUME_SUMMARY = HTMLTemplate("""
+    <div style="display: flex; justify-content: space-between; margin-bottom: 10px;">
+        <div style="font-family: 'VT323', monospace; font-size: 1.2rem;">
+            <span style="color: var(--light);">Average Monthly:</span>
+            <span style="color: var(--tertiary); font-weight: bold;">${monthly_volume_avg:,}</span>
+        </div>
+        <div style="font-family: 'VT323', monospace; font-size: 1.2rem;">
+            <span style="color: var(--light);">Latest Month:</span>
+            <span style="color: var(--tertiary); font-weight: bold;">${latest_volume:,}</span>
+        </div>
+        <div style="font-family: 'VT323', monospace; font-size: 1.2rem;">
+            <span style="color: var(--light);">6-Month Trend:</span>
+            <span style="color: {trend_color}; font-weight: bold;">
+                {trend_label}
+            </span>
+        </div>
+    </div>
+""")
+
+NO_RISK_FACTORS = dedent("""
+    <div style="font-family: 'VT323', monospace; font-size: 1.5rem; text-align: center; color: var(--tertiary); padding: 50px 0;">
+        NO ACTIVE RISK FACTORS DETECTED
+    </div>
+""").strip()
+
+PANEL = HTMLTemplate("""
+    <div style="border: 3px solid var(--secondary); padding: 15px; margin-bottom: 20px; background-color: var(--dark);">
+    {content_html}
+    </div>
+""")
+
+METRIC_CARD = HTMLTemplate("""
+    <div class="metric-card">
+        <div class="metric-label">{label}</div>
+        <div class="metric-value {value_class}">{value}</div>
+    </div>
+""")
+
+# (merchant column, label) of the feature usage bars
+FEATURE_USAGE = [
+    ('one_click_usage', "One-Click Payment"),
+    ('subscription_api_usage', "Subscription API"),
+    ('fraud_tools_usage', "Fraud Tools"),
+    ('mobile_sdk_usage', "Mobile SDK")
+]
+
+# (merchant column, label, bar color) of the transaction rate bars
+TRANSACTION_RATES = [
+    ('success_rate', "Transaction Success Rate", 'var(--tertiary)'),
+    ('authorization_rate', "Authorization Rate", 'var(--tertiary)'),
+    ('fraud_rate', "Fraud Detection Rate", 'var(--danger)')
+]
+
+# Severity range of a risk factor per risk category
+SEVERITY_BANDS = {'High': (70, 100), 'Medium': (40, 70), 'Low': (40, 70)}
+
+def metric_card(label, value, value_class=''):
+    """
+    KPI card in the dashboard's metric-card style.
+
+    Args:
+        label (str): Caption above the value
+        value (str): Formatted value
+        value_class (str): Extra CSS class of the value, e.g. 'high-risk'
+
+    Returns:
+        str: HTML
+    """
+    return METRIC_CARD.render(label=label, value=value, value_class=value_class)
+
+def factor_severity(risk_score, risk_category):
+    """
+    Severity shown for a merchant's risk factors: its risk score as a percentage, within its category's band.
+
+    Args:
+        risk_score (float): Risk score between 0 and 1
+        risk_category (str): 'High', 'Medium' or 'Low'
+
+    Returns:
+        int: Severity percentage
+    """
+    low, high = SEVERITY_BANDS.get(risk_category, SEVERITY_BANDS['Low'])
+    return int(np.clip(round(float(risk_score) * 100), low, high))
+
+def merchant_fragments(merchant_data, icon_url):
+    """
+    HTML of the deep dive's profile card, feature usage bars, volume summary,
+    risk factor list and transaction rate panel.
+
+    Everything is derived from the merchant's row alone, so the result can
+    be cached per (merchant id, dataset version).
+
+    Args:
+        merchant_data (Series): The merchant's row
+        icon_url (str): URL of the merchant icon for its risk level
+
+    Returns:
+        dict: HTML per fragment: 'profile_card', 'feature_usage', 'volume_summary',
+              'risk_factors' and 'transaction_rates'
+    """
+    volume_trend = merchant_data['volume_trend']
+    severity = factor_severity(merchant_data['risk_score'], merchant_data['risk_category'])
+    # Rates over the trailing window of payment attempts; without attempts the bars stay empty
+    rates = {column: float(np.nan_to_num(merchant_data[column])) * 100 for column, _, _ in TRANSACTION_RATES}
+
+    return {
+        'profile_card': PROFILE_CARD.render(
+            icon_url=icon_url,
+            merchant_name=str(merchant_data['merchant_name']),
+            industry=str(merchant_data['industry']),
+            segment=str(merchant_data['segment']),
+            account_manager=str(merchant_data['account_manager']),
+            onboarding_date=f"{merchant_data['onboarding_date']:%Y-%m-%d}",
+            tenure=merchant_data['tenure'],
+            support_tickets=merchant_data['support_tickets']
+        ),
+        'feature_usage': '\n'.join(
+            PROGRESS_BAR.render(label=label, value_label=f"{merchant_data[column]}%",
+                                width=float(merchant_data[column]), color='var(--tertiary)')
+            for column, label in FEATURE_USAGE
+        ),
+        'volume_summary': VOLUME_SUMMARY.render(
+            monthly_volume_avg=merchant_data['monthly_volume_avg'],
+            latest_volume=merchant_data['latest_volume'],
+            trend_color='var(--tertiary)' if volume_trend >= 0 else 'var(--danger)',
+            trend_label=f"{volume_trend * 100:+.1f}%"
+        ),
+        'risk_factors': '\n'.join(
+            PROGRESS_BAR.render(label=str(factor), value_label=f"Severity: {severity}%", width=severity,
+                                color='var(--danger)' if severity >= 70 else 'var(--warning)')
+            for factor in merchant_data['risk_factors']
+        ) or NO_RISK_FACTORS,
+        'transaction_rates': PANEL.render(content_html='\n'.join(
+            PROGRESS_BAR.render(label=label, value_label=f"{rates[column]:.1f}%", width=rates[column], color=color)
+            for column, label, color in TRANSACTION_RATES
+        ))
+    }
@@ -0,0 +1,139 @@
+import pandas as pd
+
+LEADERBOARD_COLUMNS = {
+    'merchant_name': 'Merchant Name',
+    'risk_category': 'Risk Level',
+    'risk_score': 'Risk Score',
+    'account_manager': 'Account Manager',
+    'industry': 'Industry',
+    'segment': 'Segment',
+    'tenure': 'Tenure (Months)',
+    'monthly_volume_avg': 'Avg Monthly Volume ($)',
+    'success_rate': 'Success Rate',
+    'fraud_rate': 'Fraud Rate'
+}
+
+def filter_merchants(merchants_df, industries, segments, managers, risk_categories):
+    """
+    Apply the sidebar filters to the merchant table.
+
+    Args:
+        merchants_df (DataFrame): Merchant data
+        industries (list): Industries to keep, or None to skip the industry filter
+        segments (list): Size segments to keep, or None to skip the segment filter
+        managers (list): Account managers to keep, or None to skip the manager filter
+        risk_categories (list): Risk categories to keep, or None to skip the risk filter
+
+    Returns:
+        DataFrame: Filtered merchant rows
+    """
+    filter_mask = pd.Series(True, index=merchants_df.index)
+    for column, values in [('industry', industries), ('segment', segments),
+                           ('account_manager', managers), ('risk_category', risk_categories)]:
+        if values is not None:
+            filter_mask &= merchants_df[column].isin(values)
+
+    return merchants_df[filter_mask]
+
+def compute_kpis(filtered_df):
+    """
+    Compute the CURRENT STATUS metric cards.
+
+    Args:
+        filtered_df (DataFrame): Filtered merchant data
+
+    Returns:
+        dict: high_risk_count, medium_risk_count, at_risk_volume and avg_risk_score
+    """
+    return {
+        'high_risk_count': len(filtered_df[filtered_df['risk_category'] == 'High']),
+        'medium_risk_count': len(filtered_df[filtered_df['risk_category'] == 'Medium']),
+        'at_risk_volume': filtered_df[filtered_df['risk_category'].isin(['High', 'Medium'])]['monthly_volume_avg'].sum(),
+        'avg_risk_score': filtered_df['risk_score'].mean()
+    }
+
+def count_risk_factors(filtered_df):
+    """
+    Count how many merchants carry each risk factor.
+
+    Args:
+        filtered_df (DataFrame): Filtered merchant data
+
+    Returns:
+        DataFrame: 'Risk Factor' and 'Count' columns, most common first
+                   (empty when no merchant has a risk factor)
+    """
+    all_factors = []
+    for factors in filtered_df['risk_factors']:
+        all_factors.extend(factors)
+
+    if not all_factors:
+        return pd.DataFrame(columns=['Risk Factor', 'Count'])
+
+    factor_counts = pd.Series(all_factors).value_counts().reset_index()
+    factor_counts.columns = ['Risk Factor', 'Count']
+    return factor_counts
+
+def sort_leaderboard(filtered_df):
+    """
+    Sort merchants by risk score, highest first.
+
+    The sort is stable, so merchants with equal scores keep their table order.
+
+    Args:
+        filtered_df (DataFrame): Filtered merchant data
+
+    Returns:
+        DataFrame: Sorted merchants with a fresh index
+    """
+    return filtered_df.sort_values('risk_score', ascending=False, kind='stable').reset_index(drop=True)
+
+def color_risk(val):
+    """
+    Styler callback coloring the risk level column.
+
+    Args:
+        val (str): Risk category
+
+    Returns:
+        str: CSS declarations for the cell
+    """
+    if val == 'High':
+        return 'color: #FF0000; font-weight: bold'
+    elif val == 'Medium':
+        return 'color: #FF9933; font-weight: bold'
+    else:
+        return 'color: #50FC00; font-weight: bold'
+
+def format_leaderboard(sorted_merchants):
+    """
+    Project, rename and format the leaderboard columns for display.
+
+    Args:
+        sorted_merchants (DataFrame): Merchants sorted by risk score
+
+    Returns:
+        DataFrame: Display-ready leaderboard
+    """
+    display_df = sorted_merchants[list(LEADERBOARD_COLUMNS)].copy()
+    display_df.columns = list(LEADERBOARD_COLUMNS.values())
+
+    # Format the risk score, volume and rate columns
+    display_df['Risk Score'] = display_df['Risk Score'].map(lambda x: f"{x:.2f}")
+    display_df['Avg Monthly Volume ($)'] = display_df['Avg Monthly Volume ($)'].map(lambda x: f"${x:,}")
+    for column in ['Success Rate', 'Fraud Rate']:
+        display_df[column] = display_df[column].map(lambda x: "n/a" if pd.isna(x) else f"{x:.1%}")
+
+    return display_df
+
+def style_leaderboard(display_df):
+    """
+    Apply the risk level colors to a formatted leaderboard.
+
+    Args:
+        display_df (DataFrame): Output of format_leaderboard
+
+    Returns:
+        Styler: Styled leaderboard
+    """
+    return display_df.style.map(color_risk, subset=['Risk Level'])
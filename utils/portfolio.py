@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+
+def build_manager_partitions(merchants_df, manager_col='account_manager'):
+    """
+    Partition merchant rows by account manager.
+
+    One stable argsort groups the row positions by manager, so each manager's
+    book is a contiguous slice that can be taken with ``iloc`` without scanning
+    the full table.
+
+    Args:
+        merchants_df (DataFrame): Merchant data
+        manager_col (str): Column holding the account manager
+
+    Returns:
+        dict: Maps each manager to an int array of row positions in merchants_df
+    """
+    codes, managers = pd.factorize(merchants_df[manager_col], sort=True)
+    order = np.argsort(codes, kind='stable')
+    bounds = np.searchsorted(codes[order], np.arange(len(managers) + 1))
+
+    return {
+        manager: order[bounds[i]:bounds[i + 1]]
+        for i, manager in enumerate(managers)
+    }
+
+def manager_workload(merchants_df, manager_col='account_manager'):
+    """
+    Pre-aggregate workload statistics for every account manager.
+
+    Open actions count the active risk factors on High and Medium risk
+    merchants, i.e. the follow-ups the recommended actions call for.
+
+    Args:
+        merchants_df (DataFrame): Merchant data
+        manager_col (str): Column holding the account manager
+
+    Returns:
+        DataFrame: Per-manager merchant_count, at_risk_volume, high_risk,
+                   medium_risk, low_risk and open_actions
+    """
+    codes, managers = pd.factorize(merchants_df[manager_col], sort=True)
+    num_managers = len(managers)
+
+    category = merchants_df['risk_category'].to_numpy()
+    at_risk = (category == 'High') | (category == 'Medium')
+    volumes = merchants_df['monthly_volume_avg'].to_numpy(dtype=np.float64)
+    factor_counts = merchants_df['risk_factors'].str.len().fillna(0).to_numpy(dtype=np.float64)
+
+    def per_manager(weights=None):
+        return np.bincount(codes, weights=weights, minlength=num_managers)
+
+    workload = pd.DataFrame({
+        'merchant_count': per_manager().astype(np.int64),
+        'at_risk_volume': per_manager(np.where(at_risk, volumes, 0.0)).astype(np.int64),
+        'high_risk': per_manager((category == 'High').astype(np.float64)).astype(np.int64),
+        'medium_risk': per_manager((category == 'Medium').astype(np.float64)).astype(np.int64),
+        'low_risk': per_manager((category == 'Low').astype(np.float64)).astype(np.int64),
+        'open_actions': per_manager(np.where(at_risk, factor_counts, 0.0)).astype(np.int64)
+    }, index=pd.Index(managers, name=manager_col))
+
+    return workload
@@ -0,0 +1,117 @@
+import datetime
+import functools
+import json
+import threading
+import time
+
+# Per-thread payload counter; Streamlit runs each session's script in its own thread
+_payload_state = threading.local()
+_tracking_installed = False
+_tracking_lock = threading.Lock()
+
+def install_payload_tracking():
+    """
+    Count the serialized size of every element Streamlit sends to the browser.
+
+    Wraps DeltaGenerator._enqueue once per process. The wrapper only measures
+    while a RunProfiler with payload tracking is active on the current thread,
+    so other sessions pay nothing. If Streamlit's internals change, payload
+    sizes are simply reported as unknown.
+
+    Returns:
+        bool: Whether payload tracking is available
+    """
+    global _tracking_installed
+
+    with _tracking_lock:
+        if _tracking_installed:
+            return True
+
+        try:
+            from streamlit.delta_generator import DeltaGenerator
+            original_enqueue = DeltaGenerator._enqueue
+        except (ImportError, AttributeError):
+            return False
+
+        @functools.wraps(original_enqueue)
+        def _enqueue(self, delta_type, element_proto, *args, **kwargs):
+            if getattr(_payload_state, 'active', False):
+                try:
+                    _payload_state.bytes += element_proto.ByteSize()
+                except AttributeError:
+                    pass
+            return original_enqueue(self, delta_type, element_proto, *args, **kwargs)
+
+        DeltaGenerator._enqueue = _enqueue
+        _tracking_installed = True
+        return True
+
+class RunProfiler:
+    """
+    Wall-time (and optionally payload size) per dashboard section for one script run.
+
+    Sections are delimited with ``begin(name)``: each call closes the previous
+    section, so the linear flow of ``main()`` is instrumented without nesting
+    its code inside context managers.
+    """
+
+    def __init__(self, track_payload=False):
+        self.track_payload = track_payload and install_payload_tracking()
+        self.sections = []
+        self.started_at = datetime.datetime.now()
+        self._run_start = time.perf_counter()
+        self._current = None
+        self._section_start = None
+
+    def begin(self, name):
+        """
+        Close the current section (if any) and start timing a new one.
+
+        Args:
+            name (str): Section name
+        """
+        self._close_section()
+        self._current = name
+        self._section_start = time.perf_counter()
+        if self.track_payload:
+            _payload_state.active = True
+            _payload_state.bytes = 0
+
+    def finish(self):
+        """
+        Close the last section and summarize the run.
+
+        Returns:
+            dict: Run timestamp, total seconds and per-section timings
+        """
+        self._close_section()
+        if self.track_payload:
+            _payload_state.active = False
+
+        return {
+            'timestamp': self.started_at.isoformat(timespec='milliseconds'),
+            'total_seconds': time.perf_counter() - self._run_start,
+            'sections': self.sections
+        }
+
+    def _close_section(self):
+        if self._current is None:
+            return
+
+        self.sections.append({
+            'section': self._current,
+            'seconds': time.perf_counter() - self._section_start,
+            'payload_bytes': _payload_state.bytes if self.track_payload else None
+        })
+        self._current = None
+
+def append_timing_log(path, summary):
+    """
+    Append one run summary as a JSON line for offline analysis.
+
+    Args:
+        path (str): Log file path
+        summary (dict): Output of RunProfiler.finish
+    """
+    with open(path, 'a') as log_file:
+        log_file.write(json.dumps(summary) + "\n")
@@ -0,0 +1,209 @@
+import datetime
+import html
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from utils.metrics import format_leaderboard
+from utils.visualizations import create_pixel_chart
+
+# Merchants listed per report
+REPORT_TOP_N = 20
+
+# Risk factors listed per report
+REPORT_TOP_FACTORS = 5
+
+# Sparkline color per risk category, as on the dashboard
+SPARKLINE_COLORS = {'High': 'red', 'Medium': 'orange', 'Low': 'green'}
+
+# Self-contained styling in the dashboard's retro palette (no fonts or files to fetch)
+REPORT_CSS = """
+body { background: #120458; color: #F5F5F5; font-family: 'Courier New', monospace; margin: 2rem; }
+h1 { color: #FF355E; border-bottom: 4px solid #FF355E; padding-bottom: 0.5rem; }
+h2 { color: #01EDED; margin-top: 2rem; }
+.meta { color: #01EDED; }
+.kpis { display: flex; gap: 1rem; }
+.kpi { border: 3px solid #01EDED; padding: 0.75rem 1rem; min-width: 10rem; text-align: center; }
+.kpi .value { font-size: 1.6rem; font-weight: bold; }
+.kpi .label { color: #F5F5F5; }
+table { border-collapse: collapse; border: 3px solid #01EDED; }
+th, td { padding: 0.3rem 0.6rem; border-bottom: 1px solid #333; text-align: left; }
+th { color: #120458; background: #01EDED; }
+.High { color: #FF0000; font-weight: bold; }
+.Medium { color: #FF9933; font-weight: bold; }
+.Low { color: #50FC00; font-weight: bold; }
+"""
+
+# Each worker process opens the dataset once and keeps it here
+_worker_backend = None
+
+def open_backend(source):
+    """
+    Open the dashboard's query backend for a dataset source.
+
+    Args:
+        source (tuple): ('frames', merchants_df, volumes), ('shared', store_dir, version)
+                        or ('sqlite', database_path)
+
+    Returns:
+        FrameBackend or SQLiteBackend: Backend over the dataset
+    """
+    kind = source[0]
+    if kind == 'frames':
+        from data.backends import FrameBackend
+        return FrameBackend(source[1], source[2])
+    if kind == 'shared':
+        from data.backends import FrameBackend
+        from data.shared_store import attach_dataset
+        merchants_df, volumes, _ = attach_dataset(source[1], source[2])
+        return FrameBackend(merchants_df, volumes)
+    if kind == 'sqlite':
+        from data.sqlite_backend import SQLiteBackend
+        return SQLiteBackend(source[1])
+    raise ValueError(f"Unknown dataset source: {kind}")
+
+def report_filename(manager):
+    """File name of a manager's report, e.g. 'alex-thompson.html'."""
+    return re.sub(r'[^a-z0-9]+', '-', manager.lower()).strip('-') + '.html'
+
+def _kpi_cards(kpis, merchant_count):
+    avg_risk_score = kpis['avg_risk_score']
+    cards = [
+        ('Merchants', f"{merchant_count:,}", ''),
+        ('High Risk', f"{kpis['high_risk_count']:,}", 'High'),
+        ('Medium Risk', f"{kpis['medium_risk_count']:,}", 'Medium'),
+        ('At-Risk Volume', f"${kpis['at_risk_volume']:,.0f}", ''),
+        ('Avg Risk Score', "n/a" if np.isnan(avg_risk_score) else f"{avg_risk_score:.2f}", '')
+    ]
+    return ''.join(
+        f'<div class="kpi"><div class="value {css_class}">{value}</div><div class="label">{label}</div></div>'
+        for label, value, css_class in cards
+    )
+
+def _leaderboard_table(top_merchants, sparklines):
+    display_df = format_leaderboard(top_merchants)
+    header = ''.join(f'<th>{html.escape(column)}</th>' for column in display_df.columns) + '<th>Volume History</th>'
+    rows = []
+    for values, sparkline in zip(display_df.itertuples(index=False), sparklines):
+        cells = ''.join(
+            f'<td class="{html.escape(str(value))}">{html.escape(str(value))}</td>'
+            if column == 'Risk Level' else f'<td>{html.escape(str(value))}</td>'
+            for column, value in zip(display_df.columns, values)
+        )
+        rows.append(f'<tr>{cells}<td><img src="{sparkline}" width="120" height="30" alt=""></td></tr>')
+    return f'<table><thead><tr>{header}</tr></thead><tbody>{"".join(rows)}</tbody></table>'
+
+def render_manager_report(backend, manager, dataset_version, top_n=REPORT_TOP_N):
+    """
+    Static HTML digest of one account manager's book.
+
+    Lists the book's KPIs, its most common risk factors and its top_n
+    highest-risk High / Medium merchants with a pixel sparkline of their
+    volume history, using the same backend queries as the dashboard.
+
+    Args:
+        backend (FrameBackend or SQLiteBackend): Dashboard query backend
+        manager (str): Account manager
+        dataset_version (str): Version shown in the report header
+        top_n (int): Merchants listed
+
+    Returns:
+        str: Complete HTML document
+    """
+    from data.backends import ALL_MERCHANTS
+
+    book = ALL_MERCHANTS._replace(managers=(manager,))
+    at_risk = book._replace(risk_categories=('High', 'Medium'))
+
+    kpis = backend.kpis(book)
+    factor_counts = backend.risk_factor_counts(book).head(REPORT_TOP_FACTORS)
+    top_merchants = backend.leaderboard_page(at_risk, 0, top_n)
+
+    history = backend.merchant_volumes(top_merchants['merchant_id'].tolist())
+    sparklines = [
+        create_pixel_chart(np.nan_to_num(row).tolist(), color=SPARKLINE_COLORS.get(category, 'cyan'), height=30, width=120)
+        for row, category in zip(history.values, top_merchants['risk_category'].astype(str))
+    ]
+
+    factor_items = ''.join(
+        f'<li>{html.escape(str(factor))}: {int(count):,} merchants</li>'
+        for factor, count in factor_counts.itertuples(index=False)
+    ) or '<li>No risk factors flagged</li>'
+    leaderboard = _leaderboard_table(top_merchants, sparklines) if len(top_merchants) else '<p>No High or Medium risk merchants.</p>'
+
+    return f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>Churn Risk Digest - {html.escape(manager)}</title>
+<style>{REPORT_CSS}</style>
+</head>
+<body>
+<h1>CHURN RISK DIGEST: {html.escape(manager.upper())}</h1>
+<p class="meta">Data version {html.escape(dataset_version)} - generated {datetime.datetime.now():%Y-%m-%d %H:%M}</p>
+<h2>CURRENT STATUS</h2>
+<div class="kpis">{_kpi_cards(kpis, backend.count(book))}</div>
+<h2>TOP RISK FACTORS</h2>
+<ul>{factor_items}</ul>
+<h2>TOP {top_n} AT-RISK MERCHANTS</h2>
+{leaderboard}
+</body>
+</html>
+"""
+
+def _init_worker(source):
+    global _worker_backend
+    _worker_backend = open_backend(source)
+
+def write_manager_report(manager, output_dir, dataset_version, top_n=REPORT_TOP_N):
+    """
+    Render one manager's report in a worker and write it to output_dir.
+
+    Args:
+        manager (str): Account manager
+        output_dir (str): Directory for the HTML files
+        dataset_version (str): Version shown in the report header
+        top_n (int): Merchants listed
+
+    Returns:
+        dict: manager, path, bytes and render seconds
+    """
+    start = time.perf_counter()
+    document = render_manager_report(_worker_backend, manager, dataset_version, top_n)
+    seconds = time.perf_counter() - start
+
+    path = os.path.join(output_dir, report_filename(manager))
+    with open(path, 'w', encoding='utf-8') as report_file:
+        report_file.write(document)
+
+    return {'manager': manager, 'path': path, 'bytes': len(document.encode('utf-8')), 'seconds': seconds}
+
+def generate_reports(source, managers, output_dir, dataset_version, workers=None, top_n=REPORT_TOP_N):
+    """
+    Write one report per manager, fanned out over a process pool.
+
+    Every worker opens the dataset once (memory-mapped for a shared store,
+    read-only connections for SQLite) and then renders managers as they are
+    handed out.
+
+    Args:
+        source (tuple): Dataset source (see open_backend)
+        managers (list): Account managers to report on
+        output_dir (str): Directory for the HTML files (created if missing)
+        dataset_version (str): Version shown in the report headers
+        workers (int): Worker processes (default: one per CPU)
+        top_n (int): Merchants listed per report
+
+    Returns:
+        list: One dict per report with manager, path, bytes and render seconds
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(source,)) as pool:
+        futures = [
+            pool.submit(write_manager_report, manager, output_dir, dataset_version, top_n)
+            for manager in managers
+        ]
+        return [future.result() for future in futures]
@@ -0,0 +1,168 @@
+import numpy as np
+import pandas as pd
+
+from data.volumes import encode_months, month_label
+
+def kaplan_meier(durations, events, groups=None, max_duration=None):
+    """
+    Compute Kaplan-Meier survival curves for one or more groups in a single vectorized pass.
+
+    Durations are integer months (e.g. merchant tenure). Events may be 0/1 churn
+    flags or fractional churn probabilities, in which case the curve is the
+    expected retention. Instead of looping over groups, each (group, month) cell
+    gets its exit and event counts from one bincount, and the number at risk is
+    the reverse cumulative sum of exits along the month axis.
+
+    Args:
+        durations (array-like): Observed duration per merchant, in whole months
+        events (array-like): Event indicator or probability per merchant
+        groups (array-like): Optional group label per merchant
+        max_duration (int): Last month to report (defaults to the longest duration)
+
+    Returns:
+        DataFrame: Survival probability indexed by month, one column per group
+    """
+    durations = np.asarray(durations, dtype=np.int64)
+    events = np.asarray(events, dtype=np.float64)
+
+    if groups is None:
+        codes = np.zeros(len(durations), dtype=np.int64)
+        labels = pd.Index(['All Merchants'])
+    else:
+        codes, labels = pd.factorize(pd.Series(groups), sort=True)
+        labels = pd.Index(labels)
+
+    if max_duration is None:
+        max_duration = int(durations.max()) if len(durations) else 0
+    num_months = max_duration + 1
+    num_groups = len(labels)
+
+    # Durations past the reporting window are censored at its end: the merchant was
+    # still retained there, whatever happened to it later
+    events = np.where(durations > max_duration, 0.0, events)
+    durations = np.clip(durations, 0, max_duration)
+    flat = codes * num_months + durations
+
+    exits = np.bincount(flat, minlength=num_groups * num_months).reshape(num_groups, num_months)
+    deaths = np.bincount(flat, weights=events, minlength=num_groups * num_months).reshape(num_groups, num_months)
+
+    # Merchants still observed at month t = everyone exiting at t or later
+    at_risk = exits[:, ::-1].cumsum(axis=1)[:, ::-1]
+
+    hazard = np.divide(deaths, at_risk, out=np.zeros_like(deaths), where=at_risk > 0)
+    survival = np.cumprod(1.0 - hazard, axis=1)
+
+    return pd.DataFrame(survival.T, index=pd.RangeIndex(num_months, name='month'), columns=labels)
+
+def cohort_retention_matrix(merchants_df, volumes, metric='active'):
+    """
+    Build an onboarding-cohort retention matrix from monthly volumes.
+
+    Rows are onboarding months, columns are months since onboarding. Every
+    cell of the merchants x months volume matrix gets its cohort and offset by
+    broadcasting the onboarding months against the month axis, so the whole
+    matrix comes from a single bincount over (cohort, offset) cells instead of
+    string-keyed groupbys. Cells whose calendar month falls outside the volume
+    history are left empty (NaN).
+
+    Args:
+        merchants_df (DataFrame): Merchant data with merchant_id and onboarding_date
+        volumes (VolumeMatrix): Monthly volume history
+        metric (str): 'active' for the share of the cohort still transacting,
+                      'volume' for volume retained relative to the cohort's first
+                      observed month
+
+    Returns:
+        DataFrame: Cohort x months-since-onboarding matrix
+    """
+    onboard_months = encode_months(merchants_df['onboarding_date'])
+    rows = volumes.row_positions(merchants_df['merchant_id'])
+    known = rows >= 0
+
+    # One entry per non-empty (merchant, month) cell
+    cell_values = volumes.values[rows[known]]
+    present = ~np.isnan(cell_values)
+    merchant_of_cell = np.broadcast_to(np.flatnonzero(known)[:, None], cell_values.shape)[present]
+    volume_months = np.broadcast_to(volumes.months[None, :], cell_values.shape)[present]
+    volumes = cell_values[present].astype(np.float64)
+
+    if len(onboard_months) == 0 or len(volume_months) == 0:
+        return pd.DataFrame()
+
+    cell_cohorts = onboard_months[merchant_of_cell]
+    offsets = volume_months - cell_cohorts
+
+    # Volume recorded before the onboarding month carries no retention signal
+    after_onboarding = offsets >= 0
+    volumes = volumes[after_onboarding]
+    cohorts, cohort_sizes = np.unique(onboard_months, return_counts=True)
+    return cohort_matrix_from_cells(
+        cohorts, cohort_sizes, cell_cohorts[after_onboarding], offsets[after_onboarding],
+        (volumes > 0).astype(np.float64), volumes, (volume_months.min(), volume_months.max()), metric=metric
+    )
+
+def cohort_matrix_from_cells(cohorts, cohort_sizes, cell_cohorts, cell_offsets, cell_active, cell_volumes,
+                             volume_window, metric='active'):
+    """
+    Finish a cohort retention matrix from (cohort, offset) aggregates.
+
+    The cells may be single (merchant, month) volumes or sums already grouped
+    by cohort and offset (e.g. by a database); either way they are summed per
+    cell with one bincount.
+
+    Args:
+        cohorts (array-like): Onboarding month index of each cohort
+        cohort_sizes (array-like): Merchants per cohort
+        cell_cohorts (array-like): Onboarding month index per cell
+        cell_offsets (array-like): Months since onboarding per cell (non-negative)
+        cell_active (array-like): Number of active (volume > 0) merchant months per cell
+        cell_volumes (array-like): Volume per cell
+        volume_window (tuple): First and last month index of the volume history
+        metric (str): 'active' or 'volume', see cohort_retention_matrix
+
+    Returns:
+        DataFrame: Cohort x months-since-onboarding matrix
+
+    Raises:
+        ValueError: If the metric is unknown
+    """
+    cohorts = np.asarray(cohorts, dtype=np.int64)
+    cell_offsets = np.asarray(cell_offsets, dtype=np.int64)
+
+    first_cohort = int(cohorts.min())
+    num_cohorts = int(cohorts.max()) - first_cohort + 1
+    num_offsets = int(cell_offsets.max()) + 1 if len(cell_offsets) else 1
+    flat = (np.asarray(cell_cohorts, dtype=np.int64) - first_cohort) * num_offsets + cell_offsets
+    cells = num_cohorts * num_offsets
+
+    if metric == 'active':
+        counts = np.bincount(flat, weights=np.asarray(cell_active, dtype=np.float64), minlength=cells)
+        sizes = np.bincount(cohorts - first_cohort, weights=np.asarray(cohort_sizes, dtype=np.float64),
+                            minlength=num_cohorts)
+        matrix = counts.reshape(num_cohorts, num_offsets) / np.where(sizes > 0, sizes, np.nan)[:, None]
+    elif metric == 'volume':
+        totals = np.bincount(flat, weights=np.asarray(cell_volumes, dtype=np.float64), minlength=cells)
+        matrix = totals.reshape(num_cohorts, num_offsets)
+    else:
+        raise ValueError(f"Unknown cohort metric: {metric}")
+
+    # Mask cells whose calendar month is outside the observed volume window
+    first_month, last_month = volume_window
+    calendar_months = first_cohort + np.arange(num_cohorts)[:, None] + np.arange(num_offsets)[None, :]
+    observed = (calendar_months >= first_month) & (calendar_months <= last_month)
+    matrix = np.where(observed, matrix, np.nan)
+
+    if metric == 'volume':
+        # Normalize each cohort by its first observed month with volume
+        has_volume = observed & (matrix > 0)
+        first_observed = np.argmax(has_volume, axis=1)
+        baseline = matrix[np.arange(num_cohorts), first_observed]
+        baseline = np.where(has_volume.any(axis=1), baseline, np.nan)
+        matrix = matrix / baseline[:, None]
+
+    index = pd.Index([month_label(first_cohort + i) for i in range(num_cohorts)], name='cohort')
+    columns = pd.RangeIndex(num_offsets, name='months_since_onboarding')
+    matrix_df = pd.DataFrame(matrix, index=index, columns=columns)
+
+    # Drop cohorts without any merchants
+    return matrix_df[matrix_df.notna().any(axis=1)]
@@ -0,0 +1,153 @@
+import numpy as np
+import pandas as pd
+
+# Upper bound on the number of (merchant, scenario) cells sampled at once.
+# 4M cells keeps a block under 30 MB (uint16 draws, bool mask, float32 outcomes).
+DEFAULT_CHUNK_CELLS = 4_000_000
+
+# Merchants x scenarios cells one interactive run may sample (~0.8 s on one core).
+# Large books get fewer scenarios rather than a longer wait.
+INTERACTIVE_CELL_BUDGET = 250_000_000
+
+# Fewest scenarios a run is cut down to; P90 is still estimated from 25+ tail draws
+MIN_SCENARIOS = 250
+
+def churn_probabilities(merchants_df, category_multipliers=None, segment_multipliers=None, factor_multipliers=None):
+    """
+    Turn merchant risk scores into per-merchant churn probabilities for a what-if scenario.
+
+    Each multiplier dict scales the risk score of the merchants it matches, e.g.
+    ``{'High': 0.8}`` models retention efforts cutting High risk churn by 20%.
+    Factor multipliers compound across all of a merchant's active risk factors.
+
+    Args:
+        merchants_df (DataFrame): Merchant data with risk_score, risk_category, segment and risk_factors
+        category_multipliers (dict): Multiplier per risk category
+        segment_multipliers (dict): Multiplier per size segment
+        factor_multipliers (dict): Multiplier per risk factor
+
+    Returns:
+        ndarray: Churn probability per merchant, clipped to [0, 1]
+    """
+    probabilities = merchants_df['risk_score'].to_numpy(dtype=np.float64, copy=True)
+
+    if category_multipliers:
+        probabilities *= merchants_df['risk_category'].map(category_multipliers).fillna(1.0).to_numpy(dtype=np.float64)
+
+    if segment_multipliers:
+        probabilities *= merchants_df['segment'].map(segment_multipliers).fillna(1.0).to_numpy(dtype=np.float64)
+
+    if factor_multipliers:
+        # One row per (merchant, factor); merchants without factors keep a neutral 1.0
+        factors = merchants_df['risk_factors'].explode()
+        per_merchant = factors.map(factor_multipliers).fillna(1.0).astype(np.float64).groupby(level=0, sort=False).prod()
+        probabilities *= per_merchant.reindex(merchants_df.index).fillna(1.0).to_numpy(dtype=np.float64)
+
+    return np.clip(probabilities, 0.0, 1.0)
+
+def scenario_count(num_merchants, requested, cell_budget=INTERACTIVE_CELL_BUDGET):
+    """
+    Number of scenarios to run for a book of num_merchants.
+
+    Keeps num_merchants x scenarios within cell_budget, so the run time stays
+    interactive as the book grows, but never goes below MIN_SCENARIOS (or
+    above what was requested).
+
+    Args:
+        num_merchants (int): Merchants in the simulated book
+        requested (int): Scenarios asked for
+        cell_budget (int): Most merchants x scenarios cells to sample
+
+    Returns:
+        int: Scenarios to run
+    """
+    affordable = cell_budget // max(num_merchants, 1)
+    return int(min(requested, max(affordable, MIN_SCENARIOS)))
+
+def simulate_lost_volume(merchants_df, probabilities, group_cols=('segment', 'account_manager'),
+                         n_scenarios=1000, volume_col='monthly_volume_avg', seed=42,
+                         chunk_cells=DEFAULT_CHUNK_CELLS):
+    """
+    Monte Carlo sample churn outcomes and aggregate the lost monthly volume per group.
+
+    Merchants x scenarios are processed in blocks of at most ``chunk_cells`` cells,
+    so memory stays bounded regardless of portfolio size or scenario count.
+    Within a block, churn draws are compared against the probabilities in one
+    vectorized step and summed per group with a single volume-weighted matrix product.
+
+    Args:
+        merchants_df (DataFrame): Merchant data containing the group and volume columns
+        probabilities (ndarray): Churn probability per merchant (see churn_probabilities)
+        group_cols (tuple): Columns to aggregate lost volume by
+        n_scenarios (int): Number of simulated scenarios
+        volume_col (str): Column holding the volume lost when a merchant churns
+        seed (int): Seed for the random generator
+        chunk_cells (int): Maximum merchants x scenarios cells sampled per block
+
+    Returns:
+        dict: Maps each group column (and 'total') to a DataFrame of lost volume
+              statistics (mean, P50, P90) per group value
+    """
+    rng = np.random.default_rng(seed)
+    num_merchants = len(merchants_df)
+    volumes = merchants_df[volume_col].to_numpy(dtype=np.float32)
+
+    # Probabilities are resolved to 1/65536 so churn draws can be uint16,
+    # which are several times cheaper to generate than floats.
+    thresholds = np.round(np.clip(probabilities, 0.0, 1.0) * 65536).clip(max=65535).astype(np.uint16)
+
+    # Stack the group encodings (weighted by volume, plus a total row) so each
+    # block is reduced with a single matrix product
+    group_codes = []
+    group_labels = []
+    offset = 0
+    for col in group_cols:
+        codes, uniques = pd.factorize(merchants_df[col], sort=True)
+        group_codes.append(codes + offset)
+        group_labels.append((col, offset, list(uniques)))
+        offset += len(uniques)
+    total_row = offset
+    num_rows = offset + 1
+
+    lost = np.zeros((num_rows, n_scenarios))
+
+    scenarios_per_block = max(1, min(n_scenarios, chunk_cells))
+    merchants_per_block = max(1, chunk_cells // scenarios_per_block)
+
+    for m0 in range(0, num_merchants, merchants_per_block):
+        m1 = min(m0 + merchants_per_block, num_merchants)
+        block_thresholds = thresholds[m0:m1, None]
+        block_columns = np.arange(m1 - m0)
+
+        weights = np.zeros((num_rows, m1 - m0), dtype=np.float32)
+        for codes in group_codes:
+            weights[codes[m0:m1], block_columns] = volumes[m0:m1]
+        weights[total_row] = volumes[m0:m1]
+
+        for s0 in range(0, n_scenarios, scenarios_per_block):
+            s1 = min(s0 + scenarios_per_block, n_scenarios)
+            draws = rng.integers(0, 65536, size=(m1 - m0, s1 - s0), dtype=np.uint16)
+            churned = (draws < block_thresholds).astype(np.float32)
+            lost[:, s0:s1] += weights @ churned
+
+    results = {}
+    for col, start, labels in group_labels:
+        results[col] = _summarize_losses(lost[start:start + len(labels)], pd.Index(labels, name=col))
+    results['total'] = _summarize_losses(lost[total_row:], pd.Index(['All Merchants'], name='total'))
+
+    return results
+
+def _summarize_losses(losses, index):
+    """Reduce a groups x scenarios loss matrix to mean / P50 / P90 per group."""
+    if losses.shape[1] == 0:
+        percentiles = np.zeros((2, losses.shape[0]))
+        means = np.zeros(losses.shape[0])
+    else:
+        percentiles = np.percentile(losses, [50, 90], axis=1)
+        means = losses.mean(axis=1)
+
+    return pd.DataFrame({
+        'mean': means,
+        'p50': percentiles[0],
+        'p90': percentiles[1]
+    }, index=index)
@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+
+# Trailing months the transaction counters cover
+TRANSACTION_WINDOW_MONTHS = 3
+
+# Payment counters per merchant over the window, held as integer merchant columns
+TRANSACTION_COUNTERS = ['attempts', 'successes', 'authorizations', 'fraud_flags']
+
+# Rate column -> counter it divides by attempts
+TRANSACTION_RATES = {
+    'success_rate': 'successes',
+    'authorization_rate': 'authorizations',
+    'fraud_rate': 'fraud_flags'
+}
+
+def transaction_rates(counters, window_volume):
+    """
+    Per-merchant rates from the transaction counters, for all merchants at once.
+
+    Args:
+        counters (DataFrame): TRANSACTION_COUNTERS columns, one row per merchant
+        window_volume (array-like): Succeeded volume per merchant over the same window
+
+    Returns:
+        DataFrame: float32 success_rate, authorization_rate, fraud_rate and
+                   avg_transaction_size (NaN without attempts or successes)
+    """
+    attempts = counters['attempts'].to_numpy(dtype=np.float64)
+    successes = counters['successes'].to_numpy(dtype=np.float64)
+    window_volume = np.asarray(window_volume, dtype=np.float64)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rates = {
+            rate: np.where(attempts > 0, counters[counter].to_numpy(dtype=np.float64) / attempts, np.nan)
+            for rate, counter in TRANSACTION_RATES.items()
+        }
+        rates['avg_transaction_size'] = np.where(successes > 0, window_volume / successes, np.nan)
+
+    return pd.DataFrame(rates, index=counters.index).astype(np.float32)
+
+def with_transaction_counters(merchants_df, counters, window_volume):
+    """
+    Copy of the merchant table with the counters and the rates derived from them.
+
+    Args:
+        merchants_df (DataFrame): Merchant data
+        counters (DataFrame): TRANSACTION_COUNTERS columns aligned with merchants_df
+        window_volume (array-like): Succeeded volume per merchant over the counters' window
+
+    Returns:
+        DataFrame: Merchant data with counter and rate columns set
+    """
+    merchants_df = merchants_df.copy()
+    for counter in TRANSACTION_COUNTERS:
+        merchants_df[counter] = counters[counter].to_numpy(dtype=np.uint32)
+    rates = transaction_rates(merchants_df, window_volume)
+    for rate in rates.columns:
+        merchants_df[rate] = rates[rate].to_numpy()
+    return merchants_df
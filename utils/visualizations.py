@@ -2,15 +2,18 @@ from PIL import Image
 import base64
 from io import BytesIO
 
-def create_pixel_merchant_icon(color='cyan'):
+from utils.assets import stylesheet_tag
+from utils.downsampling import minmax_indices
+
+def merchant_icon_png(color='cyan'):
     """
-    Create a pixel art merchant icon.
+    Render the pixel art merchant icon as PNG bytes.
     
     Args:
         color (str): Color name for the icon ('cyan', 'pink', 'green', 'yellow', 'orange', 'red')
         
     Returns:
-        str: Base64 encoded image data URI
+        bytes: PNG image data
     """
     colors = {
         'cyan': (1, 237, 237),
@@ -47,11 +50,21 @@ def create_pixel_merchant_icon(color='cyan'):
     # Door handle
     pixels[8, 11] = (255, 255, 255, 255)
     
-    # Convert to base64 for HTML display
     buffered = BytesIO()
     img.save(buffered, format="PNG")
-    img_str = base64.b64encode(buffered.getvalue()).decode()
+    return buffered.getvalue()
+
+def create_pixel_merchant_icon(color='cyan'):
+    """
+    Create a pixel art merchant icon.
     
+    Args:
+        color (str): Color name for the icon ('cyan', 'pink', 'green', 'yellow', 'orange', 'red')
+        
+    Returns:
+        str: Base64 encoded image data URI
+    """
+    img_str = base64.b64encode(merchant_icon_png(color)).decode()
     return f"data:image/png;base64,{img_str}"
 
 def create_pixel_chart(data, color='cyan', height=100, width=200):
@@ -67,6 +80,10 @@ def create_pixel_chart(data, color='cyan', height=100, width=200):
     Returns:
         str: Base64 encoded image data URI
     """
+    # Long histories: keep each pixel column's low and high, so drawing cost stays flat
+    if len(data) > width:
+        data = [data[i] for i in minmax_indices(data, width // 2)]
+    
     # Create an empty image
     img = Image.new('RGBA', (width, height), (0, 0, 0, 0))
     pixels = img.load()
@@ -137,237 +154,12 @@ def create_pixel_chart(data, color='cyan', height=100, width=200):
 
 def apply_retro_styling():
     """
-    Returns CSS styling for retro gaming aesthetic.
+    Returns the HTML that applies the retro gaming stylesheet.
+    
+    The stylesheet (assets/retro.css plus the bundled fonts) is served as a
+    content-hashed static file, so only a <link> tag is sent on each rerun.
     
     Returns:
-        str: CSS styling for Streamlit
+        str: HTML for st.markdown(..., unsafe_allow_html=True)
     """
-    return """
-    <style>
-    /* Main theme colors */
-    :root {
-        --primary: #FF355E;        /* Hot pink */
-        --secondary: #01EDED;      /* Cyan */
-        --tertiary: #50FC00;       /* Bright green */
-        --dark: #120458;           /* Dark blue */
-        --light: #F5F5F5;          /* White-ish */
-        --warning: #FF9933;        /* Orange */
-        --danger: #FF0000;         /* Red */
-        --background: #FFDD00;     /* Bright yellow */
-    }
-    
-    /* Fonts */
-    @import url('https://fonts.googleapis.com/css2?family=VT323&display=swap');
-    @import url('https://fonts.googleapis.com/css2?family=Press+Start+2P&display=swap');
-    @import url('https://fonts.googleapis.com/css2?family=Space+Mono&display=swap');
-    
-    /* Base styles */
-    .main {
-        background-color: var(--background);
-        color: var(--dark);
-    }
-    
-    /* Override Streamlit's default background */
-    .stApp {
-        background-color: var(--background);
-    }
-    
-    h1, h2, h3 {
-        font-family: 'Press Start 2P', cursive;
-        text-transform: uppercase;
-        color: var(--secondary);
-        text-shadow: 3px 3px 0 var(--dark);
-        margin: 1.5rem 0;
-    }
-    
-    h1 {
-        color: var(--primary);
-        font-size: 2.5rem;
-        letter-spacing: 2px;
-        text-align: center;
-        padding: 20px 0;
-        border-bottom: 4px solid var(--primary);
-        margin-bottom: 30px;
-    }
-    
-    .stDataFrame {
-        border: 4px solid var(--secondary);
-        box-shadow: 8px 8px 0 var(--dark);
-    }
-    
-    /* Metric cards */
-    .metric-card {
-        background-color: var(--dark);
-        border: 3px solid var(--secondary);
-        border-radius: 0;
-        padding: 10px;
-        text-align: center;
-        margin: 5px;
-        box-shadow: 5px 5px 0 rgba(0,0,0,0.5);
-        transition: all 0.2s;
-    }
-    
-    .metric-card:hover {
-        transform: translateY(-2px);
-        box-shadow: 7px 7px 0 rgba(0,0,0,0.5);
-    }
-    
-    .metric-value {
-        font-family: 'Press Start 2P', cursive;
-        font-size: 2rem;
-        margin: 10px 0;
-    }
-    
-    .metric-label {
-        font-family: 'VT323', monospace;
-        font-size: 1.3rem;
-        color: var(--light);
-    }
-    
-    /* Risk levels */
-    .high-risk {
-        color: var(--danger);
-        font-weight: bold;
-    }
-    
-    .medium-risk {
-        color: var(--warning);
-        font-weight: bold;
-    }
-    
-    .low-risk {
-        color: var(--tertiary);
-        font-weight: bold;
-    }
-    
-    /* Button styles */
-    .stButton button {
-        font-family: 'Press Start 2P', cursive;
-        background-color: var(--secondary);
-        color: var(--dark);
-        border: 3px solid var(--dark);
-        border-radius: 0;
-        box-shadow: 5px 5px 0 rgba(0,0,0,0.5);
-        transition: all 0.2s;
-        text-transform: uppercase;
-        padding: 10px 20px;
-        margin: 10px 0;
-    }
-    
-    .stButton button:hover {
-        background-color: var(--primary);
-        color: white;
-        transform: translateY(-2px);
-        box-shadow: 7px 7px 0 rgba(0,0,0,0.5);
-    }
-    
-    /* Select box styling */
-    .stSelectbox div[data-baseweb="select"] > div {
-        font-family: 'VT323', monospace;
-        background-color: var(--dark);
-        border: 3px solid var(--secondary);
-        border-radius: 0;
-        color: white;
-    }
-    
-    /* Sidebar styling */
-    .sidebar .sidebar-content {
-        background-color: var(--dark);
-        border-right: 4px solid var(--secondary);
-    }
-    
-    [data-testid="stSidebar"] {
-        background-color: var(--dark);
-    }
-    
-    .sidebar h2 {
-        font-size: 1.5rem;
-        color: var(--primary);
-    }
-    
-    /* Tab styling */
-    .stTabs [data-baseweb="tab-list"] {
-        gap: 2px;
-    }
-    
-    .stTabs [data-baseweb="tab"] {
-        font-family: 'Press Start 2P', cursive;
-        font-size: 0.8rem;
-        background-color: var(--dark);
-        border: 2px solid var(--secondary);
-        border-radius: 0;
-        color: var(--light);
-        padding: 10px;
-        box-shadow: 3px 3px 0 rgba(0,0,0,0.5);
-    }
-    
-    .stTabs [aria-selected="true"] {
-        background-color: var(--secondary);
-        color: var(--dark);
-    }
-    
-    /* Dataframe styling */
-    .dataframe {
-        font-family: 'Space Mono', monospace;
-    }
-    
-    /* Footer */
-    .footer {
-        font-family: 'VT323', monospace;
-        text-align: center;
-        color: var(--dark);
-        padding: 20px 0;
-        border-top: 2px solid var(--primary);
-        margin-top: 50px;
-    }
-    
-    /* Progress bar styling */
-    .stProgress > div > div {
-        background-color: var(--primary);
-    }
-    
-    /* Arcade marquee effect */
-    .marquee {
-        background-color: var(--dark);
-        overflow: hidden;
-        position: relative;
-        border: 3px solid var(--primary);
-        box-shadow: 0 0 10px var(--primary);
-        margin: 20px 0;
-        padding: 10px;
-    }
-    
-    .marquee-content {
-        font-family: 'Press Start 2P', cursive;
-        font-size: 1.2rem;
-        color: var(--primary);
-        white-space: nowrap;
-        animation: marquee 15s linear infinite;
-    }
-    
-    @keyframes marquee {
-        0% { transform: translateX(100%); }
-        100% { transform: translateX(-100%); }
-    }
-    
-    /* High-score table style */
-    .high-score {
-        font-family: 'VT323', monospace;
-        font-size: 1.2rem;
-        margin-bottom: 10px;
-    }
-    
-    .high-score-name {
-        color: var(--secondary);
-        display: inline-block;
-        width: 70%;
-    }
-    
-    .high-score-value {
-        color: var(--tertiary);
-        display: inline-block;
-        width: 30%;
-        text-align: right;
-    }
-    </style>
-    """
\ No newline at end of file
+    return stylesheet_tag()